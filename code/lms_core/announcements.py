@@ -0,0 +1,232 @@
+import threading
+import time
+import uuid
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import transaction
+from django.db.models import Count, Max
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+from ninja.renderers import JSONRenderer
+
+from lms_core.cache import LRUCache
+from lms_core.models import CourseAnnouncement
+from lms_core.pagination import CursorPagination
+from lms_core.schema import AnnouncementPageOut
+
+# Rendered pages of the announcement feed (show_announcements), which
+# students poll. Every course has an "announcement version"; a page is cached
+# under (course, version, cursor, limit), so a new version makes every cached
+# page of the course unreachable and nothing has to be deleted.
+#
+# A page expires when the course's next scheduled announcement (publish_date
+# still in the future) becomes due, and after ANNOUNCEMENT_FEED_TTL seconds at
+# the latest. When a page is missing, one worker builds it under a lock; the
+# others wait up to ANNOUNCEMENT_FEED_WAIT seconds for it to appear, then
+# build it themselves without storing it.
+#
+# ANNOUNCEMENT_FEED_STORE picks where versions and pages live:
+#   - 'local': pages in this process; the version is read from the database
+#     (number of announcements and latest updated_at), which costs one small
+#     aggregate per request but lets every process see a change at once;
+#   - 'redis': pages and a version counter, bumped when an announcement is
+#     saved or deleted, shared by every worker (ANNOUNCEMENT_FEED_REDIS_URL).
+
+TTL = getattr(settings, 'ANNOUNCEMENT_FEED_TTL', 300)
+WAIT = getattr(settings, 'ANNOUNCEMENT_FEED_WAIT', 2.0)
+# How long a builder may hold the lock before another worker takes over
+LOCK_TIMEOUT = 10
+
+renderer = JSONRenderer()
+
+
+# ===== Stores =====
+
+class LocalStore:
+    name = 'local'
+
+    def __init__(self, maxsize=getattr(settings, 'ANNOUNCEMENT_FEED_CACHE_SIZE', 10000)):
+        self.pages = LRUCache(maxsize=maxsize, ttl=TTL)
+        self.lock = threading.Lock()
+        self.building = {}
+
+    def version(self, course_id):
+        # From the database rather than a counter of this process, so a
+        # change made by another worker (or a bulk write) is seen at once
+        row = CourseAnnouncement.objects.filter(course_id=course_id).aggregate(
+            count=Count('id'), last=Max('updated_at'))
+        return f"{row['count']}.{row['last'].timestamp() if row['last'] else 0}"
+
+    def bump(self, course_id):
+        # Nothing to do: the next version() read sees the change
+        pass
+
+    def get(self, key):
+        return self.pages.get(key)
+
+    def set(self, key, body, ttl):
+        self.pages.set(key, body, expires=time.time() + ttl)
+
+    def acquire(self, key):
+        """True when the caller may build `key`; it must then call release()."""
+        now = time.time()
+        with self.lock:
+            if self.building.get(key, 0) > now:
+                return False
+            self.building[key] = now + LOCK_TIMEOUT
+            return True
+
+    def release(self, key):
+        with self.lock:
+            self.building.pop(key, None)
+
+    def size(self):
+        return len(self.pages.entries)
+
+
+class RedisStore:
+    """Versions are `<prefix>version:<course>` counters, pages
+    `<prefix>page:<key>` strings with a TTL, locks `<prefix>lock:<key>`."""
+
+    name = 'redis'
+
+    def __init__(self, url, prefix='lms:feed:'):
+        try:
+            import redis
+        except ImportError:
+            raise ImproperlyConfigured("ANNOUNCEMENT_FEED_STORE = 'redis' needs the redis package")
+        self.client = redis.Redis.from_url(url)
+        self.prefix = prefix
+        self.tokens = {}
+
+    def version(self, course_id):
+        return int(self.client.get(f'{self.prefix}version:{course_id}') or 0)
+
+    def bump(self, course_id):
+        self.client.incr(f'{self.prefix}version:{course_id}')
+
+    def get(self, key):
+        body = self.client.get(f'{self.prefix}page:{key}')
+        return body.decode() if body is not None else None
+
+    def set(self, key, body, ttl):
+        self.client.set(f'{self.prefix}page:{key}', body, ex=max(1, int(ttl)))
+
+    def acquire(self, key):
+        token = uuid.uuid4().hex
+        if not self.client.set(f'{self.prefix}lock:{key}', token, nx=True, ex=LOCK_TIMEOUT):
+            return False
+        self.tokens[key] = token
+        return True
+
+    def release(self, key):
+        # Only drop the lock while it is still ours (it may have timed out)
+        token = self.tokens.pop(key, None)
+        lock = f'{self.prefix}lock:{key}'
+        if token is not None and self.client.get(lock) == token.encode():
+            self.client.delete(lock)
+
+    def size(self):
+        return None
+
+
+def get_store():
+    name = getattr(settings, 'ANNOUNCEMENT_FEED_STORE', 'local')
+    if name == 'redis':
+        return RedisStore(getattr(settings, 'ANNOUNCEMENT_FEED_REDIS_URL', 'redis://localhost:6379/0'))
+    if name == 'local':
+        return LocalStore()
+    raise ImproperlyConfigured(f"Unknown ANNOUNCEMENT_FEED_STORE {name!r}")
+
+
+# ===== Feed =====
+
+class FeedCache:
+    def __init__(self, store, wait=WAIT, ttl=TTL):
+        self.store = store
+        self.wait = wait
+        self.ttl = ttl
+        self.stats = {'hits': 0, 'misses': 0, 'builds': 0, 'waits': 0, 'wait_timeouts': 0, 'bumps': 0}
+
+    def build(self, course_id, cursor, limit):
+        """(rendered page, seconds it stays valid)."""
+        now = timezone.now()
+        announcements = CourseAnnouncement.objects.filter(
+            course_id=course_id,
+            is_active=True,
+            publish_date__lte=now
+        ).select_related('teacher').order_by('-publish_date')
+        page = CursorPagination().paginate_queryset(
+            announcements, CursorPagination.Input(cursor=cursor, limit=limit))
+        body = renderer.render(None, AnnouncementPageOut.from_orm(page).model_dump(), response_status=200)
+        scheduled = CourseAnnouncement.objects.filter(
+            course_id=course_id, is_active=True, publish_date__gt=now
+        ).order_by('publish_date').values_list('publish_date', flat=True).first()
+        ttl = self.ttl
+        if scheduled is not None:
+            ttl = min(ttl, max((scheduled - now).total_seconds(), 1))
+        return body, ttl
+
+    def page(self, course_id, cursor=None, limit=20):
+        """Rendered JSON of one page of the published feed of `course_id`."""
+        key = f'{course_id}:{self.store.version(course_id)}:{cursor or ""}:{limit}'
+        body = self.store.get(key)
+        if body is not None:
+            self.stats['hits'] += 1
+            return body
+        self.stats['misses'] += 1
+        deadline = time.monotonic() + self.wait
+        while not self.store.acquire(key):
+            # Another worker is building this page
+            time.sleep(0.02)
+            body = self.store.get(key)
+            if body is not None:
+                self.stats['waits'] += 1
+                return body
+            if time.monotonic() >= deadline:
+                self.stats['wait_timeouts'] += 1
+                return self.build(course_id, cursor, limit)[0]
+        try:
+            body, ttl = self.build(course_id, cursor, limit)
+            self.store.set(key, body, ttl)
+        finally:
+            self.store.release(key)
+        self.stats['builds'] += 1
+        return body
+
+    def bump(self, course_id):
+        self.store.bump(course_id)
+        self.stats['bumps'] += 1
+
+    def report(self):
+        return {**self.stats, 'store': self.store.name, 'size': self.store.size()}
+
+
+_feeds = None
+
+
+def feeds():
+    global _feeds
+    if _feeds is None:
+        _feeds = FeedCache(get_store())
+    return _feeds
+
+
+def page(course_id, cursor=None, limit=20):
+    return feeds().page(course_id, cursor, limit)
+
+
+def stats():
+    return feeds().report()
+
+
+@receiver(post_save, sender='lms_core.CourseAnnouncement')
+@receiver(post_delete, sender='lms_core.CourseAnnouncement')
+def announcement_changed(sender, instance, **kwargs):
+    course_id = instance.course_id
+    feeds().bump(course_id)
+    # A page built by another worker before the write commits would be cached
+    # under the new version, so bump once more after commit
+    transaction.on_commit(lambda: feeds().bump(course_id))
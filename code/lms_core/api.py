@@ -1,11 +1,12 @@
-from ninja import NinjaAPI, UploadedFile, File, Form, Router
+from ninja import NinjaAPI, UploadedFile, File, Form, Query, Router
 from ninja.responses import Response
 from ninja.errors import HttpError
 from django.shortcuts import get_object_or_404
+from django.core.exceptions import ValidationError
 from django.db import transaction
 from django.utils import timezone
 from typing import List
-from django.http import JsonResponse
+from django.http import HttpResponse, HttpResponseNotModified, JsonResponse
 from ninja_simple_jwt.auth.views.api import mobile_auth_router
 from ninja_simple_jwt.auth.ninja_auth import HttpJwtAuth
 
@@ -13,24 +14,27 @@ from ninja.pagination import paginate, PageNumberPagination
 from django.contrib.auth.models import User
 from ninja_jwt.authentication import JWTAuth
 from .models import Category, Course
+from lms_core import announcements, auth, catalog, courses, dashboard, membership, profiles, progress, ratings, revocation, search, suggest
+from lms_core.pagination import CursorPagination
 
 
 # Import semua schema yang diperlukan
 from lms_core.schema import (
     CourseSchemaOut, CourseMemberOut, CourseSchemaIn,
-    CourseContentMini, CourseContentFull,
+    CourseContentMini, CourseContentFull, CourseOutlineOut, ContentMoveIn,
     CourseCommentOut, CourseCommentIn,
     UserOut, UserProfileUpdateIn,
-    CourseAnnouncementOut, CourseAnnouncementIn, CourseAnnouncementUpdateIn,
-    ContentCompletionOut, ContentCompletionIn,
-    CourseFeedbackOut, CourseFeedbackIn, CourseFeedbackUpdateIn,
+    CourseAnnouncementOut, CourseAnnouncementIn, CourseAnnouncementUpdateIn, AnnouncementPageOut,
+    ContentCompletionOut, ContentCompletionIn, CourseProgressOut, CompletionMatrixOut,
+    CourseFeedbackOut, CourseFeedbackIn, CourseFeedbackUpdateIn, CourseRatingOut,
     ContentBookmarkOut, ContentBookmarkIn,
+    SearchIn, SearchPageOut, SuggestIn, SuggestionOut,
     MessageResponse, ErrorResponse,  CategoryCreateSchema, 
     CategoryUpdateSchema, 
     CategoryResponseSchema,
     CourseCreateSchema,
     CourseUpdateSchema,
-    CourseResponseSchema
+    CourseResponseSchema, CatalogFilterIn, CatalogPageOut
 )
 
 from lms_core.models import (
@@ -40,8 +44,8 @@ from lms_core.models import (
 )
 
 apiv1 = NinjaAPI()
-apiv1.add_router("/auth/", mobile_auth_router)
-apiAuth = HttpJwtAuth()
+apiv1.add_router("/auth/", auth.auth_router)
+apiAuth = auth.CachedJwtAuth()
 category_router = Router()
 course_router = Router()
 
@@ -53,28 +57,15 @@ def show_profile(request, user_id: int):
     """
     Menampilkan profil lengkap pengguna berdasarkan ID.
     Tidak memerlukan autentikasi (publik).
-    """
-    user = get_object_or_404(User, id=user_id)
-    profile, created = UserProfile.objects.get_or_create(user=user)
-    courses_created = Course.objects.filter(teacher=user)
-    course_members = CourseMember.objects.select_related('course_id').filter(user_id=user)
-    return {
-    'id': user.id,
-    'first_name': user.first_name,
-    'last_name': user.last_name,
-    'email': user.email,
-    'username': user.username,
-    'profile': {
-        'phone': profile.phone,
-        'description': profile.description,
-        'profile_picture': profile.profile_picture.url if profile.profile_picture else None,
-        'created_at': profile.created_at,
-        'updated_at': profile.updated_at,
-    },
-    'courses_created': courses_created,
-    'courses_joined': course_members,
-
-}
+    Dokumen profil disimpan siap pakai (lms_core.profiles) dan mendukung ETag / If-None-Match.
+    """
+    etag, body = profiles.get(user_id)
+    if etag in request.headers.get('If-None-Match', ''):
+        response = HttpResponseNotModified()
+    else:
+        response = HttpResponse(body, content_type='application/json; charset=utf-8')
+    response['ETag'] = etag
+    return response
   
 
 @apiv1.put("/profile", auth=apiAuth, response=MessageResponse) 
@@ -88,21 +79,15 @@ def update_profile_no_auth(request, data: UserProfileUpdateIn = Form(...), profi
     2. Form data only: Content-Type: multipart/form-data  
     3. JSON + File: Content-Type: multipart/form-data dengan data sebagai form field
     """
-    print(f"DEBUG - request.user: {request.user.id}")
-    print(f"DEBUG - request.user type: {type(request.user)}")
-    
-
-    user_instance = User.objects.get(id=request.user.id)
+    user_instance = request.user
     
     with transaction.atomic():
-        # Update User fields
-        if data.first_name is not None:
-            user_instance.first_name = data.first_name
-        if data.last_name is not None:
-            user_instance.last_name = data.last_name
-        if data.email is not None:
-            user_instance.email = data.email
-        user_instance.save()
+        # Update User fields (hanya field yang dikirim, nilai lain dari token bisa saja sudah usang)
+        changed = [field for field in ('first_name', 'last_name', 'email') if getattr(data, field) is not None]
+        for field in changed:
+            setattr(user_instance, field, getattr(data, field))
+        if changed:
+            user_instance.save(update_fields=changed)
         
         # Update UserProfile fields
         profile, created = UserProfile.objects.get_or_create(user=user_instance)
@@ -123,13 +108,12 @@ def create_announcement(request, course_id: int, data: CourseAnnouncementIn):
     Membuat pengumuman baru untuk kursus (hanya pengajar).
     Header: Authorization: Bearer <token>
     """
-    user_instance = User.objects.get(id=request.user.id)
-    course = get_object_or_404(Course, id=course_id)
-    if course.teacher.id != request.user.id :
+    user_instance = request.user
+    course = courses.get_or_404(course_id)
+    if not courses.is_teacher(request.user, course.id):
         raise HttpError(403, f"Hanya pengajar yang dapat membuat pengumuman. ID user: {request.user.username}")
-    print(f"User: {request.user}")
     announcement = CourseAnnouncement.objects.create(
-        course=course,
+        course_id=course.id,
         teacher=user_instance,
         title=data.title,
         content=data.content,
@@ -139,23 +123,20 @@ def create_announcement(request, course_id: int, data: CourseAnnouncementIn):
     return announcement
     
 
-@apiv1.get("/courses/{course_id}/announcements", auth=apiAuth, response=List[CourseAnnouncementOut])
-def show_announcements(request, course_id: int):
+@apiv1.get("/courses/{course_id}/announcements", auth=apiAuth, response=AnnouncementPageOut)
+def show_announcements(request, course_id: int, page: Query[CursorPagination.Input]):
     """
     Menampilkan semua pengumuman untuk kursus tertentu.
+    Halaman disimpan siap pakai per versi pengumuman kursus (lms_core.announcements).
     Header: Authorization: Bearer <token>
     """
-    course = get_object_or_404(Course, id=course_id)
-    is_teacher = course.teacher.id == request.user.id
-    is_member = CourseMember.objects.filter(course_id=course.id, user_id=request.user.id).exists()
-    if not (is_teacher or is_member):
-        raise HttpError(403, "Anda tidak memiliki akses ke kursus ini")
-    announcements = CourseAnnouncement.objects.filter(
-        course=course,
-        is_active=True,
-        publish_date__lte=timezone.now()
-    ).order_by('-publish_date')
-    return announcements
+    # Members are answered from the membership cache; only others need the course record
+    if not membership.is_member(request.user, course_id):
+        course = courses.get_or_404(course_id)
+        if not courses.is_teacher(request.user, course.id):
+            raise HttpError(403, "Anda tidak memiliki akses ke kursus ini")
+    body = announcements.page(course_id, page.cursor, page.limit)
+    return HttpResponse(body, content_type='application/json; charset=utf-8')
 
 @apiv1.put("/announcements/{announcement_id}", auth=apiAuth, response=CourseAnnouncementOut)
 def edit_announcement(request, announcement_id: int, data: CourseAnnouncementUpdateIn):
@@ -163,9 +144,9 @@ def edit_announcement(request, announcement_id: int, data: CourseAnnouncementUpd
     Mengedit pengumuman (hanya pengajar).
     Header: Authorization: Bearer <token>
     """
-    user_instance = User.objects.get(id=request.user.id)
+    user_instance = request.user
     announcement = get_object_or_404(CourseAnnouncement, id=announcement_id)
-    if announcement.teacher != user_instance:
+    if announcement.teacher_id != user_instance.id:
         raise HttpError(403, "Hanya pengajar yang membuat pengumuman yang dapat mengeditnya")
     if data.title is not None:
         announcement.title = data.title
@@ -185,11 +166,64 @@ def delete_announcement(request, announcement_id: int):
     Header: Authorization: Bearer <token>
     """
     announcement = get_object_or_404(CourseAnnouncement, id=announcement_id)
-    if announcement.teacher.id != request.user.id:
-        raise HttpError(403, f"Hanya pengajar yang membuat pengumuman yang dapat menghapusnya {announcement.teacher.id}")
+    if announcement.teacher_id != request.user.id:
+        raise HttpError(403, f"Hanya pengajar yang membuat pengumuman yang dapat menghapusnya {announcement.teacher_id}")
     announcement.delete()
     return {"message": "Pengumuman berhasil dihapus"}
 
+# ===== CONTENT TREE ENDPOINTS =====
+
+@apiv1.get("/courses/{course_id}/outline", auth=apiAuth, response=List[CourseOutlineOut])
+def show_outline(request, course_id: int):
+    """
+    Menampilkan seluruh struktur konten kursus (urutan pre-order dengan kedalaman) dalam satu query.
+    Header: Authorization: Bearer <token>
+    """
+    course = courses.get_or_404(course_id)
+    if not (membership.is_member(request.user, course) or courses.is_teacher(request.user, course.id)):
+        raise HttpError(403, "Anda tidak memiliki akses ke kursus ini")
+    contents = CourseContent.objects.filter(course_id=course.id).order_by('path') \
+        .values_list('id', 'name', 'parent_id', 'path')
+    return [
+        {'id': pk, 'name': name, 'parent_id': parent, 'depth': len(path) // CourseContent.PATH_STEP - 1}
+        for pk, name, parent, path in contents
+    ]
+
+def teacher_content(request, content_id):
+    content = get_object_or_404(CourseContent, id=content_id)
+    if not courses.is_teacher(request.user, content.course_id_id):
+        raise HttpError(403, "Hanya pengajar kursus yang dapat mengubah struktur konten")
+    return content
+
+@apiv1.put("/contents/{content_id}/move", auth=apiAuth, response=MessageResponse)
+def move_content(request, content_id: int, data: ContentMoveIn):
+    """
+    Memindahkan konten beserta seluruh sub-kontennya ke induk lain (null = tingkat teratas).
+    Header: Authorization: Bearer <token>
+    """
+    content = teacher_content(request, content_id)
+    content.parent_id_id = data.parent_id
+    try:
+        content.save(update_fields=['parent_id', 'updated_at'])
+    except ValidationError as e:
+        raise HttpError(400, ' '.join(e.messages))
+    return {"message": "Konten berhasil dipindahkan"}
+
+@apiv1.delete("/contents/{content_id}", auth=apiAuth, response=MessageResponse)
+def delete_content(request, content_id: int):
+    """
+    Menghapus konten beserta seluruh sub-kontennya.
+    Header: Authorization: Bearer <token>
+    """
+    content = teacher_content(request, content_id)
+    subtree = CourseContent.objects.filter(pk=content.pk)
+    if content.path:
+        subtree = CourseContent.objects.filter(course_id=content.course_id_id, path__startswith=content.path)
+    # Bit progres seluruh konten yang dihapus dibersihkan sekali per bitset
+    with transaction.atomic(), progress.batched_clear():
+        _, deleted = subtree.delete()
+    return {"message": f"{deleted[CourseContent._meta.label]} konten berhasil dihapus"}
+
 # ===== CONTENT COMPLETION TRACKING ENDPOINTS =====
 
 @apiv1.post("/content/completion", auth=apiAuth, response=ContentCompletionOut)
@@ -199,39 +233,36 @@ def add_completion_tracking(request, data: ContentCompletionIn):
     Header: Authorization: Bearer <token>
     """
     content = get_object_or_404(CourseContent, id=data.content_id)
-    student_instance = User.objects.get(id=request.user.id)
-    is_member = CourseMember.objects.filter(
-        course_id=content.course_id, 
-        user_id=request.user.id
-    ).exists()
+    student_instance = request.user
+    is_member = membership.is_member(request.user, content.course_id_id)
     if not is_member:
         raise HttpError(403, "Anda bukan anggota kursus ini")
-    completion, created = ContentCompletion.objects.get_or_create(
-        student=student_instance,
-        content=content
-    )
-    if not created:
-        raise HttpError(400, "Konten sudah ditandai sebagai selesai")
+    with transaction.atomic():
+        completion, created = ContentCompletion.objects.get_or_create(
+            student=student_instance,
+            content=content
+        )
+        if not created:
+            raise HttpError(400, "Konten sudah ditandai sebagai selesai")
+        progress.update(student_instance.id, content.course_id_id, content.position, done=True)
     return completion
 
 @apiv1.get("/courses/{course_id}/completions", auth=apiAuth, response=List[ContentCompletionOut])
+@paginate(CursorPagination)
 def show_completions(request, course_id: int):
     """
     Menampilkan semua penyelesaian siswa untuk kursus tertentu.
     Header: Authorization: Bearer <token>
     """
-    course = get_object_or_404(Course, id=course_id)
-    student_instance = User.objects.get(id=request.user.id)
-    is_member = CourseMember.objects.filter(
-        course_id=course, 
-        user_id=request.user.id
-    ).exists()
+    course = courses.get_or_404(course_id)
+    student_instance = request.user
+    is_member = membership.is_member(request.user, course)
     if not is_member:
         raise HttpError(403, "Anda bukan anggota kursus ini")
     completions = ContentCompletion.objects.filter(
         student=student_instance,
-        content__course_id=course
-    ).select_related('content', 'content__course_id')
+        content__course_id=course.id
+    ).select_related('content').order_by('-completed_at')
     return completions
 
 @apiv1.delete("/completions/{completion_id}", auth=apiAuth, response=MessageResponse)
@@ -240,13 +271,35 @@ def delete_completion(request, completion_id: int):
     Menghapus pelacakan penyelesaian oleh siswa.
     Header: Authorization: Bearer <token>
     """
-    completion = get_object_or_404(ContentCompletion, id=completion_id)
-    student_instance = User.objects.get(id=request.user.id)
-    if completion.student != student_instance:
+    completion = get_object_or_404(ContentCompletion.objects.select_related('content'), id=completion_id)
+    student_instance = request.user
+    if completion.student_id != student_instance.id:
         raise HttpError(403, f"Anda hanya dapat menghapus penyelesaian sendiri {completion.student} {student_instance}")
-    completion.delete()
+    with transaction.atomic():
+        completion.delete()
+        content = completion.content
+        progress.update(student_instance.id, content.course_id_id, content.position, done=False)
     return {"message": "Pelacakan penyelesaian berhasil dihapus"}
 
+@apiv1.get("/courses/progress", auth=apiAuth, response=List[CourseProgressOut])
+def show_progress(request):
+    """
+    Menampilkan progres (jumlah konten selesai, total konten dan persentase) di setiap kursus yang diikuti.
+    Header: Authorization: Bearer <token>
+    """
+    return progress.student_progress(request.user.id)
+
+@apiv1.get("/courses/{course_id}/completion-matrix", auth=apiAuth, response=CompletionMatrixOut)
+def show_completion_matrix(request, course_id: int):
+    """
+    Menampilkan matriks penyelesaian siswa x konten untuk kursus (hanya pengajar).
+    Header: Authorization: Bearer <token>
+    """
+    course = courses.get_or_404(course_id)
+    if not courses.is_teacher(request.user, course.id):
+        raise HttpError(403, "Hanya pengajar kursus yang dapat melihat matriks penyelesaian")
+    return dashboard.completion_matrix(course.id)
+
 # ===== COURSE FEEDBACK ENDPOINTS =====
 
 @apiv1.post("/feedback", auth=apiAuth, response=CourseFeedbackOut)
@@ -255,37 +308,46 @@ def add_feedback(request, data: CourseFeedbackIn):
     Menambahkan umpan balik untuk kursus.
     Header: Authorization: Bearer <token>
     """
-    course = get_object_or_404(Course, id=data.course_id)
-    user_instance = User.objects.get(id=request.user.id)
-    is_member = CourseMember.objects.filter(
-        course_id=course, 
-        user_id=request.user.id
-    ).exists()
+    course = courses.get_or_404(data.course_id)
+    user_instance = request.user
+    is_member = membership.is_member(request.user, course)
     if not is_member:
         raise HttpError(403, "Anda bukan anggota kursus ini")
-    feedback, created = CourseFeedback.objects.update_or_create(
-        course=course,
-        student=user_instance,
-        defaults={
-            'rating': data.rating,
-            'feedback_text': data.feedback_text
-        }
-    )
+    if data.rating not in ratings.RATINGS:
+        raise HttpError(400, "Rating harus antara 1 dan 5")
+    with transaction.atomic():
+        # Baris umpan balik dikunci (atau dibuat) dulu; rating lama diambil dari
+        # baris yang terkunci agar ringkasan rating tetap konsisten
+        feedback, created = CourseFeedback.objects.select_for_update().get_or_create(
+            course_id=course.id,
+            student=user_instance,
+            defaults={
+                'rating': data.rating,
+                'feedback_text': data.feedback_text
+            }
+        )
+        old_rating = None
+        if not created:
+            old_rating = feedback.rating
+            feedback.rating = data.rating
+            feedback.feedback_text = data.feedback_text
+            feedback.save()
+        ratings.record(course.id, old_rating, data.rating)
     return feedback
 
 @apiv1.get("/courses/{course_id}/feedback", auth=apiAuth, response=List[CourseFeedbackOut])
+@paginate(CursorPagination)
 def show_feedback(request, course_id: int):
     """
     Menampilkan semua umpan balik untuk kursus tertentu.
     Header: Authorization: Bearer <token>
     """
  
-    course = get_object_or_404(Course, id=course_id)
-    is_teacher = course.teacher.id == request.user.id
-    is_member = CourseMember.objects.filter(course_id=course, user_id=request.user.id).exists()
-    if not (is_teacher or is_member):
-        return HttpError(403, "Anda tidak memiliki akses ke kursus ini")
-    feedback_list = CourseFeedback.objects.filter(course=course).select_related('student')
+    course = courses.get_or_404(course_id)
+    is_member = membership.is_member(request.user, course)
+    if not (is_member or courses.is_teacher(request.user, course.id)):
+        raise HttpError(403, "Anda tidak memiliki akses ke kursus ini")
+    feedback_list = CourseFeedback.objects.filter(course_id=course.id).select_related('student').order_by('-created_at')
     return feedback_list
 
 @apiv1.put("/feedback/{feedback_id}", auth=apiAuth, response=CourseFeedbackOut)
@@ -294,15 +356,20 @@ def edit_feedback(request, feedback_id: int, data: CourseFeedbackUpdateIn):
     Mengedit umpan balik oleh siswa.
     Header: Authorization: Bearer <token>
     """
-    feedback = get_object_or_404(CourseFeedback, id=feedback_id)
-    student_instance = User.objects.get(id=request.user.id)
-    if feedback.student != student_instance:
-        raise HttpError(403, "Anda hanya dapat mengedit umpan balik sendiri")
-    if data.rating is not None:
-        feedback.rating = data.rating
-    if data.feedback_text is not None:
-        feedback.feedback_text = data.feedback_text
-    feedback.save()
+    if data.rating is not None and data.rating not in ratings.RATINGS:
+        raise HttpError(400, "Rating harus antara 1 dan 5")
+    with transaction.atomic():
+        feedback = get_object_or_404(CourseFeedback.objects.select_for_update(), id=feedback_id)
+        student_instance = request.user
+        if feedback.student_id != student_instance.id:
+            raise HttpError(403, "Anda hanya dapat mengedit umpan balik sendiri")
+        old_rating = feedback.rating
+        if data.rating is not None:
+            feedback.rating = data.rating
+        if data.feedback_text is not None:
+            feedback.feedback_text = data.feedback_text
+        feedback.save()
+        ratings.record(feedback.course_id, old_rating, feedback.rating)
     return feedback
 
 @apiv1.delete("/feedback/{feedback_id}", auth=apiAuth, response=MessageResponse)
@@ -311,13 +378,29 @@ def delete_feedback(request, feedback_id: int):
     Menghapus umpan balik oleh siswa.
     Header: Authorization: Bearer <token>
     """
-    feedback = get_object_or_404(CourseFeedback, id=feedback_id)
-    student_instance = User.objects.get(id=request.user.id)
-    if feedback.student != student_instance:
-        raise HttpError(403, f"Anda hanya dapat menghapus umpan balik sendiri {feedback.student} {student_instance} ")
-    feedback.delete()
+    with transaction.atomic():
+        feedback = get_object_or_404(CourseFeedback.objects.select_for_update(), id=feedback_id)
+        student_instance = request.user
+        if feedback.student_id != student_instance.id:
+            raise HttpError(403, f"Anda hanya dapat menghapus umpan balik sendiri {feedback.student} {student_instance} ")
+        feedback.delete()
+        ratings.record(feedback.course_id, old=feedback.rating)
     return {"message": "Umpan balik berhasil dihapus"}
 
+@apiv1.get("/courses/{course_id}/rating", response=CourseRatingOut)
+def show_rating(request, course_id: int):
+    """
+    Menampilkan ringkasan rating kursus (jumlah, total, rata-rata dan histogram 1-5).
+    Tidak memerlukan autentikasi (publik).
+    """
+    summary = ratings.summary(course_id)
+    if summary is None:
+        # Belum ada rating: pastikan kursusnya memang ada
+        courses.get_or_404(course_id)
+        summary = {'course_id': course_id, 'count': 0, 'sum': 0, 'average': None,
+                   'histogram': dict.fromkeys(ratings.RATINGS, 0)}
+    return summary
+
 # ===== CONTENT BOOKMARKING ENDPOINTS =====
 
 @apiv1.post("/bookmark", auth=apiAuth, response=ContentBookmarkOut)
@@ -327,11 +410,8 @@ def add_bookmarking(request, data: ContentBookmarkIn):
     Header: Authorization: Bearer <token>
     """
     content = get_object_or_404(CourseContent, id=data.content_id)
-    student_instance = User.objects.get(id=request.user.id)
-    is_member = CourseMember.objects.filter(
-        course_id=content.course_id, 
-        user_id=request.user.id
-    ).exists()
+    student_instance = request.user
+    is_member = membership.is_member(request.user, content.course_id_id)
     if not is_member:
         raise HttpError(403, f"Anda bukan anggota kursus ini {content.course_id} {request.user.id}")
     bookmark, created = ContentBookmark.objects.get_or_create(
@@ -343,15 +423,16 @@ def add_bookmarking(request, data: ContentBookmarkIn):
     return bookmark
 
 @apiv1.get("/bookmarks", auth=apiAuth, response=List[ContentBookmarkOut])
+@paginate(CursorPagination)
 def show_bookmarks(request):
     """
     Menampilkan semua bookmark yang dibuat siswa.
     Header: Authorization: Bearer <token>
     """
-    student_instance = User.objects.get(id=request.user.id)
+    student_instance = request.user
     bookmarks = ContentBookmark.objects.filter(
         student=student_instance
-    ).select_related('content', 'content__course_id')
+    ).select_related('content').order_by('-created_at')
     return bookmarks
 
 @apiv1.delete("/bookmarks/{bookmark_id}", auth=apiAuth, response=MessageResponse)
@@ -361,8 +442,76 @@ def delete_bookmark(request, bookmark_id: int):
     Header: Authorization: Bearer <token>
     """
     bookmark = get_object_or_404(ContentBookmark, id=bookmark_id)
-    student_instance = User.objects.get(id=request.user.id)
-    if bookmark.student != student_instance:
+    student_instance = request.user
+    if bookmark.student_id != student_instance.id:
         raise HttpError(403, "Anda hanya dapat menghapus bookmark sendiri")
     bookmark.delete()
     return {"message": "Bookmark berhasil dihapus"}
+
+# ===== SEARCH ENDPOINTS =====
+
+@apiv1.get("/search", auth=apiAuth, response=SearchPageOut)
+def search_courses(request, params: Query[SearchIn]):
+    """
+    Mencari kursus dan konten (nama/deskripsi), diurutkan menurut relevansi, dengan cursor.
+    Konten hanya dicari di kursus yang diajar atau diikuti.
+    Header: Authorization: Bearer <token>
+    """
+    return search.search(request.user.id, params.q, params.cursor, params.limit)
+
+@apiv1.get("/courses/suggest", auth=apiAuth, response=List[SuggestionOut])
+def suggest_courses(request, params: Query[SuggestIn]):
+    """
+    Saran kursus dan kategori untuk isian otomatis: nama yang salah satu katanya diawali `q`.
+    Dijawab dari indeks di memori proses, tanpa query database.
+    Header: Authorization: Bearer <token>
+    """
+    return suggest.suggest(params.q, params.limit)
+
+# ===== CATALOG ENDPOINTS =====
+
+@course_router.get("", response=CatalogPageOut)
+def show_catalog(request, filters: Query[CatalogFilterIn]):
+    """
+    Katalog kursus, terbaru dahulu, dengan cursor.
+    Filter: category, teacher, price_min, price_max (inklusif).
+    facets: jumlah kursus per kategori dan per rentang harga (diperbarui berkala, bukan per permintaan).
+    """
+    if filters.price_min is not None and filters.price_max is not None and filters.price_min > filters.price_max:
+        raise HttpError(400, "price_min tidak boleh lebih besar dari price_max")
+    course_list = Course.objects.select_related('teacher', 'category__created_by').order_by('-created_at')
+    if filters.category is not None:
+        course_list = course_list.filter(category_id=filters.category)
+    if filters.teacher is not None:
+        course_list = course_list.filter(teacher_id=filters.teacher)
+    if filters.price_min is not None:
+        course_list = course_list.filter(price__gte=filters.price_min)
+    if filters.price_max is not None:
+        course_list = course_list.filter(price__lte=filters.price_max)
+    page = CursorPagination().paginate_queryset(
+        course_list, CursorPagination.Input(cursor=filters.cursor, limit=filters.limit))
+    page['facets'] = catalog.facets(filters.teacher, filters.category)
+    return page
+
+@category_router.get("", response=List[CategoryResponseSchema])
+def show_categories(request):
+    """
+    Menampilkan semua kategori kursus.
+    """
+    return Category.objects.select_related('created_by')
+
+apiv1.add_router("/courses/", course_router)
+apiv1.add_router("/categories/", category_router)
+
+# ===== STATISTIK CACHE ENDPOINTS =====
+
+@apiv1.get("/stats/cache", auth=apiAuth)
+def show_cache_stats(request):
+    """
+    Menampilkan statistik cache proses ini (keanggotaan kursus, token, pencabutan token, jumlah konten, matriks penyelesaian, indeks saran kursus, facet katalog, feed pengumuman dan data kursus).
+    Header: Authorization: Bearer <token>
+    """
+    return {"membership": membership.stats(), "tokens": auth.stats(), "revocation": revocation.stats(),
+            "progress_totals": progress.stats(), "completion_matrix": dashboard.stats(),
+            "course_suggest": suggest.stats(), "catalog_facets": catalog.stats(),
+            "announcement_feed": announcements.stats(), "courses": courses.stats()}
@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class LmsCoreConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'lms_core'
+
+    def ready(self):
+        # Registers the signal handlers
+        from lms_core import announcements, courses, dashboard, membership, profiles, progress, search, suggest  # noqa: F401
@@ -0,0 +1,195 @@
+import hashlib
+
+import jwt
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth import authenticate
+from django.contrib.auth.signals import user_logged_in
+from django.db import DEFAULT_DB_ALIAS
+from jwt import InvalidKeyError, InvalidTokenError, PyJWTError
+from jwt.algorithms import RSAAlgorithm
+from ninja import Router
+from ninja.errors import AuthenticationError
+from ninja_simple_jwt.auth.ninja_auth import HttpJwtAuth
+from ninja_simple_jwt.auth.views.schemas import (
+    Empty, MobileSignInResponse, MobileTokenRefreshRequest, MobileTokenRefreshResponse, SignInRequest,
+)
+from ninja_simple_jwt.jwt.key_retrieval import InMemoryJwtKeyPair
+from ninja_simple_jwt.jwt.token_operations import (
+    TokenTypes, TokenUserJsonEncoder, decode_token, encode_token,
+    get_refresh_token_for_user, get_token_payload_for_user,
+)
+from ninja_simple_jwt.settings import ninja_simple_jwt_settings
+from ninja_simple_jwt.utils import make_authentication_params
+
+from lms_core import membership, revocation
+from lms_core.cache import LRUCache
+from lms_core.schema import SignOutRequest
+
+# HttpJwtAuth verifies the RS256 signature of the access token on every
+# request, and PyJWT parses the PEM public key again each time. Access tokens
+# live for an hour, so the same token is verified thousands of times.
+# CachedJwtAuth parses the key once per process and keeps verified claims in
+# an LRU keyed by the token's SHA-256; an entry never outlives the token's
+# `exp` claim.
+
+token_cache = LRUCache(
+    maxsize=getattr(settings, 'TOKEN_CACHE_SIZE', 10000),
+    ttl=getattr(settings, 'TOKEN_CACHE_TTL', 300),
+)
+
+# Access tokens also carry the caller's course memberships in the "crs"
+# claim (see membership.token_claim()) unless MEMBERSHIP_TOKEN_CLAIM is off.
+MEMBERSHIP_CLAIM = 'crs'
+MEMBERSHIP_TOKEN_CLAIM = getattr(settings, 'MEMBERSHIP_TOKEN_CLAIM', True)
+
+_public_key = None
+
+
+def public_key():
+    """The verifying key object, parsed from the PEM the first time it is needed."""
+    global _public_key
+    if _public_key is None:
+        _public_key = RSAAlgorithm(RSAAlgorithm.SHA256).prepare_key(InMemoryJwtKeyPair.public_key)
+    return _public_key
+
+
+def verify_access_token(token):
+    """Same checks as ninja_simple_jwt's decode_token, with the parsed key."""
+    claims = jwt.decode(token, public_key(), algorithms=["RS256"], options={'require': ['exp']})
+    if "jti" not in claims:
+        raise InvalidKeyError("Invalid jti claim in JWT.")
+    if "token_type" not in claims:
+        raise InvalidKeyError("Missing token type in JWT.")
+    if claims["token_type"] != TokenTypes.ACCESS:
+        raise InvalidTokenError("Incorrect token type in JWT.")
+    if claims.get(MEMBERSHIP_CLAIM):
+        # Decoded once here, so cache hits get the roles for free
+        claims['course_roles'] = membership.claim_roles(claims[MEMBERSHIP_CLAIM])
+    return claims
+
+
+def token_claims(token):
+    key = hashlib.sha256(token.encode()).digest()
+    claims = token_cache.get(key)
+    if claims is not None:
+        token_cache.stats['hits'] += 1
+        return claims
+    token_cache.stats['misses'] += 1
+    claims = verify_access_token(token)
+    token_cache.set(key, claims, expires=claims['exp'])
+    return claims
+
+
+_claim_fields = None
+
+
+def claim_fields():
+    """(claim, field) pairs of TOKEN_CLAIM_USER_ATTRIBUTE_MAP that are User columns, in model field order."""
+    global _claim_fields
+    if _claim_fields is None:
+        # Model.from_db() hands out the values in concrete_fields order,
+        # whatever the order of the field names it is given
+        claims = {attribute: claim
+                  for claim, attribute in ninja_simple_jwt_settings.TOKEN_CLAIM_USER_ATTRIBUTE_MAP.items()
+                  if isinstance(attribute, str)}
+        _claim_fields = [
+            (claims[field.attname], field.attname)
+            for field in get_user_model()._meta.concrete_fields
+            if field.attname in claims
+        ]
+    return _claim_fields
+
+
+def claims_user(claims):
+    """A User built from token claims without a query.
+
+    The instance looks like a User loaded with .only(<claim fields>): it
+    compares by id and can be assigned to foreign keys, and reading any other
+    field (password, is_staff, ...) loads it from the database. save() only
+    writes the claim fields; pass update_fields so stale claims are not
+    written back.
+    """
+    present = [(claim, field) for claim, field in claim_fields() if claim in claims]
+    fields = [field for _, field in present]
+    if 'id' not in fields:
+        raise InvalidTokenError("Missing user claim in JWT.")
+    values = [claims[claim] for claim, _ in present]
+    user = get_user_model().from_db(DEFAULT_DB_ALIAS, fields, values)
+    user.course_roles = claims.get('course_roles')
+    return user
+
+
+class CachedJwtAuth(HttpJwtAuth):
+    """HttpJwtAuth that verifies each distinct token once per process.
+
+    request.user becomes a claims-backed User (see claims_user()), carrying
+    the token's course memberships as `course_roles` when it has them.
+    """
+
+    def authenticate(self, request, token):
+        try:
+            claims = token_claims(token)
+            request.user = claims_user(claims)
+        except PyJWTError as e:
+            raise AuthenticationError(e)
+        if revocation.is_revoked(claims):
+            raise AuthenticationError("Token has been revoked")
+        # Becomes request.auth, e.g. for sign-out
+        return claims
+
+
+def stats():
+    return token_cache.report()
+
+
+# ===== Token issuing =====
+# Same endpoints as ninja_simple_jwt's mobile_auth_router, but access tokens
+# get the membership claim, computed again from the database on every refresh.
+
+auth_router = Router()
+
+
+def access_token_for(payload, user_id):
+    if MEMBERSHIP_TOKEN_CLAIM:
+        claim = membership.token_claim(user_id)
+        if claim is not None:
+            payload[MEMBERSHIP_CLAIM] = claim
+    return encode_token(payload, TokenTypes.ACCESS, json_encoder=TokenUserJsonEncoder)[0]
+
+
+@auth_router.post("/sign-in", response=MobileSignInResponse, url_name="mobile_signin")
+def sign_in(request, payload: SignInRequest):
+    user = authenticate(**make_authentication_params(payload.dict()))
+    if user is None:
+        raise AuthenticationError()
+    user_logged_in.send(sender=user.__class__, request=request, user=user)
+    refresh_token, _ = get_refresh_token_for_user(user)
+    return {"refresh": refresh_token, "access": access_token_for(get_token_payload_for_user(user), user.id)}
+
+
+@auth_router.post("/token-refresh", response=MobileTokenRefreshResponse, url_name="mobile_token_refresh")
+def token_refresh(request, payload: MobileTokenRefreshRequest):
+    try:
+        decoded = decode_token(payload.refresh, token_type=TokenTypes.REFRESH, verify=True)
+    except PyJWTError:
+        raise AuthenticationError()
+    if revocation.is_revoked(decoded):
+        raise AuthenticationError()
+    claims = {claim: decoded.get(claim) for claim in ninja_simple_jwt_settings.TOKEN_CLAIM_USER_ATTRIBUTE_MAP}
+    return {"access": access_token_for(claims, decoded.get('user_id'))}
+
+
+@auth_router.post("/sign-out", auth=CachedJwtAuth(), response={204: Empty})
+def sign_out(request, payload: SignOutRequest = None):
+    """Revokes the access token used for this request, and the refresh token if one is sent."""
+    revocation.revoke_token(request.auth)
+    if payload is not None and payload.refresh:
+        try:
+            refresh = decode_token(payload.refresh, token_type=TokenTypes.REFRESH, verify=True)
+        except PyJWTError:
+            raise AuthenticationError()
+        if refresh.get('user_id') != request.auth.get('user_id'):
+            raise AuthenticationError()
+        revocation.revoke_token(refresh)
+    return 204, None
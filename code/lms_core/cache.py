@@ -0,0 +1,68 @@
+import threading
+import time
+from collections import Counter, OrderedDict
+
+# Small in-process caches shared by the lookup services (membership, tokens).
+
+
+class LRUCache:
+    """Thread-safe LRU whose entries expire `ttl` seconds after they are set.
+
+    `set()` may pass an earlier wall-clock `expires` for a single entry, e.g.
+    the `exp` claim of a token. Missing and expired keys read as `default`.
+    """
+
+    def __init__(self, maxsize, ttl):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.stats = Counter()
+
+    def get(self, key, default=None):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return default
+            value, expires = entry
+            if expires <= time.time():
+                del self.entries[key]
+                self.stats['expired'] += 1
+                return default
+            self.entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, expires=None):
+        deadline = time.time() + self.ttl
+        if expires is not None:
+            deadline = min(deadline, expires)
+        with self.lock:
+            self.entries[key] = (value, deadline)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+                self.stats['evicted'] += 1
+
+    def invalidate(self, key):
+        with self.lock:
+            if self.entries.pop(key, None) is not None:
+                self.stats['invalidated'] += 1
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+    def report(self, *hit_counters):
+        """Counters plus size and hit rate; `hit_counters` name the hit kinds."""
+        with self.lock:
+            size = len(self.entries)
+            counters = dict(self.stats)
+        hits = sum(counters.get(name, 0) for name in hit_counters or ('hits',))
+        lookups = hits + counters.get('misses', 0)
+        return {
+            **counters,
+            'size': size,
+            'maxsize': self.maxsize,
+            'ttl': self.ttl,
+            'hit_rate': hits / lookups if lookups else 0.0,
+        }
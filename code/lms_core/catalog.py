@@ -0,0 +1,80 @@
+from django.conf import settings
+from django.db.models import Case, Count, Value, When
+
+from lms_core.cache import LRUCache
+from lms_core.models import Category, Course
+
+# Facet counts of the course catalog. Rather than a GROUP BY per request, the
+# number of courses per (category, price bucket) is counted once and kept for
+# CATALOG_FACETS_TTL seconds, for the whole catalog and per teacher (key
+# None / teacher id). Both facets are sums over that table:
+#   - categories: courses per category, over the whole scope (a price range
+#     is free-form and does not line up with the buckets);
+#   - prices: courses per price bucket, within the category filter.
+# Counts lag writes by up to the TTL; no signal drops them, so a busy
+# catalog still costs one GROUP BY per key and TTL.
+
+# Lower edges of the price buckets; the last bucket has no upper bound
+PRICE_BUCKETS = getattr(settings, 'CATALOG_PRICE_BUCKETS', [0, 1, 100000, 250000, 500000])
+
+cache = LRUCache(
+    maxsize=getattr(settings, 'CATALOG_FACETS_CACHE_SIZE', 1000),
+    ttl=getattr(settings, 'CATALOG_FACETS_TTL', 300),
+)
+
+
+def count(teacher_id=None):
+    """{'counts': {(category_id, bucket): courses}, 'names': {category_id: name}} of one scope."""
+    courses = Course.objects.all()
+    if teacher_id is not None:
+        courses = courses.filter(teacher_id=teacher_id)
+    bucket = Case(*[When(price__lt=edge, then=Value(i)) for i, edge in enumerate(PRICE_BUCKETS[1:])],
+                  default=Value(len(PRICE_BUCKETS) - 1))
+    # order_by() drops Meta.ordering, which would otherwise join the GROUP BY
+    rows = courses.order_by().annotate(bucket=bucket).values_list('category_id', 'bucket') \
+        .annotate(total=Count('id'))
+    counts = {(category, bucket): total for category, bucket, total in rows}
+    names = dict(Category.objects.filter(id__in={category for category, _ in counts})
+                 .values_list('id', 'name'))
+    return {'counts': counts, 'names': names}
+
+
+def scope(teacher_id=None):
+    found = cache.get(teacher_id)
+    if found is not None:
+        cache.stats['hits'] += 1
+        return found
+    cache.stats['misses'] += 1
+    found = count(teacher_id)
+    cache.set(teacher_id, found)
+    return found
+
+
+def facets(teacher_id=None, category_id=None):
+    """Category and price-bucket counts of the catalog (or one teacher's courses).
+
+    Price counts are narrowed by `category_id`; category counts are not, so
+    the other categories keep their counts while one is selected.
+    """
+    table = scope(teacher_id)
+    by_category, by_bucket = {}, [0] * len(PRICE_BUCKETS)
+    for (category, bucket), total in table['counts'].items():
+        by_category[category] = by_category.get(category, 0) + total
+        if category_id is None or category == category_id:
+            by_bucket[bucket] += total
+    categories = [
+        {'id': category, 'name': table['names'].get(category, "Tanpa Kategori"), 'count': total}
+        for category, total in by_category.items()
+    ]
+    categories.sort(key=lambda facet: (-facet['count'], facet['name']))
+    prices = [
+        {'min': edge,
+         'max': PRICE_BUCKETS[i + 1] - 1 if i + 1 < len(PRICE_BUCKETS) else None,
+         'count': by_bucket[i]}
+        for i, edge in enumerate(PRICE_BUCKETS)
+    ]
+    return {'categories': categories, 'prices': prices}
+
+
+def stats():
+    return cache.report()
@@ -0,0 +1,89 @@
+from datetime import datetime
+from typing import NamedTuple
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.http import Http404
+
+from lms_core.cache import LRUCache
+from lms_core.models import Course
+
+# Course lookups for the course-scoped handlers. They need a course's id and
+# a few columns, not a model instance: get() answers with a CourseRecord from
+# a bounded in-process LRU and reads the database only on a miss. Missing
+# courses are not cached, so a course created by another process is found
+# right away.
+#
+# Saving or deleting a Course drops its record in this process; other
+# processes (and bulk writes, which send no signals) catch up when the entry
+# expires after COURSE_CACHE_TTL seconds. A record may therefore name a
+# previous teacher: owner checks go through is_teacher(), which always asks
+# the database.
+
+
+class CourseRecord(NamedTuple):
+    id: int
+    name: str
+    teacher_id: int
+    category_id: int | None
+    price: int
+    updated_at: datetime
+
+
+FIELDS = CourseRecord._fields
+
+cache = LRUCache(
+    maxsize=getattr(settings, 'COURSE_CACHE_SIZE', 10000),
+    ttl=getattr(settings, 'COURSE_CACHE_TTL', 300),
+)
+
+
+def get(course_id):
+    """CourseRecord of `course_id`, or None if there is no such course."""
+    record = cache.get(course_id)
+    if record is not None:
+        cache.stats['hits'] += 1
+        return record
+    cache.stats['misses'] += 1
+    row = Course.objects.filter(id=course_id).values_list(*FIELDS).first()
+    if row is None:
+        return None
+    record = CourseRecord(*row)
+    cache.set(course_id, record)
+    return record
+
+
+def get_or_404(course_id):
+    record = get(course_id)
+    if record is None:
+        raise Http404("Kursus tidak ditemukan")
+    return record
+
+
+def is_teacher(user, course_id):
+    """True when `user` teaches `course_id`, read from the database rather than the cache."""
+    return Course.objects.filter(id=course_id, teacher_id=user.id).exists()
+
+
+def invalidate(course_id):
+    cache.invalidate(course_id)
+    # A lookup made by another thread before the write commits would cache
+    # the old record again, so drop it once more after commit
+    transaction.on_commit(lambda: cache.invalidate(course_id))
+
+
+def clear():
+    """Forget every record; for writers that bypass the signals (bulk loads)."""
+    cache.clear()
+
+
+def stats():
+    return cache.report()
+
+
+@receiver(post_save, sender='lms_core.Course')
+@receiver(post_delete, sender='lms_core.Course')
+def course_changed(sender, instance, **kwargs):
+    invalidate(instance.pk)
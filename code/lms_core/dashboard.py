@@ -0,0 +1,117 @@
+import base64
+from itertools import chain
+
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from lms_core.cache import LRUCache
+from lms_core.models import ContentCompletion, CourseContent, CourseMember
+
+# Students x contents completion matrix for the teacher dashboard. The
+# (student_id, content_id) pairs of a course are streamed with
+# values_list().iterator() straight into a NumPy array, so no model instance
+# is built. Rows are the course's students in id order, columns its contents
+# in position order; each row is sent bit-packed (np.packbits, first column
+# in the most significant bit of the first byte) and base64-encoded.
+#
+# Matrices are cached per course for COMPLETION_MATRIX_CACHE_TTL seconds and
+# dropped in this process when a completion, content or membership of the
+# course changes.
+
+ENCODING = 'base64-packbits'
+
+cache = LRUCache(
+    maxsize=getattr(settings, 'COMPLETION_MATRIX_CACHE_SIZE', 100),
+    ttl=getattr(settings, 'COMPLETION_MATRIX_CACHE_TTL', 600),
+)
+
+
+def index_of(keys, values):
+    """Index in `keys` of every element of `values`, -1 where it is absent."""
+    if not len(keys):
+        return np.full(len(values), -1)
+    order = np.argsort(keys)
+    found = order[np.minimum(np.searchsorted(keys, values, sorter=order), len(keys) - 1)]
+    return np.where(keys[found] == values, found, -1)
+
+
+def build(course_id):
+    students = np.fromiter(
+        CourseMember.objects.filter(course_id=course_id, roles='std')
+        .order_by('user_id').values_list('user_id', flat=True),
+        dtype=np.int64)
+    contents = np.fromiter(
+        CourseContent.objects.filter(course_id=course_id)
+        .order_by('position', 'id').values_list('id', flat=True),
+        dtype=np.int64)
+    pairs = ContentCompletion.objects.filter(content__course_id=course_id) \
+        .values_list('student_id', 'content_id').iterator(chunk_size=10000)
+    pairs = np.fromiter(chain.from_iterable(pairs), dtype=np.int64).reshape(-1, 2)
+
+    rows = index_of(students, pairs[:, 0])
+    columns = index_of(contents, pairs[:, 1])
+    # Completions of students who have since left the course are dropped
+    kept = (rows >= 0) & (columns >= 0)
+    matrix = np.zeros((len(students), len(contents)), dtype=bool)
+    matrix[rows[kept], columns[kept]] = True
+
+    packed = np.packbits(matrix, axis=1)
+    student_totals = matrix.sum(axis=1)
+    content_rates = matrix.mean(axis=0) if len(students) else np.zeros(len(contents))
+    return {
+        'course_id': course_id,
+        'encoding': ENCODING,
+        'students': students.tolist(),
+        'contents': contents.tolist(),
+        'rows': [base64.b64encode(row.tobytes()).decode() for row in packed],
+        'student_totals': student_totals.tolist(),
+        'content_rates': np.round(content_rates, 4).tolist(),
+    }
+
+
+def completion_matrix(course_id):
+    matrix = cache.get(course_id)
+    if matrix is not None:
+        cache.stats['hits'] += 1
+        return matrix
+    cache.stats['misses'] += 1
+    matrix = build(course_id)
+    cache.set(course_id, matrix)
+    return matrix
+
+
+def invalidate(course_id):
+    cache.invalidate(course_id)
+    # A matrix built by another thread before the write commits would be
+    # cached again, so drop it once more after commit
+    transaction.on_commit(lambda: cache.invalidate(course_id))
+
+
+def stats():
+    return cache.report()
+
+
+@receiver(post_save, sender='lms_core.ContentCompletion')
+@receiver(post_delete, sender='lms_core.ContentCompletion')
+def completion_changed(sender, instance, **kwargs):
+    if ContentCompletion.content.is_cached(instance):
+        course_id = instance.content.course_id_id
+    else:
+        course_id = CourseContent.objects.filter(id=instance.content_id).values_list('course_id', flat=True).first()
+    if course_id is not None:
+        invalidate(course_id)
+
+
+@receiver(post_save, sender='lms_core.CourseContent')
+@receiver(post_delete, sender='lms_core.CourseContent')
+def content_changed(sender, instance, **kwargs):
+    invalidate(instance.course_id_id)
+
+
+@receiver(post_save, sender='lms_core.CourseMember')
+@receiver(post_delete, sender='lms_core.CourseMember')
+def member_changed(sender, instance, **kwargs):
+    invalidate(instance.course_id_id)
@@ -0,0 +1,515 @@
+import csv
+import json
+import math
+import os
+import random
+import time
+from collections import Counter, namedtuple
+from datetime import datetime, timedelta, timezone as dt_timezone
+from itertools import accumulate
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.db import models, transaction
+
+from lms_core.importer import DUMMY_DATA_FILE, get_backend, refresh_derived
+from lms_core.models import (
+    Category, Course, CourseMember, CourseContent, Comment, UserProfile,
+    CourseAnnouncement, ContentCompletion, CourseFeedback, ContentBookmark,
+)
+
+# Deterministic synthetic data at benchmark scale. Every phase draws from its
+# own random.Random seeded with "<seed>:<phase>", so the same seed and tier
+# always produce the same rows, and timestamps are taken from a fixed window
+# rather than the clock.
+#
+# Distributions:
+# - course popularity follows a Zipf law, so a few courses hold most of the
+#   enrollments and most courses have a handful of students;
+# - courses per student follow a Pareto law (most students join one or two
+#   courses, a long tail joins many);
+# - progress per enrollment is Beta(0.8, 0.8) distributed, so completions per
+#   student are long tailed as well;
+# - contents per course are log-normal around the tier's mean.
+
+Tier = namedtuple('Tier', 'users courses categories contents_per_course courses_per_student')
+
+TIERS = {
+    'S': Tier(users=1_000, courses=50, categories=10, contents_per_course=20, courses_per_student=3),
+    'M': Tier(users=20_000, courses=1_000, categories=30, contents_per_course=30, courses_per_student=4),
+    'L': Tier(users=200_000, courses=10_000, categories=60, contents_per_course=40, courses_per_student=5),
+    # ~1M users, 50k courses, ~5M enrollments and ~100M completions
+    'XL': Tier(users=1_000_000, courses=50_000, categories=100, contents_per_course=40, courses_per_student=5),
+}
+
+# Each kind of generated row: the model it belongs to and its columns, in the
+# order rows are written (parents before children)
+KINDS = {
+    'user': (User, ['id', 'password', 'last_login', 'is_superuser', 'username', 'first_name',
+                    'last_name', 'email', 'is_staff', 'is_active', 'date_joined']),
+    'profile': (UserProfile, ['id', 'user_id', 'phone', 'description', 'profile_picture',
+                              'created_at', 'updated_at']),
+    'category': (Category, ['id', 'name', 'description', 'created_by_id', 'created_at', 'updated_at']),
+    'course': (Course, ['id', 'name', 'description', 'price', 'image', 'teacher_id', 'category_id',
+                        'created_at', 'updated_at']),
+    'content': (CourseContent, ['id', 'name', 'description', 'video_url', 'file_attachment',
+                                'course_id_id', 'parent_id_id', 'position', 'path', 'created_at', 'updated_at']),
+    'announcement': (CourseAnnouncement, ['id', 'course_id', 'teacher_id', 'title', 'content',
+                                          'publish_date', 'is_active', 'created_at', 'updated_at']),
+    'member': (CourseMember, ['id', 'course_id_id', 'user_id_id', 'roles', 'created_at', 'updated_at']),
+    'completion': (ContentCompletion, ['id', 'student_id', 'content_id', 'completed_at']),
+    'feedback': (CourseFeedback, ['id', 'course_id', 'student_id', 'rating', 'feedback_text',
+                                  'created_at', 'updated_at']),
+    'bookmark': (ContentBookmark, ['id', 'student_id', 'content_id', 'created_at']),
+    'comment': (Comment, ['id', 'content_id_id', 'member_id_id', 'comment', 'created_at', 'updated_at']),
+}
+
+START = datetime(2023, 1, 1, tzinfo=dt_timezone.utc)
+SPAN = timedelta(days=730)
+# Scheduled announcements are published after this date
+SCHEDULED = datetime(2030, 1, 1, tzinfo=dt_timezone.utc)
+
+FIRST_NAMES = ['Adi', 'Budi', 'Citra', 'Dewi', 'Eka', 'Fajar', 'Gita', 'Hadi', 'Indah', 'Joko',
+               'Kartika', 'Lestari', 'Made', 'Nina', 'Oka', 'Putri', 'Rizky', 'Sari', 'Tono', 'Wulan']
+LAST_NAMES = ['Pratama', 'Saputra', 'Wijaya', 'Santoso', 'Halim', 'Nugroho', 'Kusuma', 'Siregar',
+              'Hutapea', 'Lubis', 'Utami', 'Rahayu', 'Setiawan', 'Gunawan', 'Hidayat', 'Permana']
+TOPICS = ['Python', 'Django', 'Data Science', 'Machine Learning', 'Web Design', 'Basis Data',
+          'Jaringan', 'Keamanan Siber', 'Statistika', 'Akuntansi', 'Manajemen', 'Desain Grafis',
+          'Fotografi', 'Bahasa Inggris', 'Kalkulus', 'Cloud Computing', 'DevOps', 'Mobile']
+LEVELS = ['Dasar', 'Menengah', 'Lanjut', 'Praktis', 'Intensif']
+WORDS = ('belajar materi konsep praktik contoh latihan studi kasus proyek analisis data sistem '
+         'aplikasi model metode teknik dasar lanjut modul tugas evaluasi ringkasan').split()
+
+
+def zipf_cum_weights(n, exponent=1.1):
+    return list(accumulate(1.0 / (rank ** exponent) for rank in range(1, n + 1)))
+
+
+def iso(value):
+    return value.strftime('%Y-%m-%dT%H:%M:%SZ')
+
+
+class DatasetGenerator:
+    """
+    Produces (kind, row) events for a tier, parents always before children.
+
+    `id_base` maps a kind to the id its rows start after, so a dataset can be
+    added to a database that already has rows. Rows are dicts keyed by the
+    columns in KINDS, plus a few extra keys the file formats need.
+    """
+
+    def __init__(self, tier, seed, id_base=None, password=None):
+        self.tier = TIERS[tier]
+        self.seed = seed
+        self.id_base = id_base or {}
+        # Hashing a password per user would dominate the run, so users written
+        # to the database share one hash; file output keeps plaintext
+        # passwords for the importer to hash
+        self.password_hash = make_password(password) if password else None
+        self.counts = Counter()
+
+    def rng(self, phase):
+        return random.Random(f'{self.seed}:{phase}')
+
+    def next_id(self, kind):
+        self.counts[kind] += 1
+        return self.id_base.get(kind, 0) + self.counts[kind]
+
+    @staticmethod
+    def moment(rng, after=START):
+        return after + (START + SPAN - after) * rng.random()
+
+    @staticmethod
+    def sentence(rng, words):
+        return ' '.join(rng.choice(WORDS) for _ in range(words)).capitalize() + '.'
+
+    def events(self):
+        yield from self.users()
+        yield from self.categories()
+        yield from self.courses()
+        yield from self.contents()
+        yield from self.announcements()
+        yield from self.enrollments()
+
+    def users(self):
+        rng = self.rng('users')
+        self.teachers = max(2, self.tier.users // 50)
+        self.first_user = self.id_base.get('user', 0) + 1
+        for _ in range(self.tier.users):
+            user_id = self.next_id('user')
+            first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+            joined = self.moment(rng)
+            password = f'Pw{rng.randrange(10 ** 8):08d}!'
+            yield 'user', {
+                'id': user_id,
+                'password': self.password_hash or password,
+                'last_login': None,
+                'is_superuser': False,
+                'username': f'{first}{last}{user_id}',
+                'first_name': first,
+                'last_name': last,
+                'email': f'{first}.{last}{user_id}@example.com'.lower(),
+                'is_staff': False,
+                'is_active': True,
+                'date_joined': joined,
+            }
+            if rng.random() < 0.6:
+                yield 'profile', {
+                    'id': self.next_id('profile'),
+                    'user_id': user_id,
+                    'phone': f'+628{rng.randrange(10 ** 9, 10 ** 10)}',
+                    'description': self.sentence(rng, 12),
+                    'profile_picture': None,
+                    'created_at': joined,
+                    'updated_at': self.moment(rng, joined),
+                }
+
+    def categories(self):
+        rng = self.rng('categories')
+        self.category_ids = []
+        for index in range(self.tier.categories):
+            category_id = self.next_id('category')
+            self.category_ids.append(category_id)
+            created = self.moment(rng)
+            yield 'category', {
+                'id': category_id,
+                'name': f'{TOPICS[index % len(TOPICS)]} {category_id}',
+                'description': self.sentence(rng, 10),
+                'created_by_id': self.first_user,
+                'created_at': created,
+                'updated_at': created,
+            }
+
+    def courses(self):
+        rng = self.rng('courses')
+        teacher_weights = zipf_cum_weights(self.teachers)
+        category_weights = zipf_cum_weights(len(self.category_ids))
+        self.course_ids, self.course_teacher, self.course_created = [], [], []
+        self.content_count = []
+        mean = math.log(self.tier.contents_per_course)
+        for _ in range(self.tier.courses):
+            course_id = self.next_id('course')
+            teacher_id = self.first_user + rng.choices(range(self.teachers), cum_weights=teacher_weights)[0]
+            created = self.moment(rng)
+            self.course_ids.append(course_id)
+            self.course_teacher.append(teacher_id)
+            self.course_created.append(created)
+            self.content_count.append(min(300, max(1, round(rng.lognormvariate(mean - 0.18, 0.6)))))
+            yield 'course', {
+                'id': course_id,
+                'name': f'{rng.choice(TOPICS)} {rng.choice(LEVELS)} #{course_id}',
+                'description': self.sentence(rng, 30),
+                'price': rng.choice([0, 0, 99, 149, 199, 299, 499, 999]) * 1000,
+                'image': None,
+                'teacher_id': teacher_id,
+                'category_id': self.category_ids[rng.choices(range(len(self.category_ids)),
+                                                             cum_weights=category_weights)[0]],
+                'created_at': created,
+                'updated_at': self.moment(rng, created),
+            }
+
+    def contents(self):
+        rng = self.rng('contents')
+        self.content_start = []
+        for course_id, count, created in zip(self.course_ids, self.content_count, self.course_created):
+            section_id = None
+            for position in range(count):
+                content_id = self.next_id('content')
+                if position == 0:
+                    self.content_start.append(content_id)
+                # Every sixth content opens a section the following ones belong to
+                is_section = position % 6 == 0
+                path = f'{position:0{CourseContent.PATH_STEP}d}'
+                if not is_section:
+                    path = f'{position - position % 6:0{CourseContent.PATH_STEP}d}{path}'
+                moment = self.moment(rng, created)
+                yield 'content', {
+                    'id': content_id,
+                    'name': f'Materi {position + 1}: {self.sentence(rng, 4)[:-1]}',
+                    'description': self.sentence(rng, 20),
+                    'video_url': f'https://video.example.com/{course_id}/{position + 1}',
+                    'file_attachment': None,
+                    'course_id_id': course_id,
+                    'parent_id_id': None if is_section else section_id,
+                    'position': position,
+                    'path': path,
+                    'created_at': moment,
+                    'updated_at': moment,
+                }
+                if is_section:
+                    section_id = content_id
+
+    def announcements(self):
+        rng = self.rng('announcements')
+        for course_id, teacher_id, created in zip(self.course_ids, self.course_teacher, self.course_created):
+            for _ in range(min(10, int(rng.expovariate(0.5)))):
+                moment = self.moment(rng, created)
+                scheduled = rng.random() < 0.1
+                yield 'announcement', {
+                    'id': self.next_id('announcement'),
+                    'course_id': course_id,
+                    'teacher_id': teacher_id,
+                    'title': self.sentence(rng, 5)[:-1],
+                    'content': self.sentence(rng, 40),
+                    'publish_date': SCHEDULED + (moment - START) if scheduled else moment,
+                    'is_active': rng.random() < 0.9,
+                    'created_at': moment,
+                    'updated_at': moment,
+                }
+
+    def enrollments(self):
+        """Memberships of every student with their completions, feedback, bookmarks and comments."""
+        rng = self.rng('enrollments')
+        order = list(range(len(self.course_ids)))
+        rng.shuffle(order)
+        popularity = zipf_cum_weights(len(order))
+        first_student = self.first_user + self.teachers
+        for student_id in range(first_student, self.first_user + self.tier.users):
+            wanted = min(len(order), max(1, round(self.tier.courses_per_student * rng.paretovariate(1.5) / 3)))
+            chosen = set()
+            for _ in range(wanted * 10):
+                chosen.add(order[rng.choices(range(len(order)), cum_weights=popularity)[0]])
+                if len(chosen) == wanted:
+                    break
+            for course in sorted(chosen):
+                yield from self.enrollment(rng, student_id, course)
+
+    def enrollment(self, rng, student_id, course):
+        course_id = self.course_ids[course]
+        first_content, count = self.content_start[course], self.content_count[course]
+        member_id = self.next_id('member')
+        joined = self.moment(rng, self.course_created[course])
+        yield 'member', {
+            'id': member_id,
+            'course_id_id': course_id,
+            'user_id_id': student_id,
+            'roles': 'ast' if rng.random() < 0.05 else 'std',
+            'created_at': joined,
+            'updated_at': joined,
+        }
+        # Students work through a course in order, so completions are a prefix
+        progress = rng.betavariate(0.8, 0.8)
+        moment = joined
+        for position in range(round(progress * count)):
+            moment = self.moment(rng, moment) if rng.random() < 0.1 else moment + timedelta(hours=rng.random() * 48)
+            yield 'completion', {
+                'id': self.next_id('completion'),
+                'student_id': student_id,
+                'content_id': first_content + position,
+                'completed_at': moment,
+            }
+        if progress > 0.2 and rng.random() < 0.3:
+            moment = self.moment(rng, joined)
+            yield 'feedback', {
+                'id': self.next_id('feedback'),
+                'course_id': course_id,
+                'student_id': student_id,
+                'rating': rng.choices([1, 2, 3, 4, 5], weights=[5, 8, 17, 35, 35])[0],
+                'feedback_text': self.sentence(rng, 15),
+                'created_at': moment,
+                'updated_at': moment,
+            }
+        for position in rng.sample(range(count), min(count, int(rng.expovariate(1.0)))):
+            yield 'bookmark', {
+                'id': self.next_id('bookmark'),
+                'student_id': student_id,
+                'content_id': first_content + position,
+                'created_at': self.moment(rng, joined),
+            }
+        for _ in range(int(rng.expovariate(2.0))):
+            moment = self.moment(rng, joined)
+            yield 'comment', {
+                'id': self.next_id('comment'),
+                'content_id_id': first_content + rng.randrange(count),
+                'member_id_id': member_id,
+                'comment': self.sentence(rng, 25),
+                'created_at': moment,
+                'updated_at': moment,
+                # comments.json identifies the author by user id
+                'user': student_id,
+            }
+
+
+def database_id_base():
+    """Highest existing id of every kind, so generated rows are appended."""
+    return {kind: model.objects.aggregate(top=models.Max('id'))['top'] or 0
+            for kind, (model, _) in KINDS.items()}
+
+
+class DatabaseSink:
+    """
+    Writes events straight into the tables with the importer's write backend.
+    Buffers of every kind are flushed together, parents first, in one
+    transaction whenever `batch_size` rows are pending.
+    """
+
+    def __init__(self, batch_size, backend='auto'):
+        self.batch_size = batch_size
+        self.backend = get_backend(backend)
+        self.fields = {kind: [model._meta.get_field(column) for column in columns]
+                       for kind, (model, columns) in KINDS.items()}
+        self.buffers = {kind: [] for kind in KINDS}
+        self.pending = 0
+        self.written = Counter()
+
+    def add(self, kind, row):
+        self.buffers[kind].append(tuple(row[column] for column in KINDS[kind][1]))
+        self.pending += 1
+        if self.pending >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        with transaction.atomic():
+            for kind, rows in self.buffers.items():
+                if rows:
+                    self.written[kind] += self.backend.insert_rows(KINDS[kind][0], self.fields[kind], rows)
+                    rows.clear()
+        self.pending = 0
+
+    def close(self):
+        self.flush()
+        for model, _ in KINDS.values():
+            self.backend.finish(model)
+        refresh_derived({KINDS[kind][0] for kind, count in self.written.items() if count})
+
+
+class JsonArrayWriter:
+    """Writes a JSON array one item at a time."""
+
+    def __init__(self, filename):
+        self.file = open(filename, 'w')
+        self.file.write('[')
+        self.count = 0
+
+    def add(self, item):
+        self.file.write(',\n' if self.count else '\n')
+        self.file.write(json.dumps(item))
+        self.count += 1
+
+    def close(self):
+        self.file.write('\n]')
+        self.file.close()
+
+
+class FilesSink:
+    """
+    Writes events in the importer's seed formats (user-data.csv,
+    course-data.csv, member-data.csv, contents.json, comments.json and
+    dummyData.json). Ids in these files are positional, so the output is meant
+    for an empty database. Categories and the content hierarchy have no place
+    in these formats and are left out.
+    """
+
+    DUMMY_SECTIONS = {
+        'announcement': 'course_announcements',
+        'completion': 'content_completions',
+        'feedback': 'course_feedbacks',
+        'bookmark': 'content_bookmarks',
+        'profile': 'user_profiles',
+    }
+
+    def __init__(self, path):
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+        self.files = []
+        self.csv = {
+            'user': self.csv_writer('user-data.csv', ['firstname', 'lastname', 'email', 'password', 'username']),
+            'course': self.csv_writer('course-data.csv', ['name', 'url', 'description', 'site', 'price', 'teacher']),
+            'member': self.csv_writer('member-data.csv', ['course_id', 'user_id', 'roles']),
+        }
+        self.json = {
+            'content': JsonArrayWriter(os.path.join(path, 'contents.json')),
+            'comment': JsonArrayWriter(os.path.join(path, 'comments.json')),
+        }
+        # Sections are buffered in their own files and joined on close,
+        # since the generator interleaves them
+        self.sections = {kind: JsonArrayWriter(os.path.join(path, f'.{section}.json'))
+                         for kind, section in self.DUMMY_SECTIONS.items()}
+        self.written = Counter()
+
+    def csv_writer(self, filename, header):
+        file = open(os.path.join(self.path, filename), 'w', newline='')
+        self.files.append(file)
+        writer = csv.writer(file)
+        writer.writerow(header)
+        return writer
+
+    def add(self, kind, row):
+        record = getattr(self, f'{kind}_record')(row) if hasattr(self, f'{kind}_record') else None
+        if record is None:
+            return
+        if kind in self.csv:
+            self.csv[kind].writerow(record)
+        elif kind in self.json:
+            self.json[kind].add(record)
+        else:
+            self.sections[kind].add(record)
+        self.written[kind] += 1
+
+    def user_record(self, row):
+        return [row['first_name'], row['last_name'], row['email'], row['password'], row['username']]
+
+    def course_record(self, row):
+        return [row['name'], f"https://courses.example.com/{row['id']}", row['description'],
+                'Synthetic', row['price'], row['teacher_id']]
+
+    def member_record(self, row):
+        return [row['course_id_id'], row['user_id_id'], row['roles']]
+
+    def content_record(self, row):
+        return {'video_url': row['video_url'], 'course_id': row['course_id_id'],
+                'name': row['name'], 'description': row['description']}
+
+    def comment_record(self, row):
+        return {'content_id': row['content_id_id'], 'user_id': row['user'], 'comment': row['comment']}
+
+    def announcement_record(self, row):
+        return {'id': row['id'], 'course': row['course_id'], 'teacher': row['teacher_id'],
+                'title': row['title'], 'content': row['content'], 'publish_date': iso(row['publish_date']),
+                'is_active': row['is_active'], 'created_at': iso(row['created_at']),
+                'updated_at': iso(row['updated_at'])}
+
+    def completion_record(self, row):
+        return {'id': row['id'], 'student': row['student_id'], 'content': row['content_id'],
+                'completed_at': iso(row['completed_at'])}
+
+    def feedback_record(self, row):
+        return {'id': row['id'], 'course': row['course_id'], 'student': row['student_id'],
+                'rating': row['rating'], 'feedback_text': row['feedback_text'],
+                'created_at': iso(row['created_at']), 'updated_at': iso(row['updated_at'])}
+
+    def bookmark_record(self, row):
+        return {'id': row['id'], 'student': row['student_id'], 'content': row['content_id'],
+                'created_at': iso(row['created_at'])}
+
+    def profile_record(self, row):
+        return {'id': row['id'], 'user': row['user_id'], 'phone': row['phone'],
+                'description': row['description'], 'profile_picture': row['profile_picture'],
+                'created_at': iso(row['created_at']), 'updated_at': iso(row['updated_at'])}
+
+    def close(self):
+        for file in self.files:
+            file.close()
+        for writer in self.json.values():
+            writer.close()
+        with open(os.path.join(self.path, DUMMY_DATA_FILE), 'w') as dummy:
+            dummy.write('{')
+            for index, (kind, section) in enumerate(self.DUMMY_SECTIONS.items()):
+                writer = self.sections[kind]
+                writer.close()
+                dummy.write(f'{"," if index else ""}\n"{section}": ')
+                with open(writer.file.name) as part:
+                    for block in iter(lambda: part.read(1024 * 1024), ''):
+                        dummy.write(block)
+                os.remove(writer.file.name)
+            dummy.write('\n}\n')
+
+
+def generate(tier, seed, sink, id_base=None, password=None):
+    """Feed every event of the dataset into `sink`; returns the seconds taken."""
+    start = time.time()
+    generator = DatasetGenerator(tier, seed, id_base=id_base, password=password)
+    for kind, row in generator.events():
+        sink.add(kind, row)
+    sink.close()
+    return time.time() - start
@@ -0,0 +1,1206 @@
+import csv
+import hashlib
+import io
+import json
+import multiprocessing
+import os
+import queue
+import resource
+import time
+from collections import Counter, defaultdict, deque
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from itertools import groupby, islice
+from operator import itemgetter
+from datetime import datetime
+from functools import partial
+from types import SimpleNamespace
+
+import django
+from django.contrib.auth.models import User
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.core.management.color import no_style
+from django.db import connection, connections, transaction
+from django.db.models import Max
+from django.utils import timezone
+from lms_core.models import Course, CourseMember, CourseContent, Comment, CourseAnnouncement, ContentCompletion, CourseFeedback, ContentBookmark, UserProfile, ImportCheckpoint
+from lms_core import courses, profiles, progress, ratings, search, suggest
+
+# Every source is read exactly once. Before a stage starts, the keys it needs
+# (existing usernames, ids, unique combinations) are loaded with a handful of
+# values_list queries, so the per-row work is pure dictionary/set lookups and
+# the only writes are chunked bulk_create calls.
+#
+# Each stage keeps an ImportCheckpoint row: the sha256 of its source file and
+# how many source rows have been committed. The checkpoint is written in the
+# same transaction as the batch, so after a failure a rerun resumes at the
+# last committed batch, and a stage whose source is unchanged and already
+# completed is skipped without reading it.
+
+DEFAULT_BATCH_SIZE = 1000
+DEFAULT_JOBS = 4
+
+
+class StageResult:
+    """Counters for one import stage."""
+
+    def __init__(self, name):
+        self.name = name
+        # Model the stage writes, set by bulk_insert()
+        self.model = None
+        self.imported = 0
+        self.skipped = Counter()
+        self.notes = []
+        self.started = time.time()
+        self.elapsed = None
+        # Filled in for --profile
+        self.read = 0
+        self.queries = 0
+        self.db_time = 0.0
+        self.hash_time = 0.0
+        self.peak_rss = 0
+
+    def skip(self, reason):
+        self.skipped[reason] += 1
+
+    def finish(self):
+        self.elapsed = time.time() - self.started
+
+    @property
+    def parse_time(self):
+        """Time not spent in the database or waiting for password hashes."""
+        return max(0.0, (self.elapsed or 0.0) - self.db_time - self.hash_time)
+
+    def report(self):
+        elapsed = self.elapsed if self.elapsed is not None else time.time() - self.started
+        rate = self.imported / elapsed if elapsed else 0.0
+        lines = [f"{self.name} imported: {self.imported} ({elapsed:.2f}s, {rate:.0f} rows/sec)"]
+        for reason, count in self.skipped.most_common():
+            lines.append(f"  skipped {count}: {reason}")
+        for note in self.notes:
+            lines.append(f"  {note}")
+        say("\n".join(lines))
+
+
+def say(text):
+    """Print `text` and a newline in a single write; print() writes the newline
+    separately, so output of parallel stages would interleave."""
+    print(text + "\n", end='')
+
+
+def chunked(iterable, size):
+    """Yield lists of at most `size` items from `iterable`."""
+    batch = []
+    for item in iterable:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def bulk_insert(model, objects, result, batch_size, checkpoint=None, position=None, backend=None):
+    """
+    Write `objects` (any iterable) in chunks of `batch_size` through `backend`
+    (picked from the database engine by default).
+
+    With a checkpoint, every chunk is committed together with the number of
+    source rows read so far (`position.offset`, the checkpoint's cursor by
+    default), and the stage is marked completed at the end.
+    """
+    backend = backend or get_backend()
+    result.model = model
+    if checkpoint is not None and position is None:
+        position = checkpoint.cursor
+    for batch in chunked(objects, batch_size):
+        with transaction.atomic():
+            inserted = backend.insert(model, batch)
+            if checkpoint is not None:
+                checkpoint.commit(position.offset)
+        result.imported += inserted
+        if inserted < len(batch):
+            # Written by someone else since the stage loaded its key indexes
+            result.skipped["already in the database"] += len(batch) - inserted
+    backend.finish(model)
+    if checkpoint is not None:
+        checkpoint.commit(position.offset, completed=True)
+    result.finish()
+    return result
+
+
+# ===== WRITE BACKENDS =====
+
+class OrmBackend:
+    """
+    Plain bulk_create; works on every database.
+
+    Every backend skips rows that clash with a unique constraint and returns
+    the number of rows it wrote. bulk_create cannot tell how many it skipped,
+    so this one counts every row.
+    """
+
+    name = 'orm'
+    dry_run = False
+
+    def insert(self, model, objects):
+        model.objects.bulk_create(objects, batch_size=len(objects), ignore_conflicts=True)
+        return len(objects)
+
+    def insert_rows(self, model, fields, rows):
+        """
+        Write plain tuples whose values follow `fields`. The SQL backends keep
+        the values as given; bulk_create still fills auto_now fields.
+        """
+        attnames = [field.attname for field in fields]
+        return self.insert(model, [model(**dict(zip(attnames, row))) for row in rows])
+
+    def finish(self, model):
+        pass
+
+    def planned(self, model, fields):
+        """Rows this backend has been given but not written (see DryRunBackend)."""
+        return []
+
+
+class SqlBackend(OrmBackend):
+    """
+    Base for the raw SQL backends: turns model instances into column tuples
+    the same way bulk_create does (pre_save + get_db_prep_save), without
+    building an INSERT statement per batch.
+    """
+
+    def columns(self, model, objects):
+        # The primary key is only written when the source supplies it
+        include_pk = objects[0].pk is not None
+        return [field for field in model._meta.concrete_fields
+                if include_pk or not field.primary_key]
+
+    def rows(self, fields, objects):
+        for obj in objects:
+            yield tuple(field.get_db_prep_save(field.pre_save(obj, True), connection)
+                        for field in fields)
+
+    def prepared(self, fields, rows):
+        for row in rows:
+            yield tuple(field.get_db_prep_save(value, connection)
+                        for field, value in zip(fields, row))
+
+    def insert(self, model, objects):
+        fields = self.columns(model, objects)
+        return self.write(model, fields, self.rows(fields, objects))
+
+    def insert_rows(self, model, fields, rows):
+        return self.write(model, fields, self.prepared(fields, rows))
+
+    def quoted(self, fields):
+        return ', '.join(connection.ops.quote_name(field.column) for field in fields)
+
+
+class SqliteBackend(SqlBackend):
+    """
+    One prepared INSERT ... ON CONFLICT DO NOTHING run with executemany
+    inside the batch transaction.
+    """
+
+    name = 'sqlite'
+
+    def write(self, model, fields, rows):
+        sql = 'INSERT INTO %s (%s) VALUES (%s) ON CONFLICT DO NOTHING' % (
+            connection.ops.quote_name(model._meta.db_table),
+            self.quoted(fields),
+            ', '.join(['%s'] * len(fields)),
+        )
+        with connection.cursor() as cursor:
+            cursor.executemany(sql, list(rows))
+            return cursor.rowcount
+
+
+class PostgresBackend(SqlBackend):
+    """
+    COPY each batch into a temporary staging table, then merge it with
+    INSERT ... SELECT ... ON CONFLICT DO NOTHING. The staging table is
+    dropped when the batch transaction commits.
+    """
+
+    name = 'postgresql'
+
+    def write(self, model, fields, rows):
+        table = connection.ops.quote_name(model._meta.db_table)
+        staging = connection.ops.quote_name(f'import_staging_{model._meta.db_table}')
+        columns = self.quoted(fields)
+        with connection.cursor() as cursor:
+            cursor.execute(f'CREATE TEMPORARY TABLE {staging} ON COMMIT DROP AS '
+                           f'SELECT {columns} FROM {table} WITH NO DATA')
+            # COPY needs the raw cursor; running it through the wrapper chain
+            # keeps it visible to execute_wrapper (query counts, --profile)
+            cursor._execute_with_wrappers(
+                f'COPY {staging} ({columns}) FROM STDIN WITH (FORMAT csv)', None, False,
+                lambda sql, params, many, context: self.copy(cursor.cursor, sql, rows))
+            cursor.execute(f'INSERT INTO {table} ({columns}) SELECT {columns} FROM {staging} ON CONFLICT DO NOTHING')
+            return cursor.rowcount
+
+    def copy(self, cursor, sql, rows):
+        if hasattr(cursor, 'copy'):
+            # psycopg 3
+            with cursor.copy(sql) as copy:
+                for row in rows:
+                    copy.write(self.csv_line(row))
+        else:
+            # psycopg2
+            buffer = io.StringIO()
+            for row in rows:
+                buffer.write(self.csv_line(row))
+            buffer.seek(0)
+            cursor.copy_expert(sql, buffer)
+
+    @staticmethod
+    def csv_line(row):
+        # In COPY's csv format an unquoted empty field is NULL and a quoted
+        # one is an empty string, so every non-NULL value is quoted
+        return ','.join(
+            '' if value is None else '"%s"' % str(value).replace('"', '""')
+            for value in row
+        ) + '\n'
+
+    def finish(self, model):
+        # Rows with explicit ids do not advance the id sequence
+        with connection.cursor() as cursor:
+            for sql in connection.ops.sequence_reset_sql(no_style(), [model]):
+                cursor.execute(sql)
+
+
+class DryRunBackend(OrmBackend):
+    """
+    Writes nothing. The objects of every batch are kept instead, so later
+    stages resolve their foreign keys against the rows a real run would have
+    created; objects without an id get the next one after the table's
+    current maximum, as the database would usually assign.
+    """
+
+    name = 'dry-run'
+    dry_run = True
+
+    def __init__(self):
+        self.objects = defaultdict(list)
+        self.next_id = {}
+
+    def insert(self, model, objects):
+        if model not in self.next_id:
+            self.next_id[model] = (model.objects.aggregate(last=Max('pk'))['last'] or 0) + 1
+        for obj in objects:
+            if obj.pk is None:
+                obj.pk = self.next_id[model]
+            self.next_id[model] = max(self.next_id[model], obj.pk + 1)
+        self.objects[model].extend(objects)
+        return len(objects)
+
+    def planned(self, model, fields):
+        attnames = [model._meta.get_field(field).attname for field in fields]
+        return [tuple(getattr(obj, attname) for attname in attnames) for obj in self.objects[model]]
+
+
+BACKENDS = {backend.name: backend for backend in (OrmBackend(), SqliteBackend(), PostgresBackend())}
+
+
+def get_backend(name='auto'):
+    """Return the write backend `name`, or the one matching DATABASES['default']['ENGINE'] for 'auto'."""
+    if name != 'auto':
+        return BACKENDS[name]
+    engine = settings.DATABASES['default']['ENGINE']
+    if engine.endswith('sqlite3'):
+        return BACKENDS['sqlite']
+    if engine.endswith(('postgresql', 'postgis')):
+        return BACKENDS['postgresql']
+    return BACKENDS['orm']
+
+
+# ===== CHECKPOINTS =====
+
+def file_hash(filename):
+    digest = hashlib.sha256()
+    with open(filename, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class SourceCursor:
+    """Iterate over source rows starting at `start`, counting rows read."""
+
+    def __init__(self, rows, start=0):
+        self.offset = start
+        self.rows = islice(rows, start, None)
+
+    def __iter__(self):
+        for row in self.rows:
+            self.offset += 1
+            yield row
+
+
+class Checkpoint:
+    """
+    Progress of one stage, stored in ImportCheckpoint.
+
+    A changed source hash (or restart=True) resets the offset to 0; rows that
+    were already imported are then skipped by the stage's key indexes.
+    """
+
+    def __init__(self, stage, source_hash, restart=False):
+        self.record, created = ImportCheckpoint.objects.get_or_create(
+            stage=stage, defaults={'source_hash': source_hash})
+        if restart or self.record.source_hash != source_hash:
+            self.record.source_hash = source_hash
+            self.record.offset = 0
+            self.record.completed = False
+            self.record.save()
+        self.start = self.record.offset
+        self.cursor = None
+
+    @property
+    def completed(self):
+        return self.record.completed
+
+    def track(self, rows):
+        """Wrap `rows` so iteration resumes after the last committed row."""
+        self.cursor = SourceCursor(rows, self.start)
+        return self.cursor
+
+    def commit(self, offset, completed=False):
+        self.record.offset = offset
+        self.record.completed = completed
+        self.record.save(update_fields=['offset', 'completed', 'updated_at'])
+
+
+def parse_datetime(datetime_str):
+    """Parse ISO format datetime string to Django timezone aware datetime"""
+    if datetime_str:
+        dt = datetime.fromisoformat(datetime_str.replace('Z', '+00:00'))
+        # Check if datetime is already timezone-aware
+        if dt.tzinfo is not None:
+            return dt
+        else:
+            return timezone.make_aware(dt)
+    return None
+
+
+class JsonStreamReader:
+    """
+    Incremental reader for the seed JSON files.
+
+    Handles a top-level object of arrays ({"section": [item, ...], ...}) as
+    well as a bare top-level array. Iterating yields (section, item) events as
+    soon as each item is decoded (section is None for a bare array), so memory
+    stays at one item plus the read buffer regardless of the file size.
+    """
+
+    WHITESPACE = ' \t\r\n'
+
+    def __init__(self, fileobj, chunk_size=64 * 1024):
+        self.fileobj = fileobj
+        self.chunk_size = chunk_size
+        self.decoder = json.JSONDecoder()
+        self.buf = ''
+        self.pos = 0
+        self.eof = False
+
+    def _read(self):
+        # Drop what has been consumed already before appending the next chunk
+        if self.pos:
+            self.buf = self.buf[self.pos:]
+            self.pos = 0
+        chunk = self.fileobj.read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+        self.buf += chunk
+        return bool(chunk)
+
+    def _peek(self):
+        """Return the next non-whitespace character ('' at end of file)."""
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in self.WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._read():
+                return ''
+
+    def _expect(self, chars):
+        ch = self._peek()
+        if not ch or ch not in chars:
+            raise ValueError(f"Invalid JSON: expected one of {chars!r}, got {ch!r}")
+        self.pos += 1
+        return ch
+
+    def _value(self):
+        self._peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+                self._read()
+                continue
+            # A number cut off by the end of the buffer ("12" of "12.5e3")
+            # decodes fine, so only accept values followed by a delimiter
+            if not self.eof and (end == len(self.buf) or self.buf[end] not in ',]}' + self.WHITESPACE):
+                self._read()
+                continue
+            self.pos = end
+            return value
+
+    def _array(self, section):
+        self._expect('[')
+        if self._peek() == ']':
+            self.pos += 1
+            return
+        while True:
+            yield section, self._value()
+            if self._expect(',]') == ']':
+                return
+
+    def __iter__(self):
+        if self._peek() == '[':
+            yield from self._array(None)
+            return
+        self._expect('{')
+        if self._peek() == '}':
+            return
+        while True:
+            section = self._value()
+            self._expect(':')
+            if self._peek() == '[':
+                yield from self._array(section)
+            else:
+                yield section, self._value()
+            if self._expect(',}') == '}':
+                return
+
+
+def read_csv(filename):
+    with open(filename) as csvfile:
+        yield from csv.DictReader(csvfile)
+
+
+def read_json(filename):
+    with open(filename) as jsonfile:
+        for _, item in JsonStreamReader(jsonfile):
+            yield item
+
+
+def read_json_sections(filename):
+    """Yield (section, items) for each top-level array, in file order."""
+    with open(filename) as jsonfile:
+        for section, events in groupby(JsonStreamReader(jsonfile), key=itemgetter(0)):
+            yield section, (item for _, item in events)
+
+
+# ===== KEY INDEXES =====
+
+def existing(model, fields, backend=None):
+    """Values of `fields` of every row of `model`, plus the rows a dry run has planned."""
+    rows = list(model.objects.values_list(*fields))
+    if backend is not None:
+        rows.extend(backend.planned(model, fields))
+    return rows
+
+
+def id_set(model, backend=None):
+    return {pk for pk, in existing(model, ['id'], backend)}
+
+
+def pair_set(model, first, second, backend=None):
+    return set(existing(model, [first, second], backend))
+
+
+# ===== PASSWORD HASHING =====
+
+class PasswordHasher:
+    """
+    Hash passwords on a process pool so PBKDF2 uses every core.
+
+    hash_batches() submits batch N+1 to the pool before handing back batch N,
+    so the workers keep hashing while the caller runs bulk_create.
+    """
+
+    def __init__(self, workers):
+        self.workers = max(1, workers)
+        self.hashed = 0
+        self.elapsed = 0.0
+        # Time the importing thread spent hashing or waiting for hashes
+        self.waited = 0.0
+
+    def collect(self, hashes):
+        start = time.time()
+        hashes = list(hashes)
+        self.waited += time.time() - start
+        return hashes
+
+    def hash_batches(self, batches):
+        """Yield (batch, hashed_passwords) pairs in input order."""
+        start = time.time()
+        if self.workers == 1:
+            for batch in batches:
+                yield batch, self.collect(make_password(row['password']) for row in batch)
+                self.hashed += len(batch)
+        else:
+            # spawn, not fork: stages run on threads and forking a threaded
+            # process can copy held locks into the workers
+            context = multiprocessing.get_context('spawn')
+            with ProcessPoolExecutor(max_workers=self.workers, mp_context=context,
+                                     initializer=django.setup) as pool:
+                previous = None
+                for batch in batches:
+                    chunksize = max(1, len(batch) // (self.workers * 4))
+                    hashed = pool.map(make_password, [row['password'] for row in batch], chunksize=chunksize)
+                    if previous is not None:
+                        yield previous[0], self.collect(previous[1])
+                        self.hashed += len(previous[0])
+                    previous = (batch, hashed)
+                if previous is not None:
+                    yield previous[0], self.collect(previous[1])
+                    self.hashed += len(previous[0])
+        self.elapsed = time.time() - start
+
+    def report(self):
+        rate = self.hashed / self.elapsed if self.elapsed else 0.0
+        return (f"password hashing: {self.hashed} hashes in {self.elapsed:.2f}s "
+                f"({rate:.1f} hashes/sec, {self.workers} workers)")
+
+
+# ===== STAGES =====
+
+def import_users(rows, batch_size, workers=1, checkpoint=None, backend=None):
+    result = StageResult("Users")
+    usernames = {username for username, in existing(User, ['username'], backend)}
+    hasher = PasswordHasher(workers)
+    # A dry run writes no users, so it hashes no passwords either
+    dry_run = backend is not None and backend.dry_run
+    # The hasher reads one batch ahead, so the committed offset is the
+    # position of the batch being written, not the position of the reader
+    position = SimpleNamespace(offset=checkpoint.start if checkpoint else 0)
+    offsets = deque()
+
+    def new_rows():
+        for row in rows:
+            if row['username'] in usernames:
+                result.skip("username already exists")
+                continue
+            usernames.add(row['username'])
+            yield row
+
+    def new_batches():
+        for batch in chunked(new_rows(), batch_size):
+            offsets.append(checkpoint.cursor.offset if checkpoint else 0)
+            yield batch
+
+    def build():
+        if dry_run:
+            batches = ((batch, [None] * len(batch)) for batch in new_batches())
+        else:
+            batches = hasher.hash_batches(new_batches())
+        for batch, passwords in batches:
+            position.offset = offsets.popleft()
+            for row, password in zip(batch, passwords):
+                yield User(username=row['username'],
+                           password=password,
+                           email=row['email'],
+                           first_name=row['firstname'],
+                           last_name=row['lastname'])
+        if checkpoint is not None:
+            position.offset = checkpoint.cursor.offset
+
+    bulk_insert(User, build(), result, batch_size, checkpoint, position, backend)
+    if not dry_run:
+        result.notes.append(hasher.report())
+    result.hash_time = hasher.waited
+    return result
+
+
+def import_courses(rows, batch_size, checkpoint=None, backend=None):
+    result = StageResult("Courses")
+    courses = pair_set(Course, 'name', 'teacher', backend)
+    user_ids = id_set(User, backend)
+
+    def build():
+        for row in rows:
+            teacher_id = int(row['teacher'])
+            if (row['name'], teacher_id) in courses:
+                result.skip("course already exists")
+                continue
+            if teacher_id not in user_ids:
+                result.skip("teacher does not exist")
+                continue
+            courses.add((row['name'], teacher_id))
+            yield Course(name=row['name'], price=int(row['price']),
+                         description=row['description'],
+                         teacher_id=teacher_id)
+
+    return bulk_insert(Course, build(), result, batch_size, checkpoint, backend=backend)
+
+
+def import_members(rows, batch_size, checkpoint=None, backend=None):
+    result = StageResult("Course Members")
+    course_ids = id_set(Course, backend)
+    user_ids = id_set(User, backend)
+    combinations = pair_set(CourseMember, 'course_id', 'user_id', backend)
+
+    def build():
+        for row in rows:
+            course_id = int(row['course_id'])
+            user_id = int(row['user_id'])
+            if (course_id, user_id) in combinations:
+                result.skip("duplicate course-user combination")
+                continue
+            if course_id not in course_ids:
+                result.skip("course does not exist")
+                continue
+            if user_id not in user_ids:
+                result.skip("user does not exist")
+                continue
+            combinations.add((course_id, user_id))
+            yield CourseMember(course_id_id=course_id, user_id_id=user_id,
+                               roles=row['roles'])
+
+    return bulk_insert(CourseMember, build(), result, batch_size, checkpoint, backend=backend)
+
+
+def import_contents(rows, batch_size, checkpoint=None, backend=None):
+    result = StageResult("Course Contents")
+    contents = pair_set(CourseContent, 'course_id', 'name', backend)
+    course_ids = id_set(Course, backend)
+    # Contents are appended after the course's existing ones (see CourseContent.position)
+    last_position = dict(CourseContent.objects.values('course_id').annotate(last=Max('position'))
+                         .values_list('course_id', 'last'))
+
+    def build():
+        for row in rows:
+            course_id = int(row['course_id'])
+            if (course_id, row['name']) in contents:
+                result.skip("content already exists")
+                continue
+            if course_id not in course_ids:
+                result.skip("course does not exist")
+                continue
+            contents.add((course_id, row['name']))
+            position = last_position.get(course_id)
+            last_position[course_id] = position = 0 if position is None else position + 1
+            yield CourseContent(course_id_id=course_id,
+                                video_url=row['video_url'], name=row['name'],
+                                description=row['description'], position=position,
+                                path=f'{position:0{CourseContent.PATH_STEP}d}')
+
+    return bulk_insert(CourseContent, build(), result, batch_size, checkpoint, backend=backend)
+
+
+# Seed users that stand in for the comment authors missing from user-data.csv
+SEED_COMMENT_USERS = range(5, 41)
+
+
+def import_comments(rows, batch_size, checkpoint=None, backend=None):
+    result = StageResult("Comments")
+    comments = set(Comment.objects.values_list('content_id', 'member_id', 'comment'))
+    user_ids = id_set(User, backend)
+    content_course = dict(existing(CourseContent, ['id', 'course_id'], backend))
+    member_ids = {
+        (course_id, user_id): member_id
+        for member_id, course_id, user_id
+        in existing(CourseMember, ['id', 'course_id', 'user_id'], backend)
+    }
+
+    def build():
+        for row in rows:
+            user_id = int(row['user_id'])
+            # The seed comments reference users past the 50 in user-data.csv;
+            # those are mapped onto seed users 5-40, the same one on every run
+            if user_id not in user_ids and user_id > 50:
+                user_id = SEED_COMMENT_USERS[user_id % len(SEED_COMMENT_USERS)]
+            content_id = int(row['content_id'])
+            if content_id not in content_course:
+                result.skip("content does not exist")
+                continue
+            if user_id not in user_ids:
+                result.skip("user does not exist")
+                continue
+            member_id = member_ids.get((content_course[content_id], user_id))
+            if member_id is None:
+                result.skip("user is not a member of the content's course")
+                continue
+            key = (content_id, member_id, row['comment'])
+            if key in comments:
+                result.skip("comment already exists")
+                continue
+            comments.add(key)
+            yield Comment(content_id_id=content_id, member_id_id=member_id,
+                          comment=row['comment'])
+
+    return bulk_insert(Comment, build(), result, batch_size, checkpoint, backend=backend)
+
+
+def import_announcements(items, batch_size, checkpoint=None, backend=None):
+    result = StageResult("Course Announcements")
+    announcement_ids = id_set(CourseAnnouncement, backend)
+    course_ids = id_set(Course, backend)
+    user_ids = id_set(User, backend)
+
+    def build():
+        for announcement in items:
+            if announcement['id'] in announcement_ids:
+                result.skip("announcement already exists")
+                continue
+            if announcement['course'] not in course_ids:
+                result.skip("course does not exist")
+                continue
+            if announcement['teacher'] not in user_ids:
+                result.skip("teacher does not exist")
+                continue
+            yield CourseAnnouncement(
+                id=announcement['id'],
+                course_id=announcement['course'],
+                title=announcement['title'],
+                content=announcement['content'],
+                is_active=announcement['is_active'],
+                created_at=parse_datetime(announcement['created_at']),
+                updated_at=parse_datetime(announcement['updated_at']),
+                teacher_id=announcement['teacher'],
+                publish_date=parse_datetime(announcement['publish_date'])
+            )
+
+    return bulk_insert(CourseAnnouncement, build(), result, batch_size, checkpoint, backend=backend)
+
+
+def import_completions(items, batch_size, checkpoint=None, backend=None):
+    result = StageResult("Content Completions")
+    user_ids = id_set(User, backend)
+    content_ids = id_set(CourseContent, backend)
+    combinations = pair_set(ContentCompletion, 'student', 'content', backend)
+
+    def build():
+        for completion in items:
+            combination = (completion['student'], completion['content'])
+            if combination in combinations:
+                result.skip("duplicate user-content combination")
+                continue
+            if completion['student'] not in user_ids:
+                result.skip("user does not exist")
+                continue
+            if completion['content'] not in content_ids:
+                result.skip("content does not exist")
+                continue
+            combinations.add(combination)
+            yield ContentCompletion(
+                id=completion['id'],
+                student_id=completion['student'],
+                content_id=completion['content'],
+                completed_at=parse_datetime(completion['completed_at']),
+            )
+
+    return bulk_insert(ContentCompletion, build(), result, batch_size, checkpoint, backend=backend)
+
+
+def import_feedbacks(items, batch_size, checkpoint=None, backend=None):
+    result = StageResult("Course Feedbacks")
+    user_ids = id_set(User, backend)
+    course_ids = id_set(Course, backend)
+    combinations = pair_set(CourseFeedback, 'student', 'course', backend)
+
+    def build():
+        for feedback in items:
+            combination = (feedback['student'], feedback['course'])
+            if combination in combinations:
+                result.skip("duplicate user-course combination")
+                continue
+            if feedback['student'] not in user_ids:
+                result.skip("user does not exist")
+                continue
+            if feedback['course'] not in course_ids:
+                result.skip("course does not exist")
+                continue
+            combinations.add(combination)
+            yield CourseFeedback(
+                id=feedback['id'],
+                student_id=feedback['student'],
+                course_id=feedback['course'],
+                rating=feedback['rating'],
+                feedback_text=feedback['feedback_text'],
+                created_at=parse_datetime(feedback['created_at']),
+                updated_at=parse_datetime(feedback['updated_at'])
+            )
+
+    return bulk_insert(CourseFeedback, build(), result, batch_size, checkpoint, backend=backend)
+
+
+def import_bookmarks(items, batch_size, checkpoint=None, backend=None):
+    result = StageResult("Content Bookmarks")
+    user_ids = id_set(User, backend)
+    content_ids = id_set(CourseContent, backend)
+    combinations = pair_set(ContentBookmark, 'student', 'content', backend)
+
+    def build():
+        for bookmark in items:
+            combination = (bookmark['student'], bookmark['content'])
+            if combination in combinations:
+                result.skip("duplicate user-content combination")
+                continue
+            if bookmark['student'] not in user_ids:
+                result.skip("user does not exist")
+                continue
+            if bookmark['content'] not in content_ids:
+                result.skip("content does not exist")
+                continue
+            combinations.add(combination)
+            yield ContentBookmark(
+                id=bookmark['id'],
+                student_id=bookmark['student'],
+                content_id=bookmark['content'],
+                created_at=parse_datetime(bookmark['created_at']),
+            )
+
+    return bulk_insert(ContentBookmark, build(), result, batch_size, checkpoint, backend=backend)
+
+
+def import_profiles(items, batch_size, checkpoint=None, backend=None):
+    result = StageResult("User Profiles")
+    user_ids = id_set(User, backend)
+    profile_ids = id_set(UserProfile, backend)
+    profile_users = {user for user, in existing(UserProfile, ['user'], backend)}
+
+    def build():
+        for profile in items:
+            if profile['user'] in profile_users or profile['id'] in profile_ids:
+                result.skip("user already has a profile")
+                continue
+            if profile['user'] not in user_ids:
+                result.skip("user does not exist")
+                continue
+            profile_users.add(profile['user'])
+            yield UserProfile(
+                id=profile['id'],
+                user_id=profile['user'],
+                phone=profile['phone'],
+                description=profile['description'],
+                profile_picture=profile['profile_picture'],
+                created_at=parse_datetime(profile['created_at']),
+                updated_at=parse_datetime(profile['updated_at'])
+            )
+
+    return bulk_insert(UserProfile, build(), result, batch_size, checkpoint, backend=backend)
+
+
+# ===== STAGE GRAPH =====
+
+# Stages that read their own file: (key, stage, file, reader, dependencies)
+FILE_STAGES = [
+    ('users', import_users, 'user-data.csv', read_csv, ()),
+    ('courses', import_courses, 'course-data.csv', read_csv, ('users',)),
+    ('members', import_members, 'member-data.csv', read_csv, ('users', 'courses')),
+    ('contents', import_contents, 'contents.json', read_json, ('courses',)),
+    ('comments', import_comments, 'comments.json', read_json, ('contents', 'members')),
+]
+
+DUMMY_DATA_FILE = 'dummyData.json'
+
+# Sections of dummyData.json: the stage that loads each and its dependencies
+DUMMY_DATA_STAGES = {
+    'course_announcements': (import_announcements, ('courses', 'users')),
+    'content_completions': (import_completions, ('contents', 'users')),
+    'course_feedbacks': (import_feedbacks, ('courses', 'users')),
+    'content_bookmarks': (import_bookmarks, ('contents', 'users')),
+    'user_profiles': (import_profiles, ('users',)),
+}
+
+
+def refresh_derived(written):
+    """
+    Bring the caches and derived tables up to date after a bulk load, which
+    bypasses signals and the rating counters. `written` is the set of models
+    that got rows; the rebuilds that depend on none of them are skipped.
+    """
+    if not written:
+        return
+    profiles.invalidate_all()
+    if CourseFeedback in written:
+        ratings.rebuild()
+    if written & {CourseContent, ContentCompletion}:
+        progress.rebuild()
+    if written & {Course, CourseContent}:
+        search.rebuild()
+    suggest.reset()
+    courses.clear()
+
+
+def in_own_connection(func, *args):
+    """Run `func` on the current thread and close the thread's DB connections afterwards."""
+    try:
+        return func(*args)
+    finally:
+        connections.close_all()
+
+
+class InlineExecutor:
+    """Executor that runs every call immediately on the calling thread."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def submit(self, func, *args):
+        future = Future()
+        try:
+            future.set_result(func(*args))
+        except Exception as exc:
+            future.set_exception(exc)
+        return future
+
+
+def run_graph(nodes, jobs):
+    """
+    Run every node of `nodes` ({key: (func, dependencies)}) as soon as all of
+    its dependencies have succeeded, at most `jobs` at a time. Each node runs
+    on a pool thread and therefore on its own database connection. With
+    jobs=0 the nodes run one by one on the calling thread and its connection.
+
+    Returns {key: error} for the nodes that failed or could not run.
+    """
+    pending = dict(nodes)
+    done, failed, running = set(), {}, {}
+    if jobs == 0:
+        pool, wrap = InlineExecutor(), (lambda func: func)
+    else:
+        pool, wrap = ThreadPoolExecutor(max_workers=max(1, jobs)), partial(partial, in_own_connection)
+    with pool:
+        while pending or running:
+            progress = True
+            while progress:
+                progress = False
+                for key, (func, deps) in list(pending.items()):
+                    broken = [dep for dep in deps if dep in failed]
+                    if broken:
+                        failed[key] = RuntimeError(f"not run, failed dependency: {', '.join(broken)}")
+                    elif all(dep in done for dep in deps):
+                        running[pool.submit(wrap(func))] = key
+                    else:
+                        continue
+                    del pending[key]
+                    progress = True
+            if not running:
+                for key in pending:
+                    failed[key] = RuntimeError("not run, unresolved dependencies")
+                break
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                key = running.pop(future)
+                if future.exception() is not None:
+                    failed[key] = future.exception()
+                else:
+                    done.add(key)
+    return failed
+
+
+class QueryProfiler:
+    """execute_wrapper counting the queries of one stage and the time spent in them."""
+
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.time()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries += 1
+            self.db_time += time.time() - start
+
+
+def peak_rss():
+    """Peak resident set size of this process and its children, in kilobytes."""
+    return (resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            + resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+
+
+class SectionFeed:
+    """
+    Bounded hand-off of one dummyData.json section from the file reader to
+    the thread writing it. Iterating yields items until the section ends and
+    raises if the reader failed part way.
+    """
+
+    END = object()
+    FAILED = object()
+
+    def __init__(self, maxsize):
+        self.queue = queue.Queue(maxsize)
+        self.finished = False
+
+    def put(self, item):
+        self.queue.put(item)
+
+    def close(self):
+        self.queue.put(self.END)
+
+    def fail(self):
+        self.queue.put(self.FAILED)
+
+    def __iter__(self):
+        while not self.finished:
+            item = self.queue.get()
+            if item is self.END or item is self.FAILED:
+                self.finished = True
+                if item is self.FAILED:
+                    raise RuntimeError(f"Reading {DUMMY_DATA_FILE} failed")
+                return
+            yield item
+
+    def drain(self):
+        """Discard the rest of the section so the reader never blocks on it."""
+        while not self.finished:
+            item = self.queue.get()
+            self.finished = item is self.END or item is self.FAILED
+
+
+class Importer:
+    """
+    Runs the import as a dependency graph of stages.
+
+    Stages whose dependencies are satisfied run concurrently (up to `jobs`),
+    each on its own thread and database connection. dummyData.json is read
+    once and every section is streamed to its own writer thread, so its five
+    stages also run side by side.
+
+    SQLite takes one writer at a time, so concurrent stages would fail with
+    "database is locked": there every stage runs on the calling thread, one
+    after the other. Passwords are still hashed on the `workers` process pool.
+
+    A dry run reads and validates every source on the calling thread through
+    DryRunBackend: foreign keys resolve against the database and the rows
+    earlier stages would have created, but nothing is written (no rows, no
+    checkpoints, no sequence resets) and no password is hashed.
+    """
+
+    def __init__(self, path, batch_size=DEFAULT_BATCH_SIZE, workers=1, jobs=DEFAULT_JOBS, restart=False,
+                 backend='auto', dry_run=False):
+        self.path = path
+        self.backend = DryRunBackend() if dry_run else get_backend(backend)
+        self.batch_size = batch_size
+        self.workers = workers
+        self.jobs = 0 if dry_run or connection.vendor == 'sqlite' else jobs
+        self.restart = restart or dry_run
+        self.dry_run = dry_run
+        # (key, StageResult) of every stage that ran, in completion order
+        self.results = []
+
+    def graph(self):
+        nodes = {}
+        for key, stage, filename, reader, deps in FILE_STAGES:
+            nodes[key] = (partial(self.run_file_stage, key, stage, filename, reader), deps)
+        dummy_deps = sorted({dep for _, deps in DUMMY_DATA_STAGES.values() for dep in deps})
+        nodes['dummy_data'] = (self.run_dummy_data, dummy_deps)
+        return nodes
+
+    def run(self):
+        """Run the whole graph; returns {key: error} for stages that did not complete."""
+        failed = run_graph(self.graph(), self.jobs)
+        if not self.dry_run:
+            refresh_derived({result.model for _, result in self.results if result.imported})
+        return failed
+
+    def run_stage(self, key, stage, rows, source_hash, **kwargs):
+        if self.dry_run:
+            checkpoint, cursor = None, SourceCursor(rows)
+        else:
+            checkpoint = Checkpoint(key, source_hash, restart=self.restart)
+            if checkpoint.completed:
+                say(f"{key}: source unchanged since the last import, skipped")
+                return
+            cursor = checkpoint.track(rows)
+        start = cursor.offset
+        profiler = QueryProfiler()
+        with connection.execute_wrapper(profiler):
+            result = stage(cursor, self.batch_size, checkpoint=checkpoint, backend=self.backend, **kwargs)
+        result.read = cursor.offset - start
+        result.queries = profiler.queries
+        result.db_time = profiler.db_time
+        result.peak_rss = peak_rss()
+        self.results.append((key, result))
+        result.report()
+        return result
+
+    def profile_table(self):
+        """Per-stage profile as text lines (rows, queries, time split, peak RSS)."""
+        header = ('stage', 'read', 'imported', 'skipped', 'queries', 'parse s', 'db s', 'hash s', 'total s', 'peak MB')
+        rows = [header]
+        for key, result in self.results:
+            rows.append((
+                key, result.read, result.imported, sum(result.skipped.values()), result.queries,
+                f'{result.parse_time:.2f}', f'{result.db_time:.2f}', f'{result.hash_time:.2f}',
+                f'{result.elapsed or 0.0:.2f}', f'{result.peak_rss / 1024:.1f}',
+            ))
+        widths = [max(len(str(row[i])) for row in rows) for i in range(len(header))]
+        lines = ['  '.join(str(value).ljust(width) if i == 0 else str(value).rjust(width)
+                           for i, (value, width) in enumerate(zip(row, widths)))
+                 for row in rows]
+        lines.insert(1, '  '.join('-' * width for width in widths))
+        for key, result in self.results:
+            for reason, count in result.skipped.most_common():
+                lines.append(f"{key}: skipped {count}: {reason}")
+        return lines
+
+    def run_file_stage(self, key, stage, filename, reader):
+        filename = os.path.join(self.path, filename)
+        kwargs = {'workers': self.workers} if stage is import_users else {}
+        self.run_stage(key, stage, reader(filename), file_hash(filename), **kwargs)
+
+    def run_section(self, section, feed, source_hash):
+        stage, _ = DUMMY_DATA_STAGES[section]
+        try:
+            self.run_stage(section, stage, feed, source_hash)
+        finally:
+            feed.drain()
+
+    def run_dummy_data(self):
+        filename = os.path.join(self.path, DUMMY_DATA_FILE)
+        try:
+            source_hash = file_hash(filename)
+        except FileNotFoundError:
+            say(f"{DUMMY_DATA_FILE} not found, skipping dummy data")
+            return
+        done = ImportCheckpoint.objects.filter(
+            stage__in=DUMMY_DATA_STAGES, source_hash=source_hash, completed=True).count()
+        if done == len(DUMMY_DATA_STAGES) and not self.restart:
+            say(f"{DUMMY_DATA_FILE} unchanged since the last import, skipped")
+            return
+
+        if self.jobs == 0:
+            # Sequential: each section is loaded as the reader reaches it
+            for section, items in read_json_sections(filename):
+                if section not in DUMMY_DATA_STAGES:
+                    say(f"Unknown section in {DUMMY_DATA_FILE}: {section}")
+                    continue
+                self.run_stage(section, DUMMY_DATA_STAGES[section][0], items, source_hash)
+            return
+
+        futures = []
+        with ThreadPoolExecutor(max_workers=len(DUMMY_DATA_STAGES)) as pool:
+            feed = None
+            try:
+                for section, items in read_json_sections(filename):
+                    if section not in DUMMY_DATA_STAGES:
+                        say(f"Unknown section in {DUMMY_DATA_FILE}: {section}")
+                        continue
+                    feed = SectionFeed(maxsize=self.batch_size * 2)
+                    futures.append(pool.submit(in_own_connection, self.run_section, section, feed, source_hash))
+                    for item in items:
+                        feed.put(item)
+                    feed.close()
+                    feed = None
+            except BaseException:
+                if feed is not None:
+                    feed.fail()
+                raise
+        for future in futures:
+            if future.exception() is not None:
+                raise future.exception()
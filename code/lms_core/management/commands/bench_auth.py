@@ -0,0 +1,41 @@
+import time
+
+from django.contrib.auth.models import AnonymousUser, User
+from django.core.management.base import BaseCommand, CommandError
+from django.test import RequestFactory
+from ninja_simple_jwt.auth.ninja_auth import HttpJwtAuth
+from ninja_simple_jwt.jwt.token_operations import get_access_token_for_user
+
+from lms_core import auth
+
+
+class Command(BaseCommand):
+    help = "Mengukur biaya autentikasi JWT per request: HttpJwtAuth vs CachedJwtAuth"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=2000,
+                            help="authenticated requests to simulate")
+        parser.add_argument('--tokens', type=int, default=50,
+                            help="distinct access tokens the requests are spread over")
+
+    def handle(self, *args, **options):
+        users = list(User.objects.all()[:options['tokens']])
+        if not users:
+            raise CommandError("No users to issue tokens for, import or generate data first")
+        tokens = [get_access_token_for_user(user)[0] for user in users]
+        factory = RequestFactory()
+        requests = []
+        for i in range(options['requests']):
+            request = factory.get('/', HTTP_AUTHORIZATION=f'Bearer {tokens[i % len(tokens)]}')
+            request.user = AnonymousUser()
+            requests.append(request)
+
+        auth.token_cache.clear()
+        for name, authenticator in (('HttpJwtAuth', HttpJwtAuth()), ('CachedJwtAuth', auth.CachedJwtAuth())):
+            start = time.perf_counter()
+            for request in requests:
+                authenticator(request)
+            elapsed = time.perf_counter() - start
+            self.stdout.write(f"{name:<14} {elapsed / len(requests) * 1e6:8.1f} us/request "
+                              f"({len(requests)} requests, {len(tokens)} tokens)")
+        self.stdout.write(str(auth.stats()))
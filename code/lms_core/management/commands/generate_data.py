@@ -0,0 +1,47 @@
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from lms_core.generator import TIERS, DatabaseSink, FilesSink, database_id_base, generate
+from lms_core.importer import BACKENDS, DEFAULT_BATCH_SIZE
+
+
+class Command(BaseCommand):
+    help = "Membuat dataset sintetis yang deterministik (seed + tier S/M/L/XL) untuk benchmark"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tier', default='S', choices=list(TIERS),
+                            help="dataset size: " + ', '.join(
+                                f"{name}={tier.users} users/{tier.courses} courses" for name, tier in TIERS.items()))
+        parser.add_argument('--seed', type=int, default=1,
+                            help="the same seed and tier always produce the same data")
+        parser.add_argument('--output', default='db', choices=['db', 'files'],
+                            help="write into the database, or into the importer's seed file formats")
+        parser.add_argument('--path', default=os.path.join(settings.BASE_DIR, 'generated_data'),
+                            help="directory for --output files")
+        parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE * 10,
+                            help="rows per database transaction")
+        parser.add_argument('--backend', default='auto', choices=['auto', *BACKENDS],
+                            help="database write path, as for import_data")
+        parser.add_argument('--password', default='password',
+                            help="password shared by every generated user written to the database")
+
+    def handle(self, *args, **options):
+        if options['output'] == 'db':
+            sink = DatabaseSink(options['batch_size'], options['backend'])
+            self.stdout.write(f"Generating tier {options['tier']} (seed {options['seed']}) "
+                              f"into the database ({sink.backend.name} backend)")
+            elapsed = generate(options['tier'], options['seed'], sink,
+                               id_base=database_id_base(), password=options['password'])
+        else:
+            sink = FilesSink(options['path'])
+            self.stdout.write(f"Generating tier {options['tier']} (seed {options['seed']}) "
+                              f"into {options['path']}")
+            elapsed = generate(options['tier'], options['seed'], sink)
+
+        total = sum(sink.written.values())
+        for kind, count in sink.written.items():
+            self.stdout.write(f"  {kind}: {count}")
+        self.stdout.write(self.style.SUCCESS(
+            f"{total} rows in {elapsed:.1f}s ({total / elapsed if elapsed else 0:.0f} rows/sec)"))
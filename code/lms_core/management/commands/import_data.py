@@ -0,0 +1,53 @@
+import os
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from lms_core.importer import BACKENDS, DEFAULT_BATCH_SIZE, DEFAULT_JOBS, Importer
+
+
+class Command(BaseCommand):
+    help = "Import data awal LMS (user, kursus, anggota, konten, komentar dan dummyData.json)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--path', default=os.path.join(settings.BASE_DIR, 'csv_data'),
+                            help="directory containing the seed files")
+        parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE,
+                            help="rows per bulk_create batch")
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                            help="processes used to hash user passwords")
+        parser.add_argument('--jobs', type=int, default=DEFAULT_JOBS,
+                            help="stages allowed to run at the same time (SQLite always runs them one by one)")
+        parser.add_argument('--restart', action='store_true',
+                            help="ignore saved checkpoints and read every source from the start")
+        parser.add_argument('--backend', default='auto', choices=['auto', *BACKENDS],
+                            help="write path; auto picks it from DATABASES['default']['ENGINE']")
+        parser.add_argument('--dry-run', action='store_true',
+                            help="read and validate every source against the database without writing anything")
+        parser.add_argument('--profile', action='store_true',
+                            help="print rows, queries, time and peak memory per stage")
+
+    def handle(self, *args, **options):
+        start_time = time.time()
+        importer = Importer(
+            options['path'],
+            batch_size=options['batch_size'],
+            workers=options['workers'],
+            jobs=options['jobs'],
+            restart=options['restart'],
+            backend=options['backend'],
+            dry_run=options['dry_run'],
+        )
+        self.stdout.write(f"Write backend: {importer.backend.name}")
+        failed = importer.run()
+        self.stdout.write("--- %s seconds ---" % (time.time() - start_time))
+        if options['profile']:
+            self.stdout.write("\n".join(importer.profile_table()))
+        if options['dry_run']:
+            self.stdout.write("Dry run: nothing has been written")
+        if failed:
+            for key, error in failed.items():
+                self.stderr.write(f"{key}: {error}")
+            raise CommandError(f"Import failed: {', '.join(failed)}")
+        self.stdout.write(self.style.SUCCESS("All imports completed!"))
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from lms_core import progress
+
+
+class Command(BaseCommand):
+    help = "Menyusun ulang bitset progres siswa dari data penyelesaian konten"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--check', action='store_true',
+                            help="only report the (student, course) bitsets that have drifted")
+
+    def handle(self, *args, **options):
+        drifted = progress.rebuild(dry_run=options['check'])
+        if not drifted:
+            self.stdout.write(self.style.SUCCESS("Every progress bitset matches the completion rows"))
+            return
+        action = "out of date" if options['check'] else "rebuilt"
+        self.stdout.write(f"{len(drifted)} progress bitsets {action}: "
+                          f"{', '.join(f'{student}/{course}' for student, course in drifted[:20])}"
+                          f"{' ...' if len(drifted) > 20 else ''}")
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from lms_core import ratings
+
+
+class Command(BaseCommand):
+    help = "Menyusun ulang ringkasan rating kursus dari data umpan balik"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--check', action='store_true',
+                            help="only report the courses whose summary has drifted")
+
+    def handle(self, *args, **options):
+        drifted = ratings.rebuild(dry_run=options['check'])
+        if not drifted:
+            self.stdout.write(self.style.SUCCESS("Every rating summary matches the feedback rows"))
+            return
+        action = "out of date" if options['check'] else "rebuilt"
+        self.stdout.write(f"{len(drifted)} course summaries {action}: "
+                          f"{', '.join(map(str, drifted[:20]))}{' ...' if len(drifted) > 20 else ''}")
@@ -0,0 +1,21 @@
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from lms_core import revocation
+
+
+class Command(BaseCommand):
+    help = "Mencabut semua token JWT milik pengguna (misalnya setelah akun disusupi)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('usernames', nargs='+')
+
+    def handle(self, *args, **options):
+        users = dict(User.objects.filter(username__in=options['usernames']).values_list('username', 'id'))
+        missing = set(options['usernames']) - set(users)
+        if missing:
+            raise CommandError(f"Unknown users: {', '.join(sorted(missing))}")
+        for username, user_id in users.items():
+            revocation.revoke_user(user_id)
+            self.stdout.write(f"Revoked every token of {username}")
+        self.stdout.write(f"Other processes drop them within {revocation.REFRESH_INTERVAL}s")
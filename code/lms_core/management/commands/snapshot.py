@@ -0,0 +1,44 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from lms_core import snapshot
+from lms_core.generator import TIERS
+
+
+class Command(BaseCommand):
+    help = "Simpan atau pulihkan snapshot database untuk benchmark dan pengujian"
+
+    def add_arguments(self, parser):
+        parser.add_argument('action', choices=['save', 'restore', 'list', 'remove'])
+        parser.add_argument('--tier', default='S',
+                            help=f"dataset label the snapshot is keyed by, usually a generator tier ({', '.join(TIERS)})")
+        parser.add_argument('--dir', default=snapshot.SNAPSHOT_DIR,
+                            help="directory the snapshots are kept in")
+        parser.add_argument('--force', action='store_true',
+                            help="overwrite an existing snapshot on save")
+        parser.add_argument('--jobs', type=int, default=4,
+                            help="parallel pg_restore jobs (PostgreSQL only)")
+
+    def handle(self, *args, **options):
+        try:
+            getattr(self, options['action'])(options)
+        except snapshot.SnapshotError as error:
+            raise CommandError(str(error))
+
+    def save(self, options):
+        path = snapshot.save(options['tier'], options['dir'], force=options['force'])
+        self.stdout.write(self.style.SUCCESS(f"Snapshot saved to {path}"))
+
+    def restore(self, options):
+        path = snapshot.restore(options['tier'], options['dir'], jobs=options['jobs'])
+        self.stdout.write(self.style.SUCCESS(f"Database restored from {path}"))
+
+    def list(self, options):
+        state = snapshot.migration_state()
+        for info in snapshot.available(options['dir']):
+            current = '*' if info['key'].endswith(state) else ' '
+            self.stdout.write(f"{current} {info['key']:<24} {info['engine']:<10} {info['size'] / 2**20:8.1f} MB")
+        self.stdout.write(f"(* = matches the current migration state {state})")
+
+    def remove(self, options):
+        snapshot.remove(snapshot.snapshot_key(options['tier']), options['dir'])
+        self.stdout.write(f"Snapshot {options['tier']} removed")
@@ -0,0 +1,161 @@
+import base64
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from lms_core import models
+from lms_core.cache import LRUCache
+
+# Course membership lookups, answered from (in order):
+#   1. a memo that lives for one request, so a handler and the model checks it
+#      triggers never ask twice;
+#   2. a bounded in-process LRU keyed by (user, course) whose entries expire
+#      after MEMBERSHIP_CACHE_TTL seconds;
+#   3. the database.
+# Both "member with role X" and "not a member" answers are cached. Saving or
+# deleting a CourseMember drops the pair from both caches in this process;
+# other processes (and bulk writes, which send no signals) catch up when the
+# entry expires.
+
+NOT_MEMBER = ''
+
+# Access tokens may carry the caller's memberships (see token_claim()); users
+# in more courses than this get no claim and are checked against the cache/DB.
+TOKEN_CLAIM_MAX_COURSES = getattr(settings, 'MEMBERSHIP_TOKEN_CLAIM_MAX_COURSES', 256)
+
+_request_memo = ContextVar('membership_request_memo', default=None)
+
+
+def _id(value):
+    """Accept model instances, request.user (claims only) or plain ids."""
+    return getattr(value, 'id', value)
+
+
+cache = LRUCache(
+    maxsize=getattr(settings, 'MEMBERSHIP_CACHE_SIZE', 10000),
+    ttl=getattr(settings, 'MEMBERSHIP_CACHE_TTL', 60),
+)
+
+
+def role(user, course):
+    """Role of `user` in `course` ('std', 'ast'), or NOT_MEMBER."""
+    key = (_id(user), _id(course))
+    # Memberships from the access token. Only positive answers are trusted:
+    # a course joined after the token was issued is not in it yet
+    token_roles = getattr(user, 'course_roles', None)
+    if token_roles and key[1] in token_roles:
+        cache.stats['token_hits'] += 1
+        return token_roles[key[1]]
+    memo = _request_memo.get()
+    if memo is not None and key in memo:
+        cache.stats['request_hits'] += 1
+        return memo[key]
+    found = cache.get(key)
+    if found is not None:
+        cache.stats['hits'] += 1
+    else:
+        cache.stats['misses'] += 1
+        found = models.CourseMember.objects.filter(
+            course_id=key[1], user_id=key[0]
+        ).values_list('roles', flat=True).first() or NOT_MEMBER
+        cache.set(key, found)
+    if memo is not None:
+        memo[key] = found
+    return found
+
+
+def is_member(user, course, roles=None):
+    """True when `user` belongs to `course`, optionally only with one of `roles`."""
+    found = role(user, course)
+    if roles is None:
+        return found != NOT_MEMBER
+    return found in roles
+
+
+def invalidate(user, course):
+    key = (_id(user), _id(course))
+    cache.invalidate(key)
+    memo = _request_memo.get()
+    if memo is not None:
+        memo.pop(key, None)
+
+
+def stats():
+    return cache.report('token_hits', 'request_hits', 'hits')
+
+
+# ===== Token claim =====
+# Course ids are sorted and delta-encoded as unsigned LEB128 varints, then
+# base64url'd: a student in 20 courses with ids near 10^5 costs ~30 bytes.
+# The claim is {"m": <all courses>, "a": <courses where the role is 'ast'>}.
+
+def encode_ids(ids):
+    out = bytearray()
+    previous = 0
+    for value in sorted(ids):
+        delta, previous = value - previous, value
+        while delta >= 0x80:
+            out.append(delta & 0x7f | 0x80)
+            delta >>= 7
+        out.append(delta)
+    return base64.urlsafe_b64encode(bytes(out)).rstrip(b'=').decode()
+
+
+def decode_ids(text):
+    data = base64.urlsafe_b64decode(text + '=' * (-len(text) % 4))
+    ids, value, shift, previous = [], 0, 0, 0
+    for byte in data:
+        value |= (byte & 0x7f) << shift
+        if byte & 0x80:
+            shift += 7
+            continue
+        previous += value
+        ids.append(previous)
+        value, shift = 0, 0
+    return ids
+
+
+def token_claim(user):
+    """Encoded memberships of `user` for an access token, or None above the cap."""
+    rows = list(models.CourseMember.objects.filter(user_id=_id(user))
+                .values_list('course_id', 'roles')[:TOKEN_CLAIM_MAX_COURSES + 1])
+    if len(rows) > TOKEN_CLAIM_MAX_COURSES:
+        return None
+    return {
+        'm': encode_ids(course for course, _ in rows),
+        'a': encode_ids(course for course, course_role in rows if course_role == 'ast'),
+    }
+
+
+def claim_roles(claim):
+    """{course_id: role} from a token_claim() value."""
+    roles = dict.fromkeys(decode_ids(claim['m']), 'std')
+    roles.update(dict.fromkeys(decode_ids(claim['a']), 'ast'))
+    return roles
+
+
+class MembershipMemoMiddleware:
+    """Gives every request its own membership memo."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        token = _request_memo.set({})
+        try:
+            return self.get_response(request)
+        finally:
+            _request_memo.reset(token)
+
+
+@receiver(post_save, sender='lms_core.CourseMember')
+@receiver(post_delete, sender='lms_core.CourseMember')
+def invalidate_member(sender, instance, **kwargs):
+    user, course = instance.user_id_id, instance.course_id_id
+    invalidate(user, course)
+    # A lookup made by another thread before the write commits would cache
+    # the old answer again, so drop the pair once more after commit
+    transaction.on_commit(lambda: invalidate(user, course))
@@ -0,0 +1,28 @@
+# Generated by Django 5.1.6 on 2026-10-18 14:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('lms_core', '0002_category_course_category'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImportCheckpoint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('stage', models.CharField(max_length=50, unique=True, verbose_name='Tahap')),
+                ('source_hash', models.CharField(max_length=64, verbose_name='Hash Sumber')),
+                ('offset', models.PositiveBigIntegerField(default=0, verbose_name='Baris Terakhir')),
+                ('completed', models.BooleanField(default=False, verbose_name='Selesai')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Diperbarui pada')),
+            ],
+            options={
+                'verbose_name': 'Checkpoint Import',
+                'verbose_name_plural': 'Checkpoint Import',
+            },
+        ),
+    ]
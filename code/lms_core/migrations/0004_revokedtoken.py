@@ -0,0 +1,30 @@
+# Generated by Django 5.1.6 on 2026-10-18 14:37
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('lms_core', '0003_importcheckpoint'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RevokedToken',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=64, unique=True, verbose_name='Kunci')),
+                ('revoked_at', models.DateTimeField(db_index=True, verbose_name='Dicabut pada')),
+                ('expires_at', models.DateTimeField(db_index=True, verbose_name='Kedaluwarsa pada')),
+                ('user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL, verbose_name='Pengguna')),
+            ],
+            options={
+                'verbose_name': 'Token Dicabut',
+                'verbose_name_plural': 'Token Dicabut',
+            },
+        ),
+    ]
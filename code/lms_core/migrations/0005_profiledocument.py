@@ -0,0 +1,29 @@
+# Generated by Django 5.1.6 on 2026-10-18 14:54
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('lms_core', '0004_revokedtoken'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProfileDocument',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='profile_document', serialize=False, to=settings.AUTH_USER_MODEL, verbose_name='Pengguna')),
+                ('body', models.TextField(verbose_name='Dokumen JSON')),
+                ('etag', models.CharField(max_length=64, verbose_name='ETag')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Diperbarui pada')),
+            ],
+            options={
+                'verbose_name': 'Dokumen Profil',
+                'verbose_name_plural': 'Dokumen Profil',
+            },
+        ),
+    ]
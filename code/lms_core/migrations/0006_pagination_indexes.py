@@ -0,0 +1,31 @@
+# Generated by Django 5.1.6 on 2026-10-18 14:55
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('lms_core', '0005_profiledocument'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='contentbookmark',
+            index=models.Index(fields=['student', '-created_at', '-id'], name='bookmark_page_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='contentcompletion',
+            index=models.Index(fields=['student', '-completed_at', '-id'], name='completion_page_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='courseannouncement',
+            index=models.Index(fields=['course', '-publish_date', '-id'], name='announcement_page_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='coursefeedback',
+            index=models.Index(fields=['course', '-created_at', '-id'], name='feedback_page_idx'),
+        ),
+    ]
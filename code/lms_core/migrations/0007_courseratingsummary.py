@@ -0,0 +1,31 @@
+# Generated by Django 5.1.6 on 2026-10-18 14:56
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('lms_core', '0006_pagination_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CourseRatingSummary',
+            fields=[
+                ('course', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='rating_summary', serialize=False, to='lms_core.course', verbose_name='Kursus')),
+                ('count', models.IntegerField(default=0, verbose_name='Jumlah Rating')),
+                ('total', models.IntegerField(default=0, verbose_name='Total Rating')),
+                ('rating_1', models.IntegerField(default=0, verbose_name='Rating 1')),
+                ('rating_2', models.IntegerField(default=0, verbose_name='Rating 2')),
+                ('rating_3', models.IntegerField(default=0, verbose_name='Rating 3')),
+                ('rating_4', models.IntegerField(default=0, verbose_name='Rating 4')),
+                ('rating_5', models.IntegerField(default=0, verbose_name='Rating 5')),
+            ],
+            options={
+                'verbose_name': 'Ringkasan Rating',
+                'verbose_name_plural': 'Ringkasan Rating',
+            },
+        ),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 5.1.6 on 2026-10-18 14:59
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def number_contents(apps, schema_editor):
+    # Existing contents get positions 0, 1, ... per course in id order
+    CourseContent = apps.get_model('lms_core', 'CourseContent')
+    rows = CourseContent.objects.order_by('course_id', 'id').values_list('id', 'course_id')
+    numbered, position, course = [], 0, None
+    for content_id, course_id in list(rows):
+        position = position + 1 if course_id == course else 0
+        course = course_id
+        numbered.append(CourseContent(id=content_id, position=position))
+    CourseContent.objects.bulk_update(numbered, ['position'], batch_size=5000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('lms_core', '0007_courseratingsummary'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='coursecontent',
+            name='position',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True, verbose_name='Posisi'),
+        ),
+        migrations.RunPython(number_contents, migrations.RunPython.noop),
+        migrations.AlterUniqueTogether(
+            name='coursecontent',
+            unique_together={('course_id', 'position')},
+        ),
+        migrations.CreateModel(
+            name='CourseProgress',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('bits', models.BinaryField(default=b'', verbose_name='Bitset Penyelesaian')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Diperbarui pada')),
+                ('course', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='progress', to='lms_core.course', verbose_name='Kursus')),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL, verbose_name='Siswa')),
+            ],
+            options={
+                'verbose_name': 'Progres Kursus',
+                'verbose_name_plural': 'Progres Kursus',
+                'unique_together': {('student', 'course')},
+            },
+        ),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 5.1.6 on 2026-10-18 15:13
+
+from django.db import migrations, models
+
+PATH_STEP = 6
+
+
+def build_paths(apps, schema_editor):
+    # path = the zero-padded positions of the ancestors, then the content's own
+    CourseContent = apps.get_model('lms_core', 'CourseContent')
+    rows = {pk: (parent, position) for pk, parent, position
+            in CourseContent.objects.values_list('id', 'parent_id', 'position')}
+    paths = {}
+
+    def path_of(pk):
+        chain = []
+        # A parent loop (never validated before) is cut where it closes
+        while pk is not None and pk not in paths and pk not in chain:
+            chain.append(pk)
+            pk = rows[pk][0]
+        if pk in chain:
+            pk = None
+        prefix = paths.get(pk, '')
+        for node in reversed(chain):
+            prefix = paths[node] = f'{prefix}{rows[node][1]:0{PATH_STEP}d}'
+        return prefix
+
+    contents = [CourseContent(id=pk, path=path_of(pk)) for pk in rows]
+    CourseContent.objects.bulk_update(contents, ['path'], batch_size=5000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('lms_core', '0008_courseprogress'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='coursecontent',
+            name='path',
+            field=models.CharField(default='', editable=False, max_length=255, verbose_name='Jalur'),
+        ),
+        migrations.RunPython(build_paths, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='coursecontent',
+            index=models.Index(fields=['course_id', 'path'], name='content_tree_idx'),
+        ),
+    ]
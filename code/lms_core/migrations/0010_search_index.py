@@ -0,0 +1,63 @@
+from django.db import migrations
+
+# Full-text index over Course and CourseContent name/description (see
+# lms_core.search). PostgreSQL gets a generated, weighted tsvector column with
+# a GIN index on each table; SQLite gets one FTS5 table per model whose rowid
+# is the row's id, contents also indexing their course as a "c<id>" token.
+# Other databases get no index.
+#
+# The tsvector columns depend on name and description: a later migration
+# changing the type of either has to drop and re-create them.
+
+TABLES = ['lms_core_course', 'lms_core_coursecontent']
+
+POSTGRESQL = [
+    (f"ALTER TABLE {table} ADD COLUMN search_vector tsvector GENERATED ALWAYS AS ("
+     f"setweight(to_tsvector('simple', coalesce(name, '')), 'A') || "
+     f"setweight(to_tsvector('simple', coalesce(description, '')), 'B')) STORED",
+     f"ALTER TABLE {table} DROP COLUMN search_vector")
+    for table in TABLES
+] + [
+    (f"CREATE INDEX {table}_search_idx ON {table} USING GIN (search_vector)",
+     f"DROP INDEX IF EXISTS {table}_search_idx")
+    for table in TABLES
+]
+
+SQLITE = [
+    ("CREATE VIRTUAL TABLE lms_core_course_fts USING fts5("
+     "name, description, tokenize='unicode61 remove_diacritics 2')",
+     "DROP TABLE lms_core_course_fts"),
+    ("CREATE VIRTUAL TABLE lms_core_coursecontent_fts USING fts5("
+     "name, description, course, tokenize='unicode61 remove_diacritics 2')",
+     "DROP TABLE lms_core_coursecontent_fts"),
+    ("INSERT INTO lms_core_course_fts (rowid, name, description) "
+     "SELECT id, name, description FROM lms_core_course", None),
+    ("INSERT INTO lms_core_coursecontent_fts (rowid, name, description, course) "
+     "SELECT id, name, description, 'c' || course_id_id FROM lms_core_coursecontent", None),
+]
+
+
+def statements(schema_editor):
+    return {'postgresql': POSTGRESQL, 'sqlite': SQLITE}.get(schema_editor.connection.vendor, [])
+
+
+def create_index(apps, schema_editor):
+    for forward, _ in statements(schema_editor):
+        schema_editor.execute(forward)
+
+
+def drop_index(apps, schema_editor):
+    for _, backward in reversed(statements(schema_editor)):
+        if backward:
+            schema_editor.execute(backward)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('lms_core', '0009_content_path'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_index, drop_index),
+    ]
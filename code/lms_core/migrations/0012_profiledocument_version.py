@@ -0,0 +1,18 @@
+# Generated by Django 5.1.6 on 2026-10-18 15:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('lms_core', '0011_catalog_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='profiledocument',
+            name='version',
+            field=models.PositiveIntegerField(default=0, verbose_name='Versi'),
+        ),
+    ]
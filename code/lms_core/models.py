@@ -1,8 +1,12 @@
-from django.db import models
+from django.db import models, transaction
+from django.db.models import Max, Value
+from django.db.models.functions import Concat, Length, Substr
 from django.contrib.auth.models import User
 from django.core.validators import RegexValidator
 from django.core.exceptions import ValidationError
 
+from lms_core import membership
+
 # Create your models here.
 class Category(models.Model):
     name = models.CharField("Nama Kategori", max_length=100, unique=True)
@@ -36,9 +40,14 @@ class Course(models.Model):
         verbose_name = "Mata Kuliah"
         verbose_name_plural = "Data Mata Kuliah"
         ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=['-created_at', '-id'], name='catalog_page_idx'),
+            models.Index(fields=['category', '-created_at', '-id'], name='catalog_category_idx'),
+            models.Index(fields=['teacher', '-created_at', '-id'], name='catalog_teacher_idx'),
+        ]
 
     def is_member(self, user):
-        return CourseMember.objects.filter(course_id=self, user_id=user).exists()
+        return membership.is_member(user, self)
     
     def clean(self):
         if self.price < 0:
@@ -73,17 +82,71 @@ class CourseContent(models.Model):
     course_id = models.ForeignKey(Course, verbose_name="Mata Kuliah", on_delete=models.RESTRICT, related_name='contents')
     parent_id = models.ForeignKey("self", verbose_name="Induk", 
                               on_delete=models.RESTRICT, null=True, blank=True, related_name='children')
+    # Urutan tetap konten dalam kursus (0, 1, ...); posisi bit di CourseProgress
+    position = models.PositiveIntegerField("Posisi", null=True, blank=True, editable=False)
+    # Jalur materialisasi: position setiap leluhur lalu dirinya, PATH_STEP digit per tingkat
+    path = models.CharField("Jalur", max_length=255, default='', editable=False)
     created_at = models.DateTimeField("Dibuat pada", auto_now_add=True)
     updated_at = models.DateTimeField("Diperbarui pada", auto_now=True)
 
+    PATH_STEP = 6
+
     class Meta:
         verbose_name = "Konten Mata Kuliah"
         verbose_name_plural = "Konten Mata Kuliah"
         ordering = ['created_at']
+        unique_together = ['course_id', 'position']
+        indexes = [models.Index(fields=['course_id', 'path'], name='content_tree_idx')]
 
     def __str__(self) -> str:
         return f'{self.course_id.name} - {self.name}'
 
+    @property
+    def depth(self):
+        return len(self.path) // self.PATH_STEP - 1
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'parent_id' not in update_fields:
+            return super().save(*args, **kwargs)
+        with transaction.atomic():
+            if self.position is None:
+                # Lock the course so contents added concurrently get distinct positions
+                Course.objects.select_for_update().only('id').get(pk=self.course_id_id)
+                last = CourseContent.objects.filter(course_id=self.course_id_id).aggregate(Max('position'))
+                self.position = 0 if last['position__max'] is None else last['position__max'] + 1
+
+            # Current paths of this content and its parent, locked until the subtree has moved
+            ids = [pk for pk in (self.pk, self.parent_id_id) if pk is not None]
+            rows = {pk: (path, course) for pk, path, course in CourseContent.objects.select_for_update()
+                    .filter(pk__in=ids).values_list('pk', 'path', 'course_id')}
+            old_path = rows[self.pk][0] if self.pk in rows else ''
+            parent_path = ''
+            if self.parent_id_id is not None:
+                parent_path, parent_course = rows.get(self.parent_id_id, ('', None))
+                if parent_course != self.course_id_id:
+                    raise ValidationError({'parent_id': 'Induk harus berada di mata kuliah yang sama'})
+            path = f'{parent_path}{self.position:0{self.PATH_STEP}d}'
+            if old_path and self.parent_id_id is not None and parent_path.startswith(old_path):
+                raise ValidationError({'parent_id': 'Konten tidak boleh dipindahkan ke dalam dirinya sendiri'})
+            subtree = CourseContent.objects.filter(course_id=self.course_id_id, path__startswith=old_path)
+            deepest = len(path)
+            if old_path and old_path != path:
+                # The deepest descendant grows (or shrinks) by as much as this content
+                longest = subtree.aggregate(longest=Max(Length('path')))['longest'] or len(old_path)
+                deepest += longest - len(old_path)
+            if deepest > self._meta.get_field('path').max_length:
+                raise ValidationError({'parent_id': 'Struktur konten terlalu dalam'})
+            self.path = path
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, 'path'}
+            super().save(*args, **kwargs)
+            if old_path and old_path != path:
+                # The whole subtree moves with one UPDATE
+                subtree.exclude(pk=self.pk) \
+                    .update(path=Concat(Value(path), Substr('path', len(old_path) + 1),
+                                        output_field=models.CharField()))
+
     def clean(self):
         # Prevent self-referencing parent
         if self.parent_id == self:
@@ -146,6 +209,8 @@ class CourseAnnouncement(models.Model):
         verbose_name = "Pengumuman Kursus"
         verbose_name_plural = "Pengumuman Kursus"
         ordering = ["-publish_date"]
+        # Urutan halaman cursor (lms_core.pagination)
+        indexes = [models.Index(fields=['course', '-publish_date', '-id'], name='announcement_page_idx')]
 
     def __str__(self):
         return f"{self.course.name} - {self.title}"
@@ -153,7 +218,7 @@ class CourseAnnouncement(models.Model):
     def clean(self):
         # Ensure teacher is the course teacher or course member with assistant role
         if self.teacher != self.course.teacher:
-            if not CourseMember.objects.filter(course=self.course, user=self.teacher, roles='ast').exists():
+            if not membership.is_member(self.teacher_id, self.course_id, roles=['ast']):
                 raise ValidationError('Hanya pengajar atau asisten yang dapat membuat pengumuman')
 
 # Content Completion Tracking
@@ -166,13 +231,14 @@ class ContentCompletion(models.Model):
         verbose_name = "Penyelesaian Konten"
         verbose_name_plural = "Penyelesaian Konten"
         unique_together = ['student', 'content']  # Prevent duplicate completions
+        indexes = [models.Index(fields=['student', '-completed_at', '-id'], name='completion_page_idx')]
 
     def __str__(self):
         return f"{self.student.username} completed {self.content.name}"
 
     def clean(self):
         # Ensure student is a member of the course
-        if not CourseMember.objects.filter(course=self.content.course, user=self.student).exists():
+        if not membership.is_member(self.student_id, self.content.course_id_id):
             raise ValidationError('Siswa harus terdaftar di mata kuliah ini')
 
 # Course Feedback
@@ -196,13 +262,14 @@ class CourseFeedback(models.Model):
         verbose_name = "Umpan Balik Kursus"
         verbose_name_plural = "Umpan Balik Kursus"
         unique_together = ['course', 'student']  # One feedback per student per course
+        indexes = [models.Index(fields=['course', '-created_at', '-id'], name='feedback_page_idx')]
 
     def __str__(self):
         return f"Feedback by {self.student.username} for {self.course.name}"
 
     def clean(self):
         # Ensure student is a member of the course
-        if not CourseMember.objects.filter(course=self.course, user=self.student).exists():
+        if not membership.is_member(self.student_id, self.course_id):
             raise ValidationError('Siswa harus terdaftar di mata kuliah ini untuk memberikan feedback')
 
 # Content Bookmarking
@@ -215,11 +282,96 @@ class ContentBookmark(models.Model):
         verbose_name = "Bookmark Konten"
         verbose_name_plural = "Bookmark Konten"
         unique_together = ['student', 'content']  # Prevent duplicate bookmarks
+        indexes = [models.Index(fields=['student', '-created_at', '-id'], name='bookmark_page_idx')]
 
     def __str__(self):
         return f"{self.student.username} bookmarked {self.content.name}"
     
     def clean(self):
         # Ensure student is a member of the course
-        if not CourseMember.objects.filter(course=self.content.course, user=self.student).exists():
-            raise ValidationError('Siswa harus terdaftar di mata kuliah ini untuk mem-bookmark konten')
\ No newline at end of file
+        if not membership.is_member(self.student_id, self.content.course_id_id):
+            raise ValidationError('Siswa harus terdaftar di mata kuliah ini untuk mem-bookmark konten')
+
+# Import Checkpoints
+class ImportCheckpoint(models.Model):
+    stage = models.CharField("Tahap", max_length=50, unique=True)
+    source_hash = models.CharField("Hash Sumber", max_length=64)
+    offset = models.PositiveBigIntegerField("Baris Terakhir", default=0)
+    completed = models.BooleanField("Selesai", default=False)
+    updated_at = models.DateTimeField("Diperbarui pada", auto_now=True)
+
+    class Meta:
+        verbose_name = "Checkpoint Import"
+        verbose_name_plural = "Checkpoint Import"
+
+    def __str__(self):
+        return f"{self.stage} @ {self.offset}{' (selesai)' if self.completed else ''}"
+
+# Token Revocation
+class RevokedToken(models.Model):
+    # jti token yang dicabut, atau "user:<id>" untuk mencabut semua token pengguna
+    key = models.CharField("Kunci", max_length=64, unique=True)
+    user = models.ForeignKey(User, verbose_name="Pengguna", on_delete=models.CASCADE, null=True, blank=True)
+    revoked_at = models.DateTimeField("Dicabut pada", db_index=True)
+    expires_at = models.DateTimeField("Kedaluwarsa pada", db_index=True)
+
+    class Meta:
+        verbose_name = "Token Dicabut"
+        verbose_name_plural = "Token Dicabut"
+
+    def __str__(self):
+        return f"{self.key} (dicabut {self.revoked_at:%Y-%m-%d %H:%M})"
+
+# Materialized Public Profiles
+class ProfileDocument(models.Model):
+    user = models.OneToOneField(User, verbose_name="Pengguna", on_delete=models.CASCADE,
+                                primary_key=True, related_name='profile_document')
+    # Respons JSON show_profile apa adanya, dibangun ulang oleh lms_core.profiles
+    body = models.TextField("Dokumen JSON")
+    etag = models.CharField("ETag", max_length=64)
+    # Dinaikkan setiap kali dokumen dibatalkan; build hanya menyimpan bila versinya tidak berubah
+    version = models.PositiveIntegerField("Versi", default=0)
+    updated_at = models.DateTimeField("Diperbarui pada", auto_now=True)
+
+    class Meta:
+        verbose_name = "Dokumen Profil"
+        verbose_name_plural = "Dokumen Profil"
+
+    def __str__(self):
+        return f"Profil publik {self.user_id}"
+
+# Course Rating Summary
+class CourseRatingSummary(models.Model):
+    # Dipelihara oleh lms_core.ratings; perbaiki dengan `manage.py reconcile_ratings`
+    course = models.OneToOneField(Course, verbose_name="Kursus", on_delete=models.CASCADE,
+                                  primary_key=True, related_name='rating_summary')
+    count = models.IntegerField("Jumlah Rating", default=0)
+    total = models.IntegerField("Total Rating", default=0)
+    rating_1 = models.IntegerField("Rating 1", default=0)
+    rating_2 = models.IntegerField("Rating 2", default=0)
+    rating_3 = models.IntegerField("Rating 3", default=0)
+    rating_4 = models.IntegerField("Rating 4", default=0)
+    rating_5 = models.IntegerField("Rating 5", default=0)
+
+    class Meta:
+        verbose_name = "Ringkasan Rating"
+        verbose_name_plural = "Ringkasan Rating"
+
+    def __str__(self):
+        return f"{self.course_id}: {self.count} rating"
+
+# Course Progress
+class CourseProgress(models.Model):
+    # Bit ke-n menyala jika konten dengan position n sudah selesai; dipelihara oleh lms_core.progress
+    student = models.ForeignKey(User, verbose_name="Siswa", on_delete=models.CASCADE)
+    course = models.ForeignKey(Course, verbose_name="Kursus", on_delete=models.CASCADE, related_name='progress')
+    bits = models.BinaryField("Bitset Penyelesaian", default=b'')
+    updated_at = models.DateTimeField("Diperbarui pada", auto_now=True)
+
+    class Meta:
+        verbose_name = "Progres Kursus"
+        verbose_name_plural = "Progres Kursus"
+        unique_together = ['student', 'course']
+
+    def __str__(self):
+        return f"Progres {self.student_id} di kursus {self.course_id}"
@@ -0,0 +1,92 @@
+import base64
+import json
+from typing import Any, List, Optional
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db.models import Q
+from ninja import Field, Schema
+from ninja.errors import ConfigError, HttpError
+from ninja.pagination import PaginationBase
+
+# Keyset pagination: each page is "the next `limit` rows after (sort value,
+# id)", so page 1000 costs the same index range scan as page 1, and no
+# COUNT(*) is run. The sort key is the queryset's first order_by field (or the
+# model's Meta.ordering), with the primary key as tie-breaker in the same
+# direction. Cursors are opaque to clients: base64url JSON of the last row's
+# (sort value, id).
+#
+#   @apiv1.get("/things", response=List[ThingOut])
+#   @paginate(CursorPagination)
+#   def list_things(request):
+#       return Thing.objects.filter(...).order_by('-created_at')
+
+
+def encode_cursor(value, pk):
+    raw = json.dumps([value, pk], separators=(',', ':'), default=str)
+    return base64.urlsafe_b64encode(raw.encode()).rstrip(b'=').decode()
+
+
+def decode_cursor(cursor):
+    try:
+        value, pk = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+    except (ValueError, TypeError):
+        raise HttpError(400, "Cursor tidak valid")
+    return value, pk
+
+
+class CursorPagination(PaginationBase):
+    class Input(Schema):
+        cursor: Optional[str] = None
+        limit: int = Field(20, ge=1, le=100)
+
+    class Output(Schema):
+        items: List[Any]
+        next: Optional[str] = None
+
+    def sort_field(self, queryset):
+        ordering = queryset.query.order_by or queryset.model._meta.ordering or ['-pk']
+        name = ordering[0]
+        descending = name.startswith('-')
+        name = name.lstrip('-')
+        if name == 'pk':
+            return None, descending
+        try:
+            field = queryset.model._meta.get_field(name)
+        except FieldDoesNotExist:
+            raise ConfigError(f"CursorPagination cannot sort {queryset.model.__name__} by {name!r}")
+        if field.null:
+            raise ConfigError(f"CursorPagination needs a NOT NULL sort key, {name!r} is nullable")
+        return field, descending
+
+    def paginate_queryset(self, queryset, pagination: Input, **params: Any) -> Any:
+        field, descending = self.sort_field(queryset)
+        sign = '-' if descending else ''
+        after = 'lt' if descending else 'gt'
+        order = [f'{sign}pk'] if field is None else [f'{sign}{field.name}', f'{sign}pk']
+        queryset = queryset.order_by(*order)
+
+        if pagination.cursor:
+            value, pk = decode_cursor(pagination.cursor)
+            if field is None:
+                queryset = queryset.filter(**{f'pk__{after}': pk})
+            else:
+                try:
+                    value = field.to_python(value)
+                except ValidationError:
+                    raise HttpError(400, "Cursor tidak valid")
+                # (sort, pk) < (value, pk) spelled so the first term bounds
+                # the index range scan; a bare OR makes the database walk
+                # every row before the cursor
+                queryset = queryset.filter(
+                    Q(**{f'{field.name}__{after}e': value}),
+                    Q(**{f'{field.name}__{after}': value}) | Q(**{f'pk__{after}': pk}))
+
+        # One extra row tells whether there is a next page
+        items = list(queryset[:pagination.limit + 1])
+        next_cursor = None
+        if len(items) > pagination.limit:
+            items = items[:pagination.limit]
+            last = items[-1]
+            value = None if field is None else field.value_to_string(last)
+            next_cursor = encode_cursor(value, last.pk)
+        return {'items': items, 'next': next_cursor}
@@ -0,0 +1,118 @@
+import hashlib
+
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models import F, Q
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+from django.shortcuts import get_object_or_404
+from ninja.renderers import JSONRenderer
+
+from lms_core.models import Course, CourseMember, ProfileDocument, UserProfile
+from lms_core.schema import UserOut
+
+# Public profile documents. show_profile used to run ~8 queries (and a write)
+# per hit; now the JSON it returns is stored per user in ProfileDocument and
+# served with one keyed read.
+#
+# Signals empty the documents a change affects and bump their version, after
+# the transaction commits, and the next read rebuilds them. A course edit
+# therefore costs one UPDATE rather than one rebuild per member. A build notes
+# the version before reading anything and stores its result only if the
+# version is unchanged, so a build that raced an invalidation cannot leave a
+# stale document behind. Bulk writers that bypass signals (the importer, the
+# generator) call invalidate_all().
+
+# User columns that appear in a document; saves touching only others
+# (last_login on every sign-in, password) leave documents alone
+DOCUMENT_USER_FIELDS = {'id', 'username', 'email', 'first_name', 'last_name'}
+
+renderer = JSONRenderer()
+
+
+def build(user_id):
+    """Render and store the document of `user_id`; Http404 if there is no such user."""
+    user = get_object_or_404(User, id=user_id)
+    document, _ = ProfileDocument.objects.get_or_create(user_id=user.id, defaults={'body': '', 'etag': ''})
+    version = document.version
+    profile = UserProfile.objects.filter(user=user).first()
+    data = {
+        'id': user.id,
+        'first_name': user.first_name,
+        'last_name': user.last_name,
+        'email': user.email,
+        'username': user.username,
+        'profile': {
+            'phone': profile.phone,
+            'description': profile.description,
+            'profile_picture': profile.profile_picture.url if profile.profile_picture else None,
+            'created_at': profile.created_at,
+            'updated_at': profile.updated_at,
+        } if profile else None,
+        'courses_created': Course.objects.filter(teacher=user),
+        'courses_joined': CourseMember.objects.select_related('course_id', 'course_id__teacher', 'user_id')
+                                              .filter(user_id=user),
+    }
+    body = renderer.render(None, UserOut.from_orm(data).model_dump(), response_status=200)
+    etag = '"%s"' % hashlib.sha1(body.encode()).hexdigest()
+    ProfileDocument.objects.filter(user_id=user.id, version=version).update(body=body, etag=etag)
+    return etag, body
+
+
+def get(user_id):
+    """(etag, body) of the document of `user_id`, building it if needed."""
+    row = ProfileDocument.objects.filter(user_id=user_id).values_list('etag', 'body').first()
+    if row is None or not row[1]:
+        return build(user_id)
+    return row
+
+
+def expire(documents):
+    documents.update(body='', etag='', version=F('version') + 1)
+
+
+def invalidate(condition):
+    transaction.on_commit(lambda: expire(ProfileDocument.objects.filter(condition)))
+
+
+def invalidate_all():
+    expire(ProfileDocument.objects.all())
+
+
+def members_of(courses):
+    return Q(user_id__in=CourseMember.objects.filter(course_id__in=courses).values('user_id'))
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_user(sender, instance, update_fields=None, **kwargs):
+    if update_fields is not None and not DOCUMENT_USER_FIELDS & set(update_fields):
+        return
+    # The user appears as teacher in the documents of their students
+    invalidate(Q(user_id=instance.id) | members_of(Course.objects.filter(teacher_id=instance.id).values('id')))
+
+
+@receiver(post_save, sender=UserProfile)
+@receiver(post_delete, sender=UserProfile)
+def invalidate_profile(sender, instance, **kwargs):
+    invalidate(Q(user_id=instance.user_id))
+
+
+@receiver(pre_save, sender=Course)
+def remember_teacher(sender, instance, **kwargs):
+    if instance.pk is not None:
+        instance._previous_teacher_id = Course.objects.filter(pk=instance.pk) \
+            .values_list('teacher_id', flat=True).first()
+
+
+@receiver(post_save, sender=Course)
+@receiver(post_delete, sender=Course)
+def invalidate_course(sender, instance, **kwargs):
+    teachers = {instance.teacher_id, getattr(instance, '_previous_teacher_id', None)} - {None}
+    invalidate(Q(user_id__in=teachers) | members_of([instance.pk]))
+
+
+@receiver(post_save, sender=CourseMember)
+@receiver(post_delete, sender=CourseMember)
+def invalidate_member(sender, instance, **kwargs):
+    invalidate(Q(user_id=instance.user_id_id))
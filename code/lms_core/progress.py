@@ -0,0 +1,236 @@
+import threading
+from collections import defaultdict
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Max
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from lms_core.cache import LRUCache
+from lms_core.models import ContentCompletion, CourseContent, CourseMember, CourseProgress
+
+# Completion bitsets: bit n of CourseProgress.bits is set when the student has
+# completed the course's content with position n (CourseContent.position is
+# fixed when the content is created). A course with 200 contents costs 25
+# bytes per student, and "% complete" is a popcount of one row rather than a
+# join of ContentCompletion with CourseContent.
+#
+# add_completion_tracking/delete_completion call update() in the transaction
+# that writes the ContentCompletion, and deleting a content clears its bit in
+# every row of the course (inside batched_clear(), the bits of every content
+# deleted are cleared together, in one pass per course). Bulk loads bypass both and are repaired by
+# rebuild(), i.e. `manage.py reconcile_progress`.
+#
+# The number of contents per course is cached for PROGRESS_TOTALS_CACHE_TTL
+# seconds; adding or deleting a content drops the count in this process.
+
+totals_cache = LRUCache(
+    maxsize=getattr(settings, 'PROGRESS_TOTALS_CACHE_SIZE', 10000),
+    ttl=getattr(settings, 'PROGRESS_TOTALS_CACHE_TTL', 300),
+)
+
+
+def to_int(bits):
+    return int.from_bytes(bits, 'little')
+
+
+def to_bytes(value):
+    return value.to_bytes((value.bit_length() + 7) // 8, 'little')
+
+
+def update(student_id, course_id, position, done):
+    """Set (done=True) or clear the bit of `position`; call it inside the completion's transaction."""
+    if position is None:
+        # Not numbered yet (bulk load): rebuild() numbers and counts it
+        return
+    progress = CourseProgress.objects.select_for_update()
+    if done:
+        row, _ = progress.get_or_create(student_id=student_id, course_id=course_id)
+    else:
+        row = progress.filter(student_id=student_id, course_id=course_id).first()
+        if row is None:
+            return
+    value = to_int(row.bits)
+    row.bits = to_bytes(value | 1 << position if done else value & ~(1 << position))
+    row.save(update_fields=['bits', 'updated_at'])
+
+
+def totals(course_ids):
+    """{course_id: number of contents} for `course_ids`, from the cache where possible."""
+    found, missing = {}, []
+    for course in course_ids:
+        total = totals_cache.get(course)
+        if total is None:
+            missing.append(course)
+        else:
+            found[course] = total
+    totals_cache.stats['hits'] += len(found)
+    totals_cache.stats['misses'] += len(missing)
+    if missing:
+        counted = dict(CourseContent.objects.filter(course_id__in=missing)
+                       .values('course_id').annotate(total=Count('id')).values_list('course_id', 'total'))
+        for course in missing:
+            found[course] = counted.get(course, 0)
+            totals_cache.set(course, found[course])
+    return found
+
+
+def student_progress(student_id):
+    """Progress of `student_id` in every course they joined, ordered by course id."""
+    courses = list(CourseMember.objects.filter(user_id=student_id)
+                   .order_by('course_id').values_list('course_id', flat=True))
+    bits = dict(CourseProgress.objects.filter(student_id=student_id).values_list('course_id', 'bits'))
+    course_totals = totals(courses)
+    result = []
+    for course in courses:
+        completed = to_int(bits.get(course, b'')).bit_count()
+        total = course_totals[course]
+        result.append({
+            'course_id': course,
+            'completed': completed,
+            'total': total,
+            'percent': round(completed * 100 / total, 2) if total else 0.0,
+        })
+    return result
+
+
+def stats():
+    return totals_cache.report()
+
+
+# ===== Reconciliation =====
+
+def assign_positions():
+    """Number the contents that were inserted without a position; returns how many."""
+    missing = list(CourseContent.objects.filter(position__isnull=True)
+                   .order_by('course_id', 'id').values_list('id', 'course_id'))
+    if not missing:
+        return 0
+    last = dict(CourseContent.objects.filter(course_id__in={course for _, course in missing})
+                .values('course_id').annotate(last=Max('position')).values_list('course_id', 'last'))
+    numbered = []
+    for content_id, course in missing:
+        position = last.get(course)
+        last[course] = position = 0 if position is None else position + 1
+        numbered.append(CourseContent(id=content_id, position=position))
+    CourseContent.objects.bulk_update(numbered, ['position'], batch_size=5000)
+    return len(numbered)
+
+
+def actual_bits(course_id):
+    """{student_id: bitset as int} of `course_id`, from the ContentCompletion rows."""
+    bits = defaultdict(int)
+    rows = ContentCompletion.objects.filter(content__course_id=course_id, content__position__isnull=False) \
+        .values_list('student_id', 'content__position')
+    for student, position in rows.iterator(chunk_size=20000):
+        bits[student] |= 1 << position
+    return bits
+
+
+def tracked_courses():
+    """Ids of the courses with a completion or a bitset, in order."""
+    completed = ContentCompletion.objects.order_by().values_list('content__course_id', flat=True).distinct()
+    stored = CourseProgress.objects.order_by().values_list('course_id', flat=True).distinct()
+    return sorted(set(completed) | set(stored))
+
+
+def rebuild_course(course_id, dry_run=False):
+    """Make the bitsets of one course match its completion rows; returns the students that drifted."""
+    with transaction.atomic():
+        actual = actual_bits(course_id)
+        stored = {student: (row_id, to_int(bits)) for row_id, student, bits
+                  in CourseProgress.objects.filter(course_id=course_id).values_list('id', 'student_id', 'bits')}
+        drifted = sorted(student for student in actual.keys() | stored.keys()
+                         if actual.get(student, 0) != stored.get(student, (None, 0))[1])
+        if dry_run:
+            return drifted
+        created, changed, emptied = [], [], []
+        for student in drifted:
+            value = actual.get(student, 0)
+            if student not in stored:
+                created.append(CourseProgress(student_id=student, course_id=course_id, bits=to_bytes(value)))
+            elif value:
+                changed.append(CourseProgress(id=stored[student][0], bits=to_bytes(value)))
+            else:
+                emptied.append(stored[student][0])
+        CourseProgress.objects.bulk_create(created, batch_size=5000)
+        CourseProgress.objects.bulk_update(changed, ['bits'], batch_size=5000)
+        CourseProgress.objects.filter(id__in=emptied).delete()
+    return drifted
+
+
+def rebuild(dry_run=False):
+    """Make every bitset match the completion rows; returns the (student, course) pairs that drifted.
+
+    Courses are reconciled one at a time, each in its own transaction, so
+    only one course's rows are held in memory. Completions written while this
+    runs can be overwritten, so run it when the completion endpoints are quiet
+    (or right after a bulk load).
+    """
+    if not dry_run:
+        assign_positions()
+    drifted = []
+    for course in tracked_courses():
+        drifted.extend((student, course) for student in rebuild_course(course, dry_run))
+    drifted.sort()
+    return drifted
+
+
+# ===== Signals =====
+
+# {course_id: mask of the bits to clear} while batched_clear() is active
+_pending = threading.local()
+
+
+def clear_bits(course_id, mask):
+    """Clear the bits of `mask` in every bitset of `course_id`."""
+    with transaction.atomic():
+        cleared = []
+        for row in CourseProgress.objects.select_for_update().filter(course_id=course_id):
+            value = to_int(row.bits)
+            if value & mask:
+                row.bits = to_bytes(value & ~mask)
+                cleared.append(row)
+        CourseProgress.objects.bulk_update(cleared, ['bits'], batch_size=5000)
+
+
+@contextmanager
+def batched_clear():
+    """Clear the bits of the contents deleted inside the block on exit, one pass per course."""
+    if getattr(_pending, 'masks', None) is not None:
+        # Nested: the outer block clears them
+        yield
+        return
+    _pending.masks = defaultdict(int)
+    try:
+        yield
+        masks = _pending.masks
+    finally:
+        _pending.masks = None
+    for course, mask in masks.items():
+        clear_bits(course, mask)
+
+
+def invalidate_total(course_id):
+    totals_cache.invalidate(course_id)
+    transaction.on_commit(lambda: totals_cache.invalidate(course_id))
+
+
+@receiver(post_save, sender='lms_core.CourseContent')
+def content_saved(sender, instance, created, **kwargs):
+    if created:
+        invalidate_total(instance.course_id_id)
+
+
+@receiver(post_delete, sender='lms_core.CourseContent')
+def content_deleted(sender, instance, **kwargs):
+    invalidate_total(instance.course_id_id)
+    if instance.position is None:
+        return
+    masks = getattr(_pending, 'masks', None)
+    if masks is not None:
+        masks[instance.course_id_id] |= 1 << instance.position
+    else:
+        clear_bits(instance.course_id_id, 1 << instance.position)
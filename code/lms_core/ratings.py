@@ -0,0 +1,74 @@
+from django.db import transaction
+from django.db.models import Count, F, Q, Sum
+
+from lms_core.models import CourseFeedback, CourseRatingSummary
+
+# Per-course rating summary (count, sum, 1-5 histogram), kept in step with
+# CourseFeedback by the feedback endpoints: each change is applied with F()
+# expressions in the transaction that writes the feedback, so concurrent
+# ratings never lose an update. Writers that bypass record() (bulk loads,
+# the admin) are repaired by rebuild(), i.e. `manage.py reconcile_ratings`.
+
+RATINGS = range(1, 6)
+COUNTERS = ['count', 'total'] + [f'rating_{rating}' for rating in RATINGS]
+
+
+def record(course_id, old=None, new=None):
+    """Apply a feedback change: old=None for a new rating, new=None for a deleted one."""
+    if old == new:
+        return
+    changes = {'total': F('total') + (new or 0) - (old or 0)}
+    if (old is None) != (new is None):
+        changes['count'] = F('count') + (1 if old is None else -1)
+    if old is not None:
+        changes[f'rating_{old}'] = F(f'rating_{old}') - 1
+    if new is not None:
+        changes[f'rating_{new}'] = F(f'rating_{new}') + 1
+    summaries = CourseRatingSummary.objects.filter(course_id=course_id)
+    if not summaries.update(**changes):
+        # First rating of the course
+        CourseRatingSummary.objects.get_or_create(course_id=course_id)
+        summaries.update(**changes)
+
+
+def summary(course_id):
+    """The summary of `course_id` as served by the API, or None if it has no row."""
+    row = CourseRatingSummary.objects.filter(course_id=course_id).values(*COUNTERS).first()
+    if row is None:
+        return None
+    return {
+        'course_id': course_id,
+        'count': row['count'],
+        'sum': row['total'],
+        'average': round(row['total'] / row['count'], 2) if row['count'] else None,
+        'histogram': {rating: row[f'rating_{rating}'] for rating in RATINGS},
+    }
+
+
+def actual_counters():
+    """{course_id: counters} aggregated from the CourseFeedback rows."""
+    rows = CourseFeedback.objects.values('course').annotate(
+        count=Count('id'),
+        total=Sum('rating'),
+        **{f'rating_{rating}': Count('id', filter=Q(rating=rating)) for rating in RATINGS},
+    )
+    return {row['course']: {name: row[name] for name in COUNTERS} for row in rows}
+
+
+def rebuild(dry_run=False):
+    """Make every summary match the feedback rows; returns the ids of the courses that drifted.
+
+    Ratings written while this runs can be overwritten, so run it when the
+    feedback endpoints are quiet (or right after a bulk load).
+    """
+    with transaction.atomic():
+        actual = actual_counters()
+        stored = {row.pop('course_id'): row for row in CourseRatingSummary.objects.values('course_id', *COUNTERS)}
+        empty = dict.fromkeys(COUNTERS, 0)
+        drifted = sorted(course for course in actual.keys() | stored.keys()
+                         if actual.get(course, empty) != stored.get(course, empty))
+        if dry_run:
+            return drifted
+        for course in drifted:
+            CourseRatingSummary.objects.update_or_create(course_id=course, defaults=actual.get(course, empty))
+    return drifted
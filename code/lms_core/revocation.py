@@ -0,0 +1,252 @@
+import hashlib
+import math
+import threading
+import time
+from datetime import datetime, timezone as dt_timezone
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.utils import timezone
+from ninja_simple_jwt.settings import ninja_simple_jwt_settings
+
+from lms_core import models
+
+# Revoked JWTs. The store (the RevokedToken table, or Redis) is the source of
+# truth; every process mirrors its keys into a Bloom filter, so the auth layer
+# only asks the store about tokens the filter flags. A key is either a jti
+# (that token only) or "user:<id>" (every token of that user issued at or
+# before the revocation, e.g. after a password change).
+#
+# Revocations made in this process are visible at once; other processes pick
+# them up within REVOCATION_REFRESH_INTERVAL seconds. The filter is rebuilt
+# from scratch every REVOCATION_REBUILD_INTERVAL seconds, which also drops
+# keys whose tokens have expired.
+
+REFRESH_INTERVAL = getattr(settings, 'REVOCATION_REFRESH_INTERVAL', 5)
+REBUILD_INTERVAL = getattr(settings, 'REVOCATION_REBUILD_INTERVAL', 3600)
+BLOOM_CAPACITY = getattr(settings, 'REVOCATION_BLOOM_CAPACITY', 100000)
+BLOOM_ERROR_RATE = getattr(settings, 'REVOCATION_BLOOM_ERROR_RATE', 0.001)
+
+
+def user_key(user_id):
+    return f'user:{user_id}'
+
+
+class BloomFilter:
+    """Bloom filter over str keys, sized for `capacity` keys at `error_rate`."""
+
+    def __init__(self, capacity, error_rate):
+        self.capacity = max(capacity, 1)
+        self.size = max(8, int(-self.capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / self.capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def positions(self, key):
+        # Double hashing: k positions from two 64-bit halves of one digest
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hashes)]
+
+    def add(self, key):
+        for position in self.positions(key):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, key):
+        bits = self.bits
+        return all(bits[position >> 3] & (1 << (position & 7)) for position in self.positions(key))
+
+
+# ===== Stores =====
+
+class DatabaseStore:
+    name = 'db'
+
+    def revoke(self, key, expires_at, user_id=None):
+        models.RevokedToken.objects.update_or_create(
+            key=key, defaults={'user_id': user_id, 'revoked_at': timezone.now(), 'expires_at': expires_at})
+
+    def revoked_at(self, key):
+        """Unix time `key` was revoked, or None."""
+        revoked = models.RevokedToken.objects.filter(
+            key=key, expires_at__gt=timezone.now()).values_list('revoked_at', flat=True).first()
+        return revoked.timestamp() if revoked else None
+
+    def keys(self, since=None):
+        if since is None:
+            rows = models.RevokedToken.objects.filter(expires_at__gt=timezone.now())
+        else:
+            # Only the revoked_at index: an expired key in the filter costs at
+            # most one lookup, a scan of the whole table costs every request
+            rows = models.RevokedToken.objects.filter(
+                revoked_at__gte=datetime.fromtimestamp(since, dt_timezone.utc))
+        return rows.values_list('key', flat=True).iterator(chunk_size=10000)
+
+    def count(self):
+        return models.RevokedToken.objects.filter(expires_at__gt=timezone.now()).count()
+
+    def purge(self):
+        models.RevokedToken.objects.filter(expires_at__lte=timezone.now()).delete()
+
+
+class RedisStore:
+    """Keys live as `<prefix><key>` with a TTL; a sorted set scored by
+    revocation time lists them for the Bloom filter."""
+
+    name = 'redis'
+
+    def __init__(self, url, prefix='lms:revoked:'):
+        try:
+            import redis
+        except ImportError:
+            raise ImproperlyConfigured("REVOCATION_STORE = 'redis' needs the redis package")
+        self.client = redis.Redis.from_url(url)
+        self.prefix = prefix
+        self.index = prefix + 'index'
+
+    def revoke(self, key, expires_at, user_id=None):
+        now = time.time()
+        ttl = max(1, int(expires_at.timestamp() - now))
+        with self.client.pipeline() as pipe:
+            pipe.set(self.prefix + key, now, ex=ttl)
+            pipe.zadd(self.index, {key: now})
+            pipe.execute()
+
+    def revoked_at(self, key):
+        value = self.client.get(self.prefix + key)
+        return float(value) if value is not None else None
+
+    def keys(self, since=None):
+        members = self.client.zrangebyscore(self.index, since if since is not None else '-inf', '+inf')
+        return (member.decode() for member in members)
+
+    def count(self):
+        return self.client.zcard(self.index)
+
+    def purge(self):
+        # Index entries older than the longest token lifetime point at expired keys
+        lifetime = ninja_simple_jwt_settings.JWT_REFRESH_TOKEN_LIFETIME
+        self.client.zremrangebyscore(self.index, '-inf', time.time() - lifetime.total_seconds())
+
+
+def get_store():
+    name = getattr(settings, 'REVOCATION_STORE', 'db')
+    if name == 'redis':
+        return RedisStore(getattr(settings, 'REVOCATION_REDIS_URL', 'redis://localhost:6379/0'))
+    if name == 'db':
+        return DatabaseStore()
+    raise ImproperlyConfigured(f"Unknown REVOCATION_STORE {name!r}")
+
+
+# ===== Per-process mirror =====
+
+class RevocationList:
+    def __init__(self, store, refresh_interval=REFRESH_INTERVAL, rebuild_interval=REBUILD_INTERVAL):
+        self.store = store
+        self.refresh_interval = refresh_interval
+        self.rebuild_interval = rebuild_interval
+        self.bloom = None
+        self.lock = threading.Lock()
+        self.refreshed = self.rebuilt = 0.0
+        self.stats = {'checks': 0, 'positives': 0, 'revoked': 0, 'refreshes': 0, 'rebuilds': 0}
+
+    def rebuild(self):
+        self.store.purge()
+        count = self.store.count()
+        # Leave room to grow until the next rebuild
+        bloom = BloomFilter(max(BLOOM_CAPACITY, count * 2), BLOOM_ERROR_RATE)
+        started = time.time()
+        for key in self.store.keys():
+            bloom.add(key)
+        self.bloom = bloom
+        self.refreshed = self.rebuilt = started
+        self.stats['rebuilds'] += 1
+
+    def refresh(self):
+        # Overlap by one interval: adding a key twice is harmless, missing a
+        # revocation committed late by another process is not
+        started = time.time()
+        for key in self.store.keys(since=self.refreshed - self.refresh_interval):
+            self.bloom.add(key)
+        self.refreshed = started
+        self.stats['refreshes'] += 1
+
+    def sync(self):
+        now = time.time()
+        if self.bloom is not None and now - self.refreshed < self.refresh_interval:
+            return
+        # One thread refreshes; the others keep using the current filter
+        if not self.lock.acquire(blocking=self.bloom is None):
+            return
+        try:
+            if self.bloom is None or now - self.rebuilt >= self.rebuild_interval \
+                    or self.bloom.count > self.bloom.capacity:
+                self.rebuild()
+            elif now - self.refreshed >= self.refresh_interval:
+                self.refresh()
+        finally:
+            self.lock.release()
+
+    def is_revoked(self, claims):
+        """True when the token with these (verified) claims has been revoked."""
+        self.sync()
+        self.stats['checks'] += 1
+        bloom = self.bloom
+        for key in (claims.get('jti'), user_key(claims.get('user_id'))):
+            if key is None or key not in bloom:
+                continue
+            self.stats['positives'] += 1
+            revoked_at = self.store.revoked_at(key)
+            if revoked_at is None:
+                continue
+            if key.startswith('user:') and claims.get('iat', 0) > revoked_at:
+                continue
+            self.stats['revoked'] += 1
+            return True
+        return False
+
+    def revoke(self, key, expires_at, user_id=None):
+        self.store.revoke(key, expires_at, user_id)
+        if self.bloom is not None:
+            self.bloom.add(key)
+
+    def report(self):
+        bloom = self.bloom
+        return {
+            **self.stats,
+            'store': self.store.name,
+            'keys': bloom.count if bloom else 0,
+            'bloom_bytes': len(bloom.bits) if bloom else 0,
+        }
+
+
+_revocations = None
+
+
+def revocations():
+    global _revocations
+    if _revocations is None:
+        _revocations = RevocationList(get_store())
+    return _revocations
+
+
+def is_revoked(claims):
+    return revocations().is_revoked(claims)
+
+
+def revoke_token(claims):
+    """Revoke one token, given its claims, until it expires."""
+    expires_at = datetime.fromtimestamp(claims['exp'], dt_timezone.utc)
+    revocations().revoke(claims['jti'], expires_at, claims.get('user_id'))
+
+
+def revoke_user(user_id):
+    """Revoke every token issued to `user_id` so far."""
+    expires_at = timezone.now() + ninja_simple_jwt_settings.JWT_REFRESH_TOKEN_LIFETIME
+    revocations().revoke(user_key(user_id), expires_at, user_id)
+
+
+def stats():
+    return revocations().report()
@@ -1,5 +1,5 @@
 from ninja import Schema, ModelSchema
-from typing import List, Optional, ForwardRef
+from typing import Dict, List, Optional, ForwardRef
 from datetime import datetime
 
 from django.contrib.auth.models import User
@@ -8,6 +8,7 @@ from .models import (
     CourseFeedback, ContentBookmark, Course, CourseContent, CourseMember
 )
 from pydantic import BaseModel, Field
+from lms_core import courses
 
 # Forward references untuk mengatasi circular imports
 CourseSchemaOutRef = ForwardRef('CourseSchemaOut')
@@ -102,6 +103,15 @@ class CourseContentIn(Schema):
     video_url: Optional[str] = None
     parent_id: Optional[int] = None
 
+class CourseOutlineOut(Schema):
+    id: int
+    name: str
+    parent_id: Optional[int] = None
+    depth: int
+
+class ContentMoveIn(Schema):
+    parent_id: Optional[int] = None
+
 # Comment Schemas
 class CourseCommentOut(Schema):
     id: int
@@ -129,7 +139,11 @@ class CourseAnnouncementOut(ModelSchema):
     
     @staticmethod
     def resolve_course_name(obj):
-        return obj.course.name
+        return (courses.get(obj.course_id) or obj.course).name
+
+class AnnouncementPageOut(Schema):
+    items: List[CourseAnnouncementOut]
+    next: Optional[str] = None
 
 class CourseAnnouncementIn(Schema):
     title: str
@@ -158,11 +172,26 @@ class ContentCompletionOut(ModelSchema):
     
     @staticmethod
     def resolve_course_name(obj):
-        return obj.content.course_id.name
+        return (courses.get(obj.content.course_id_id) or obj.content.course_id).name
 
 class ContentCompletionIn(Schema):
     content_id: int
 
+class CourseProgressOut(Schema):
+    course_id: int
+    completed: int
+    total: int
+    percent: float
+
+class CompletionMatrixOut(Schema):
+    course_id: int
+    encoding: str
+    students: List[int]
+    contents: List[int]
+    rows: List[str]  # satu baris per siswa: bit per konten (np.packbits), base64
+    student_totals: List[int]
+    content_rates: List[float]
+
 # Course Feedback Schemas
 class CourseFeedbackOut(ModelSchema):
     student_name: str
@@ -178,7 +207,7 @@ class CourseFeedbackOut(ModelSchema):
     
     @staticmethod
     def resolve_course_name(obj):
-        return obj.course.name
+        return (courses.get(obj.course_id) or obj.course).name
 
 class CourseFeedbackIn(Schema):
     course_id: int
@@ -189,6 +218,13 @@ class CourseFeedbackUpdateIn(Schema):
     rating: Optional[int] = None
     feedback_text: Optional[str] = None
 
+class CourseRatingOut(Schema):
+    course_id: int
+    count: int
+    sum: int
+    average: Optional[float] = None
+    histogram: Dict[int, int]
+
 # Content Bookmark Schemas
 class ContentBookmarkOut(ModelSchema):
     content_name: str
@@ -205,7 +241,7 @@ class ContentBookmarkOut(ModelSchema):
     
     @staticmethod
     def resolve_course_name(obj):
-        return obj.content.course_id.name
+        return (courses.get(obj.content.course_id_id) or obj.content.course_id).name
     
     @staticmethod
     def resolve_content_description(obj):
@@ -214,6 +250,37 @@ class ContentBookmarkOut(ModelSchema):
 class ContentBookmarkIn(Schema):
     content_id: int
 
+# Search Schemas
+class SearchIn(Schema):
+    q: str = Field(..., min_length=1, max_length=200, description="Kata kunci")
+    cursor: Optional[str] = None
+    limit: int = Field(20, ge=1, le=100)
+
+class SearchHitOut(Schema):
+    kind: str  # 'course' atau 'content'
+    id: int
+    course_id: int
+    course_name: str
+    name: str
+    score: float  # makin kecil makin relevan
+
+class SearchPageOut(Schema):
+    items: List[SearchHitOut]
+    next: Optional[str] = None
+
+class SuggestIn(Schema):
+    q: str = Field(..., min_length=1, max_length=100, description="Awal kata nama kursus/kategori")
+    limit: int = Field(10, ge=1, le=20)
+
+class SuggestionOut(Schema):
+    kind: str  # 'course' atau 'category'
+    id: int
+    name: str
+
+# Auth Schemas
+class SignOutRequest(Schema):
+    refresh: Optional[str] = None
+
 # Response Schemas
 class MessageResponse(Schema):
     message: str
@@ -236,7 +303,7 @@ class CategoryUpdateSchema(BaseModel):
     description: Optional[str] = Field(None, description="Deskripsi kategori")
 
 
-class CategoryResponseSchema(BaseModel):
+class CategoryResponseSchema(Schema):
     id: int
     name: str
     description: Optional[str]
@@ -244,8 +311,9 @@ class CategoryResponseSchema(BaseModel):
     created_at: datetime
     updated_at: datetime
 
-    class Config:
-        from_attributes = True
+    @staticmethod
+    def resolve_created_by(obj):
+        return obj.created_by.username
 
 
 class CourseCreateSchema(BaseModel):
@@ -262,7 +330,7 @@ class CourseUpdateSchema(BaseModel):
     category_id: Optional[int] = Field(None, description="ID kategori")
 
 
-class CourseResponseSchema(BaseModel):
+class CourseResponseSchema(Schema):
     id: int
     name: str
     description: str
@@ -272,5 +340,35 @@ class CourseResponseSchema(BaseModel):
     created_at: datetime
     updated_at: datetime
 
-    class Config:
-        from_attributes = True   
\ No newline at end of file
+    @staticmethod
+    def resolve_teacher(obj):
+        return obj.teacher.username
+
+
+# Catalog Schemas
+class CatalogFilterIn(Schema):
+    category: Optional[int] = None
+    teacher: Optional[int] = None
+    price_min: Optional[int] = Field(None, ge=0)
+    price_max: Optional[int] = Field(None, ge=0)
+    cursor: Optional[str] = None
+    limit: int = Field(20, ge=1, le=100)
+
+class CategoryFacetOut(Schema):
+    id: Optional[int]  # None: kursus tanpa kategori
+    name: str
+    count: int
+
+class PriceFacetOut(Schema):
+    min: int
+    max: Optional[int]  # None: tanpa batas atas
+    count: int
+
+class CatalogFacetsOut(Schema):
+    categories: List[CategoryFacetOut]
+    prices: List[PriceFacetOut]
+
+class CatalogPageOut(Schema):
+    items: List[CourseResponseSchema]
+    next: Optional[str] = None
+    facets: CatalogFacetsOut   
@@ -0,0 +1,204 @@
+import re
+
+from django.db import connection
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from ninja.errors import HttpError
+
+from lms_core.models import Course, CourseContent
+from lms_core.pagination import decode_cursor, encode_cursor
+
+# Full-text search over Course and CourseContent (name weighs more than
+# description). The index comes from migration 0010:
+#   - PostgreSQL: a generated tsvector column with a GIN index on each table,
+#     which the database keeps current on every write, bulk loads included;
+#   - SQLite: one FTS5 table per model, keyed by rowid = id, written by the
+#     signal handlers below; bulk loads call rebuild().
+# Both use plain word tokens without stemming, so the two backends match the
+# same rows. A word weighs 1.0 in the name and 0.4 in the description
+# (ts_rank_cd() on PostgreSQL, WEIGHTS on SQLite); results are ranked best
+# first and paged by a cursor over (score, kind, id).
+#
+# Content hits are looked up inside the caller's courses, so their cost does
+# not grow with the contents table; course hits cover the whole catalog, and
+# a word found in most courses costs a sort of all of them.
+
+KINDS = ('content', 'course')
+
+# Weight of a word found in each column
+WEIGHTS = (('name', 1.0), ('description', 0.4))
+
+# Courses the caller (both %s) teaches or has joined. Content hits are
+# looked up inside these rather than filtered out of every match: a user
+# sees a few hundred contents however large the table is.
+ACCESSIBLE_COURSES = ("SELECT id FROM lms_core_course WHERE teacher_id = %s UNION "
+                      "SELECT course_id_id FROM lms_core_coursemember WHERE user_id_id = %s")
+
+
+def terms(q):
+    return re.findall(r'\w+', q.lower())
+
+
+class SqliteIndex:
+    # FTS5 table, its columns and the SELECT that fills them, per model.
+    # Contents also index their course as a "c<id>" token: the caller's
+    # courses then become part of the MATCH, and FTS5 skips through the
+    # doclists of common words instead of ranking every content that has them.
+    TABLES = {
+        Course: ('lms_core_course_fts', 'name, description',
+                 "SELECT id, name, description FROM lms_core_course"),
+        CourseContent: ('lms_core_coursecontent_fts', 'name, description, course',
+                        "SELECT id, name, description, 'c' || course_id_id FROM lms_core_coursecontent"),
+    }
+
+    def score(self, table, rowid, words, scope=''):
+        """Score expression and params: 1.0 per word found in the name, 0.4 per word in the description.
+
+        These are the A/B weights ts_rank_cd() uses on PostgreSQL. bm25() is
+        not used because it reads the whole doclist of every query word to
+        weigh it, i.e. most of a 1M-row table for a common word, where each
+        MATCH below stops at the caller's courses.
+        """
+        parts, params = [], []
+        for word in words:
+            for column, weight in WEIGHTS:
+                parts.append(f"{weight} * ({rowid} IN (SELECT rowid FROM {table}(%s)))")
+                params.append(f'{column} : "{word}"{scope}')
+        return f"-({' + '.join(parts)})", params
+
+    def hits(self, words, user_id):
+        """SQL and params of every hit; the score is lower for better matches."""
+        phrase = ' '.join(f'"{word}"' for word in words)
+        score, params = self.score('lms_core_course_fts', 'c.id', words)
+        sql = f"""
+            SELECT 'course' AS kind, c.id AS id, c.id AS course_id, c.name AS course_name,
+                   c.name AS name, {score} AS score
+            FROM lms_core_course_fts JOIN lms_core_course c ON c.id = lms_core_course_fts.rowid
+            WHERE lms_core_course_fts MATCH %s"""
+        params.append(phrase)
+        with connection.cursor() as cursor:
+            cursor.execute(ACCESSIBLE_COURSES, [user_id, user_id])
+            courses = [row[0] for row in cursor.fetchall()]
+        if courses:
+            scope = f" AND course : ({' OR '.join(f'c{course}' for course in courses)})"
+            score, score_params = self.score('lms_core_coursecontent_fts', 'cc.id', words, scope)
+            sql += f"""
+            UNION ALL
+            SELECT 'content', cc.id, cc.course_id_id, c.name, cc.name, {score}
+            FROM lms_core_coursecontent_fts
+            JOIN lms_core_coursecontent cc ON cc.id = lms_core_coursecontent_fts.rowid
+            JOIN lms_core_course c ON c.id = cc.course_id_id
+            WHERE lms_core_coursecontent_fts MATCH %s"""
+            params += score_params + [f"{{name description}} : ({phrase}){scope}"]
+        return sql, params
+
+    def values(self, instance):
+        values = [instance.pk, instance.name, instance.description]
+        if isinstance(instance, CourseContent):
+            values.append(f'c{instance.course_id_id}')
+        return values
+
+    def index(self, instance):
+        table, columns, _ = self.TABLES[type(instance)]
+        values = self.values(instance)
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {table} WHERE rowid = %s", [instance.pk])
+            cursor.execute(f"INSERT INTO {table} (rowid, {columns}) VALUES ({', '.join(['%s'] * len(values))})",
+                           values)
+
+    def unindex(self, instance):
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {self.TABLES[type(instance)][0]} WHERE rowid = %s", [instance.pk])
+
+    def rebuild(self):
+        with connection.cursor() as cursor:
+            for table, columns, select in self.TABLES.values():
+                cursor.execute(f"DELETE FROM {table}")
+                cursor.execute(f"INSERT INTO {table} (rowid, {columns}) {select}")
+
+
+class PostgresIndex:
+    def hits(self, words, user_id):
+        """SQL and params of every hit, with the rank negated so lower is better as on SQLite."""
+        match = ' '.join(words)
+        sql = f"""
+            SELECT 'course' AS kind, c.id AS id, c.id AS course_id, c.name AS course_name,
+                   c.name AS name, -ts_rank_cd(c.search_vector, plainto_tsquery('simple', %s))::float8 AS score
+            FROM lms_core_course c
+            WHERE c.search_vector @@ plainto_tsquery('simple', %s)
+            UNION ALL
+            SELECT 'content', cc.id, cc.course_id_id, c.name,
+                   cc.name, -ts_rank_cd(cc.search_vector, plainto_tsquery('simple', %s))::float8
+            FROM lms_core_coursecontent cc JOIN lms_core_course c ON c.id = cc.course_id_id
+            WHERE cc.search_vector @@ plainto_tsquery('simple', %s)
+              AND cc.course_id_id IN ({ACCESSIBLE_COURSES})"""
+        return sql, [match] * 4 + [user_id, user_id]
+
+    def index(self, instance):
+        pass
+
+    def unindex(self, instance):
+        pass
+
+    def rebuild(self):
+        pass
+
+
+def get_index():
+    if connection.vendor == 'sqlite':
+        return SqliteIndex()
+    if connection.vendor == 'postgresql':
+        return PostgresIndex()
+    raise HttpError(501, "Pencarian tidak didukung pada database ini")
+
+
+def search(user_id, q, cursor=None, limit=20):
+    """One page of hits for `q`: {'items': [...], 'next': cursor or None}."""
+    words = terms(q)
+    if not words:
+        return {'items': [], 'next': None}
+    hits, params = get_index().hits(words, user_id)
+    after = ''
+    if cursor:
+        value, pk = decode_cursor(cursor)
+        if not (isinstance(value, list) and len(value) == 2 and isinstance(value[0], (int, float))
+                and value[1] in KINDS and isinstance(pk, int)):
+            raise HttpError(400, "Cursor tidak valid")
+        score, kind = value
+        after = 'WHERE (score, kind, id) > (%s, %s, %s)'
+        params += [score, kind, pk]
+    sql = (f"SELECT kind, id, course_id, course_name, name, score FROM ({hits}) AS hits "
+           f"{after} ORDER BY score, kind, id LIMIT %s")
+    with connection.cursor() as db:
+        db.execute(sql, params + [limit + 1])
+        columns = [column[0] for column in db.description]
+        items = [dict(zip(columns, row)) for row in db.fetchall()]
+    next_cursor = None
+    if len(items) > limit:
+        items = items[:limit]
+        last = items[-1]
+        next_cursor = encode_cursor([last['score'], last['kind']], last['id'])
+    return {'items': items, 'next': next_cursor}
+
+
+def rebuild():
+    """Re-index every row; for writers that bypass the signals (bulk loads)."""
+    if connection.vendor in ('sqlite', 'postgresql'):
+        get_index().rebuild()
+
+
+@receiver(post_save, sender='lms_core.Course')
+@receiver(post_save, sender='lms_core.CourseContent')
+def index_saved(sender, instance, update_fields=None, **kwargs):
+    if connection.vendor != 'sqlite':
+        return
+    if update_fields is not None and not {'name', 'description', 'course_id'} & set(update_fields):
+        return
+    get_index().index(instance)
+
+
+@receiver(post_delete, sender='lms_core.Course')
+@receiver(post_delete, sender='lms_core.CourseContent')
+def index_deleted(sender, instance, **kwargs):
+    if connection.vendor == 'sqlite':
+        get_index().unindex(instance)
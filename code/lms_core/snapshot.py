@@ -0,0 +1,143 @@
+import hashlib
+import json
+import os
+import sqlite3
+import subprocess
+import time
+
+from django.conf import settings
+from django.db import connection, connections
+from django.db.migrations.executor import MigrationExecutor
+
+# Snapshots of a seeded database, so benchmark and test jobs can start from a
+# known dataset in seconds instead of re-running the importer or generator.
+#
+# A snapshot is keyed by a dataset label (usually the generator tier) and the
+# migration state of the code, so a snapshot taken before a schema change is
+# never restored on top of newer code. SQLite databases are copied with the
+# sqlite3 backup API; PostgreSQL ones are dumped with pg_dump in custom
+# format and restored with pg_restore.
+
+SNAPSHOT_DIR = os.path.join(settings.BASE_DIR, 'snapshots')
+
+
+class SnapshotError(Exception):
+    pass
+
+
+def migration_state():
+    """Short hash of the latest migration of every app, as found on disk."""
+    executor = MigrationExecutor(connection)
+    leaves = sorted(executor.loader.graph.leaf_nodes())
+    if executor.migration_plan(leaves):
+        raise SnapshotError("The database has unapplied migrations, run migrate first")
+    return hashlib.sha256(json.dumps(leaves).encode()).hexdigest()[:12]
+
+
+def snapshot_key(label):
+    return f'{label}-{migration_state()}'
+
+
+def engine():
+    name = settings.DATABASES['default']['ENGINE']
+    if name.endswith('sqlite3'):
+        return 'sqlite'
+    if name.endswith(('postgresql', 'postgis')):
+        return 'postgresql'
+    raise SnapshotError(f"Snapshots are not supported for {name}")
+
+
+def snapshot_path(key, directory=SNAPSHOT_DIR):
+    extension = {'sqlite': 'sqlite3', 'postgresql': 'dump'}[engine()]
+    return os.path.join(directory, f'{key}.{extension}')
+
+
+def pg_env():
+    database = settings.DATABASES['default']
+    env = dict(os.environ)
+    if database.get('PASSWORD'):
+        env['PGPASSWORD'] = str(database['PASSWORD'])
+    return env
+
+
+def pg_args():
+    database = settings.DATABASES['default']
+    args = []
+    for option, key in (('--host', 'HOST'), ('--port', 'PORT'), ('--username', 'USER')):
+        if database.get(key):
+            args += [option, str(database[key])]
+    return args + ['--dbname', str(database['NAME'])]
+
+
+def sqlite_copy(source, target):
+    """Consistent copy of a SQLite database, even while it is in use."""
+    src, dst = sqlite3.connect(source), sqlite3.connect(target)
+    try:
+        src.backup(dst)
+    finally:
+        src.close()
+        dst.close()
+
+
+def save(label, directory=SNAPSHOT_DIR, force=False):
+    """Snapshot the default database under `label`; returns the snapshot's path."""
+    key = snapshot_key(label)
+    path = snapshot_path(key, directory)
+    if os.path.exists(path) and not force:
+        raise SnapshotError(f"Snapshot {key} already exists")
+    os.makedirs(directory, exist_ok=True)
+    start = time.time()
+    # Write next to the target and rename, so a failed run never leaves a
+    # truncated snapshot behind
+    partial = path + '.partial'
+    if engine() == 'sqlite':
+        connections.close_all()
+        sqlite_copy(settings.DATABASES['default']['NAME'], partial)
+    else:
+        subprocess.run(['pg_dump', '--format=custom', '--file', partial, *pg_args()],
+                       env=pg_env(), check=True)
+    os.replace(partial, path)
+    with open(path + '.json', 'w') as meta:
+        json.dump({'key': key, 'label': label, 'engine': engine(),
+                   'created': time.time(), 'seconds': time.time() - start}, meta)
+    return path
+
+
+def restore(label, directory=SNAPSHOT_DIR, jobs=4):
+    """Replace the default database with snapshot `label` for the current migration state."""
+    key = snapshot_key(label)
+    path = snapshot_path(key, directory)
+    if not os.path.exists(path):
+        raise SnapshotError(f"No snapshot {key} (dataset {label!r} at the current migration state)")
+    connections.close_all()
+    if engine() == 'sqlite':
+        target = settings.DATABASES['default']['NAME']
+        # Restore through the backup API as well, so open readers see either
+        # the old or the new database and never a half-copied file
+        sqlite_copy(path, target)
+    else:
+        subprocess.run(['pg_restore', '--clean', '--if-exists', '--no-owner', f'--jobs={jobs}',
+                        *pg_args(), path], env=pg_env(), check=True)
+    return path
+
+
+def available(directory=SNAPSHOT_DIR):
+    """Metadata of every snapshot in `directory`, newest first."""
+    if not os.path.isdir(directory):
+        return []
+    snapshots = []
+    for name in os.listdir(directory):
+        if name.endswith('.json'):
+            with open(os.path.join(directory, name)) as meta:
+                info = json.load(meta)
+            data = os.path.join(directory, name[:-len('.json')])
+            info['size'] = os.path.getsize(data) if os.path.exists(data) else 0
+            snapshots.append(info)
+    return sorted(snapshots, key=lambda info: info['created'], reverse=True)
+
+
+def remove(key, directory=SNAPSHOT_DIR):
+    path = snapshot_path(key, directory)
+    for name in (path, path + '.json'):
+        if os.path.exists(name):
+            os.remove(name)
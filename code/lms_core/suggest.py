@@ -0,0 +1,246 @@
+import re
+import threading
+import time
+import unicodedata
+from array import array
+from bisect import bisect_left
+from collections import Counter
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from lms_core.models import Category, Course
+
+# Typeahead for the course picker: a per-process prefix index over
+# Course.name and Category.name, answered without touching the database.
+#
+# Names are folded (lower case, accents removed) and every word start becomes
+# a key: "Pengantar Basis Data" is found by "peng", "basis" and "dat". Keys
+# are kept in two sorted lists (whole-name keys, then later-word keys) with a
+# parallel array of refs (id * 2, + 1 for categories), so a lookup is two
+# bisects plus a walk over at most a few dozen entries.
+#
+# The index is loaded on the first lookup and holds the SUGGEST_INDEX_MAX_COURSES
+# newest courses (the oldest are dropped as new ones arrive); keys are cut to
+# KEY_LENGTH characters. Saves and deletes update it in this process; it is
+# reloaded SUGGEST_INDEX_TTL seconds after loading so other processes (and
+# bulk loads, which call reset()) catch up.
+
+KEY_LENGTH = 24
+
+MAX_COURSES = getattr(settings, 'SUGGEST_INDEX_MAX_COURSES', 50000)
+TTL = getattr(settings, 'SUGGEST_INDEX_TTL', 300)
+
+KINDS = ('course', 'category')
+
+
+def fold(text):
+    text = unicodedata.normalize('NFKD', text or '')
+    return ''.join(char for char in text if not unicodedata.combining(char)).casefold()
+
+
+def keys(name):
+    """(whole-name key, [keys of the later words]) of `name`."""
+    folded = fold(name)
+    starts = [match.start() for match in re.finditer(r'\w+', folded)]
+    if not starts:
+        return folded[:KEY_LENGTH], []
+    return folded[starts[0]:][:KEY_LENGTH], [folded[start:][:KEY_LENGTH] for start in starts[1:]]
+
+
+class SortedKeys:
+    """Sorted keys with a parallel array of refs; duplicates are allowed."""
+
+    def __init__(self):
+        self.keys = []
+        self.refs = array('q')
+
+    def load(self, pairs):
+        pairs.sort()
+        self.keys = [key for key, _ in pairs]
+        self.refs = array('q', (ref for _, ref in pairs))
+
+    def add(self, key, ref):
+        i = bisect_left(self.keys, key)
+        self.keys.insert(i, key)
+        self.refs.insert(i, ref)
+
+    def remove(self, key, ref):
+        i = bisect_left(self.keys, key)
+        while i < len(self.keys) and self.keys[i] == key:
+            if self.refs[i] == ref:
+                del self.keys[i]
+                del self.refs[i]
+                return
+            i += 1
+
+    def scan(self, prefix):
+        """Refs of the keys starting with `prefix`, in key order."""
+        i = bisect_left(self.keys, prefix)
+        while i < len(self.keys) and self.keys[i].startswith(prefix):
+            yield self.refs[i]
+            i += 1
+
+
+class PrefixIndex:
+    def __init__(self, max_courses=MAX_COURSES, ttl=TTL):
+        self.max_courses = max_courses
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        # One thread reloads while the others keep reading the old index
+        self.load_lock = threading.Lock()
+        self.stats = Counter()
+        self.reset()
+
+    def reset(self):
+        """Forget everything; the next lookup reloads from the database."""
+        with self.lock:
+            self.names = SortedKeys()
+            self.words = SortedKeys()
+            # ref -> name; courses in the order they were added, oldest first
+            self.entries = {}
+            self.courses = 0
+            self.expires = 0
+
+    def load(self):
+        categories = list(Category.objects.values_list('id', 'name'))
+        courses = list(Course.objects.order_by('-id').values_list('id', 'name')[:self.max_courses])
+        entries = {pk * 2 + 1: name for pk, name in categories}
+        entries.update((pk * 2, name) for pk, name in reversed(courses))
+        names, words = [], []
+        for ref, name in entries.items():
+            first, rest = keys(name)
+            names.append((first, ref))
+            words.extend((key, ref) for key in rest)
+        with self.lock:
+            self.names.load(names)
+            self.words.load(words)
+            self.entries = entries
+            self.courses = len(courses)
+            self.expires = time.time() + self.ttl
+        self.stats['loads'] += 1
+
+    def add(self, ref, name):
+        if ref in self.entries:
+            self.remove(ref)
+        first, rest = keys(name)
+        self.names.add(first, ref)
+        for key in rest:
+            self.words.add(key, ref)
+        self.entries[ref] = name
+        if not ref & 1:
+            self.courses += 1
+            if self.courses > self.max_courses:
+                oldest = next(other for other in self.entries if not other & 1)
+                self.remove(oldest)
+                self.stats['evicted'] += 1
+
+    def remove(self, ref):
+        name = self.entries.pop(ref, None)
+        if name is None:
+            return
+        first, rest = keys(name)
+        self.names.remove(first, ref)
+        for key in rest:
+            self.words.remove(key, ref)
+        if not ref & 1:
+            self.courses -= 1
+
+    def update(self, ref, name=None):
+        """Index `name` under `ref`, or drop `ref` when `name` is None; no-op until loaded."""
+        with self.lock:
+            if not self.expires:
+                return
+            if name is None:
+                self.remove(ref)
+            else:
+                self.add(ref, name)
+
+    def suggest(self, q, limit=10):
+        """Up to `limit` courses/categories with a word starting with `q`, whole-name matches first."""
+        prefix = fold(q).strip()
+        if not prefix:
+            return []
+        if self.expires <= time.time():
+            with self.load_lock:
+                if self.expires <= time.time():
+                    self.load()
+        self.stats['lookups'] += 1
+        found = []
+        with self.lock:
+            seen = set()
+            for index in (self.names, self.words):
+                for ref in index.scan(prefix[:KEY_LENGTH]):
+                    if ref in seen:
+                        continue
+                    seen.add(ref)
+                    name = self.entries[ref]
+                    if len(prefix) > KEY_LENGTH and not self.starts_word(name, prefix):
+                        continue
+                    found.append({'kind': KINDS[ref & 1], 'id': ref >> 1, 'name': name})
+                    if len(found) == limit:
+                        return found
+        return found
+
+    @staticmethod
+    def starts_word(name, prefix):
+        # Keys are cut short, so a long prefix is checked against the full name
+        folded = fold(name)
+        return any(folded[match.start():].startswith(prefix) for match in re.finditer(r'\w+', folded))
+
+    def report(self):
+        with self.lock:
+            return {
+                **self.stats,
+                'courses': self.courses,
+                'categories': len(self.entries) - self.courses,
+                'keys': len(self.names.keys) + len(self.words.keys),
+                'max_courses': self.max_courses,
+                'ttl': self.ttl,
+            }
+
+
+index = PrefixIndex()
+
+
+def suggest(q, limit=10):
+    return index.suggest(q, limit)
+
+
+def reset():
+    index.reset()
+
+
+def stats():
+    return index.report()
+
+
+def changed(ref, name=None):
+    index.update(ref, name)
+    # A reload started by another thread before the write commits would miss
+    # it, so apply it once more after commit
+    transaction.on_commit(lambda: index.update(ref, name))
+
+
+@receiver(post_save, sender='lms_core.Course')
+def course_saved(sender, instance, update_fields=None, **kwargs):
+    if update_fields is None or 'name' in update_fields:
+        changed(instance.pk * 2, instance.name)
+
+
+@receiver(post_delete, sender='lms_core.Course')
+def course_deleted(sender, instance, **kwargs):
+    changed(instance.pk * 2)
+
+
+@receiver(post_save, sender='lms_core.Category')
+def category_saved(sender, instance, update_fields=None, **kwargs):
+    if update_fields is None or 'name' in update_fields:
+        changed(instance.pk * 2 + 1, instance.name)
+
+
+@receiver(post_delete, sender='lms_core.Category')
+def category_deleted(sender, instance, **kwargs):
+    changed(instance.pk * 2 + 1)
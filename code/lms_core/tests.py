@@ -0,0 +1,441 @@
+import csv
+import json
+import os
+import tempfile
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.exceptions import ValidationError
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from ninja.errors import HttpError
+
+from lms_core import announcements, catalog, courses, membership, profiles, progress, revocation, search, suggest
+from lms_core.auth import claims_user
+from lms_core.importer import Importer, StageResult, bulk_insert, get_backend, refresh_derived
+from lms_core.models import (Category, Comment, CourseAnnouncement, ContentBookmark, ContentCompletion, Course, CourseContent, CourseFeedback,
+                             CourseMember, CourseProgress, ImportCheckpoint, ProfileDocument, UserProfile)
+from lms_core.pagination import CursorPagination
+from lms_core.schema import ContentBookmarkOut, CourseFeedbackOut
+
+
+class ClaimsUserTests(SimpleTestCase):
+    claims = {
+        'user_id': 7,
+        'username': 'lestari',
+        'email': 'l@x.com',
+        'first_name': 'Lestari',
+        'last_name': 'Gunawan',
+    }
+
+    def test_each_field_gets_its_claim(self):
+        user = claims_user(self.claims)
+        self.assertEqual(user.id, 7)
+        self.assertEqual(user.username, 'lestari')
+        self.assertEqual(user.email, 'l@x.com')
+        self.assertEqual(user.first_name, 'Lestari')
+        self.assertEqual(user.last_name, 'Gunawan')
+
+    def test_missing_claims_are_deferred(self):
+        claims = {key: value for key, value in self.claims.items() if key not in ('email', 'first_name')}
+        user = claims_user(claims)
+        self.assertEqual(user.username, 'lestari')
+        self.assertEqual(user.last_name, 'Gunawan')
+        self.assertEqual(user.get_deferred_fields() & {'email', 'first_name'}, {'email', 'first_name'})
+
+
+@mock.patch.multiple('lms_core.importer', profiles=mock.DEFAULT, ratings=mock.DEFAULT, progress=mock.DEFAULT,
+                     search=mock.DEFAULT, suggest=mock.DEFAULT, courses=mock.DEFAULT)
+class RefreshDerivedTests(SimpleTestCase):
+    def test_nothing_written(self, **modules):
+        refresh_derived(set())
+        for module in modules.values():
+            self.assertFalse(module.mock_calls)
+
+    def test_only_dependent_rebuilds_run(self, ratings, progress, search, **modules):
+        refresh_derived({ContentCompletion, Comment})
+        progress.rebuild.assert_called_once_with()
+        ratings.rebuild.assert_not_called()
+        search.rebuild.assert_not_called()
+        refresh_derived({CourseFeedback})
+        ratings.rebuild.assert_called_once_with()
+
+
+class ContentPathTests(TestCase):
+    def setUp(self):
+        teacher = User.objects.create(username='guru')
+        self.course = Course.objects.create(name='Basis Data', description='-', price=0, teacher=teacher)
+
+    def chain(self, length, parent=None):
+        contents = []
+        for i in range(length):
+            parent = CourseContent.objects.create(name=f'Bab {i}', course_id=self.course, parent_id=parent)
+            contents.append(parent)
+        return contents
+
+    def test_move_too_deep_for_the_subtree(self):
+        # 40 levels fill 240 of the 255 characters of the deepest path
+        branch = self.chain(40)
+        target = self.chain(3)[-1]
+        branch[0].parent_id = target
+        with self.assertRaises(ValidationError):
+            branch[0].save()
+        branch[-1].refresh_from_db()
+        self.assertEqual(len(branch[-1].path), 240)
+
+    def test_move_carries_the_subtree(self):
+        branch = self.chain(3)
+        target = self.chain(1)[0]
+        branch[0].parent_id = target
+        branch[0].save()
+        branch[-1].refresh_from_db()
+        self.assertTrue(branch[-1].path.startswith(target.path))
+        self.assertEqual(branch[-1].depth, 3)
+
+
+class ProfileDocumentTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(username='lestari')
+
+    def test_read_creates_no_profile(self):
+        etag, body = profiles.get(self.user.id)
+        self.assertIn('"profile": null', body)
+        self.assertFalse(UserProfile.objects.exists())
+        self.assertEqual(profiles.get(self.user.id), (etag, body))
+
+    def test_build_racing_an_invalidation_is_not_stored(self):
+        render = profiles.renderer.render
+
+        def invalidated_while_rendering(*args, **kwargs):
+            profiles.invalidate_all()
+            return render(*args, **kwargs)
+
+        with mock.patch.object(profiles.renderer, 'render', side_effect=invalidated_while_rendering):
+            profiles.get(self.user.id)
+        self.assertEqual(ProfileDocument.objects.get(user=self.user).body, '')
+        self.user.first_name = 'Lestari'
+        self.user.save()
+        self.assertIn('"first_name": "Lestari"', profiles.get(self.user.id)[1])
+
+
+class CourseCacheTests(TestCase):
+    def setUp(self):
+        self.teacher = User.objects.create(username='guru')
+        self.course = Course.objects.create(name='Basis Data', description='-', price=0, teacher=self.teacher)
+        self.addCleanup(courses.clear)
+
+    def test_missing_course_is_not_cached(self):
+        missing = self.course.id + 1
+        self.assertIsNone(courses.get(missing))
+        # Created by another process: no signal reaches this one
+        Course.objects.bulk_create([Course(id=missing, name='Jaringan', description='-', price=0,
+                                           teacher=self.teacher)])
+        self.assertEqual(courses.get(missing).name, 'Jaringan')
+
+    def test_teacher_check_ignores_cached_record(self):
+        other = User.objects.create(username='guru2')
+        self.assertEqual(courses.get(self.course.id).teacher_id, self.teacher.id)
+        Course.objects.filter(id=self.course.id).update(teacher=other)
+        self.assertFalse(courses.is_teacher(self.teacher, self.course.id))
+        self.assertTrue(courses.is_teacher(other, self.course.id))
+
+    def test_course_name_without_record(self):
+        feedback = CourseFeedback(course=self.course, student=self.teacher, rating=5)
+        content = CourseContent.objects.create(name='Bab 1', course_id=self.course)
+        bookmark = ContentBookmark(content=content, student=self.teacher)
+        with mock.patch.object(courses, 'get', return_value=None):
+            self.assertEqual(CourseFeedbackOut.resolve_course_name(feedback), 'Basis Data')
+            self.assertEqual(ContentBookmarkOut.resolve_course_name(bookmark), 'Basis Data')
+
+
+def write_seed(path):
+    """A small seed directory in the importer's formats: 2 users, 1 course, 1 member, 2 contents, ..."""
+    def write_csv(name, header, rows):
+        with open(os.path.join(path, name), 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(header)
+            writer.writerows(rows)
+
+    def write_json(name, data):
+        with open(os.path.join(path, name), 'w') as f:
+            json.dump(data, f)
+
+    write_csv('user-data.csv', ['firstname', 'lastname', 'email', 'password', 'username'],
+              [['Ayu', 'Lestari', 'ayu@x.com', 'rahasia1', 'ayu'], ['Budi', 'Santoso', 'budi@x.com', 'rahasia2', 'budi']])
+    write_csv('course-data.csv', ['name', 'url', 'description', 'site', 'price', 'teacher'],
+              [['Basis Data', 'https://x.com/bd', 'SQL', 'X', '100000', '1']])
+    write_csv('member-data.csv', ['course_id', 'user_id', 'roles'], [['1', '2', 'std'], ['1', '2', 'std']])
+    write_json('contents.json', [
+        {'course_id': 1, 'video_url': None, 'name': 'Bab 1', 'description': '-'},
+        {'course_id': 1, 'video_url': None, 'name': 'Bab 2', 'description': '-'},
+    ])
+    write_json('comments.json', [{'content_id': 1, 'user_id': 2, 'comment': 'Mantap'},
+                                 {'content_id': 2, 'user_id': 1, 'comment': 'Bukan anggota'}])
+    write_json('dummyData.json', {
+        'course_announcements': [],
+        'content_completions': [{'id': 1, 'student': 2, 'content': 2, 'completed_at': '2024-06-02T09:15:00Z'}],
+        'course_feedbacks': [{'id': 1, 'course': 1, 'student': 2, 'rating': 4, 'feedback_text': 'Bagus',
+                              'created_at': '2024-06-10T13:20:00Z', 'updated_at': '2024-06-10T13:20:00Z'}],
+        'content_bookmarks': [],
+        'user_profiles': [],
+    })
+
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class ImporterTests(TransactionTestCase):
+    # The seed files refer to users, courses and contents by id
+    reset_sequences = True
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = directory.name
+        write_seed(self.path)
+
+    def run_import(self, **kwargs):
+        importer = Importer(self.path, **{'jobs': 0, **kwargs})
+        with mock.patch('builtins.print'):
+            self.assertEqual(importer.run(), {})
+        return {key: result.imported for key, result in importer.results}
+
+    def test_dry_run_writes_nothing(self):
+        with mock.patch('lms_core.importer.make_password') as make_password:
+            planned = self.run_import(dry_run=True)
+        make_password.assert_not_called()
+        self.assertFalse(User.objects.exists())
+        self.assertFalse(ImportCheckpoint.objects.exists())
+        # Foreign keys resolved against the rows earlier stages would have written
+        self.assertEqual(planned, self.run_import())
+        self.assertEqual(planned['comments'], 1)
+        self.assertEqual(planned['content_completions'], 1)
+
+    def test_rerun_skips_completed_stages(self):
+        self.run_import()
+        self.assertEqual(self.run_import(), {})
+
+    def test_restart_adds_no_duplicates(self):
+        first = self.run_import()
+        self.assertEqual(first['members'], 1)
+        self.assertEqual(first['comments'], 1)
+        counts = {model: model.objects.count() for model in (User, Course, CourseMember, CourseContent, Comment,
+                                                               ContentCompletion, CourseFeedback)}
+        again = self.run_import(restart=True)
+        self.assertEqual(set(again.values()), {0})
+        self.assertEqual({model: model.objects.count() for model in counts}, counts)
+
+    def test_explicit_ids_advance_the_sequence(self):
+        self.run_import()
+        # The completion was imported with id 1; a new row must not reuse it
+        completion = ContentCompletion.objects.create(student_id=2, content_id=1)
+        self.assertEqual(completion.id, 2)
+
+    def test_sqlite_runs_stages_one_by_one(self):
+        importer = Importer(self.path, jobs=4)
+        self.assertEqual(importer.jobs, 0 if connection.vendor == 'sqlite' else 4)
+        imported = self.run_import(jobs=4)
+        self.assertEqual(imported['members'], 1)
+        self.assertEqual(imported['course_feedbacks'], 1)
+
+
+class BackendTests(TestCase):
+    def test_conflicting_rows_are_skipped_and_not_counted(self):
+        # Same behaviour on SQLite and PostgreSQL (get_backend() follows the test database)
+        existing = User.objects.create(username='ayu')
+        rows = [User(id=existing.id, username='ayu2'), User(id=existing.id + 1, username='budi')]
+        result = bulk_insert(User, rows, StageResult("Users"), batch_size=10, backend=get_backend())
+        self.assertEqual(result.imported, 1)
+        self.assertEqual(result.skipped, {"already in the database": 1})
+        self.assertEqual(sorted(User.objects.values_list('username', flat=True)), ['ayu', 'budi'])
+
+
+class ProgressTests(TestCase):
+    def test_subtree_delete_clears_bits_in_one_pass(self):
+        teacher = User.objects.create(username='guru')
+        course = Course.objects.create(name='Basis Data', description='-', price=0, teacher=teacher)
+        root = CourseContent.objects.create(name='Bab 1', course_id=course)
+        child = CourseContent.objects.create(name='Bab 1.1', course_id=course, parent_id=root)
+        CourseContent.objects.create(name='Bab 1.1.1', course_id=course, parent_id=child)
+        kept = CourseContent.objects.create(name='Bab 2', course_id=course)
+        everything = progress.to_bytes(0b1111)
+        for username in ('ayu', 'budi'):
+            student = User.objects.create(username=username)
+            CourseProgress.objects.create(student=student, course=course, bits=everything)
+        subtree = CourseContent.objects.filter(course_id=course, path__startswith=root.path)
+        with CaptureQueriesContext(connection) as queries, progress.batched_clear():
+            subtree.delete()
+        self.assertEqual(len([query for query in queries.captured_queries
+                              if 'FROM "lms_core_courseprogress"' in query['sql']]), 1)
+        for bits in CourseProgress.objects.values_list('bits', flat=True):
+            self.assertEqual(progress.to_int(bits), 1 << kept.position)
+
+
+class AnnouncementFeedTests(TestCase):
+    def test_local_pages_follow_writes_of_other_processes(self):
+        teacher = User.objects.create(username='guru')
+        course = Course.objects.create(name='Basis Data', description='-', price=0, teacher=teacher)
+        # A FeedCache of its own: the signals only bump the module's feed, as
+        # another process's writes would never reach this one
+        feed = announcements.FeedCache(announcements.LocalStore())
+        announcement = CourseAnnouncement.objects.create(course=course, teacher=teacher, title='Kuis 1',
+                                                         content='-', publish_date=timezone.now())
+        self.assertIn('Kuis 1', feed.page(course.id))
+        self.assertIn('Kuis 1', feed.page(course.id))
+        self.assertEqual(feed.stats['hits'], 1)
+        announcement.title = 'Kuis 2'
+        announcement.save()
+        self.assertIn('Kuis 2', feed.page(course.id))
+        announcement.delete()
+        self.assertNotIn('Kuis 2', feed.page(course.id))
+
+
+class CursorPaginationTests(TestCase):
+    def setUp(self):
+        self.teacher = User.objects.create(username='guru')
+        course = Course.objects.create(name='Basis Data', description='-', price=0, teacher=self.teacher)
+        same_time = timezone.now()
+        for i in range(5):
+            CourseAnnouncement.objects.create(course=course, teacher=self.teacher, title=f'Info {i}',
+                                              content='-', publish_date=same_time)
+        # Ties on the sort key are broken by id
+        CourseAnnouncement.objects.update(created_at=same_time)
+        self.queryset = CourseAnnouncement.objects.order_by('-created_at')
+
+    def pages(self, limit):
+        paginator, cursor, ids = CursorPagination(), None, []
+        while True:
+            page = paginator.paginate_queryset(self.queryset, CursorPagination.Input(cursor=cursor, limit=limit))
+            ids.extend(item.id for item in page['items'])
+            cursor = page['next']
+            if cursor is None:
+                return ids
+
+    def test_pages_follow_sort_key_then_id(self):
+        expected = list(CourseAnnouncement.objects.order_by('-created_at', '-id').values_list('id', flat=True))
+        for limit in (1, 2, 5, 10):
+            self.assertEqual(self.pages(limit), expected)
+
+    def test_invalid_cursor(self):
+        with self.assertRaises(HttpError) as raised:
+            CursorPagination().paginate_queryset(self.queryset, CursorPagination.Input(cursor='!!', limit=2))
+        self.assertEqual(raised.exception.status_code, 400)
+
+
+class MembershipCacheTests(TestCase):
+    def setUp(self):
+        self.teacher = User.objects.create(username='guru')
+        self.student = User.objects.create(username='siswa')
+        self.course = Course.objects.create(name='Basis Data', description='-', price=0, teacher=self.teacher)
+        self.addCleanup(membership.cache.clear)
+
+    def test_saving_and_deleting_a_member_invalidates(self):
+        self.assertFalse(membership.is_member(self.student, self.course.id))
+        member = CourseMember.objects.create(course_id=self.course, user_id=self.student, roles='std')
+        self.assertEqual(membership.role(self.student, self.course.id), 'std')
+        member.roles = 'ast'
+        member.save()
+        self.assertTrue(membership.is_member(self.student, self.course.id, roles=['ast']))
+        member.delete()
+        self.assertFalse(membership.is_member(self.student, self.course.id))
+
+    def test_token_claim_round_trip(self):
+        for i, course_id in enumerate((self.course.id, 70000, 70001)):
+            course = Course.objects.create(id=course_id, name=f'K{i}', description='-', price=0,
+                                           teacher=self.teacher) if course_id != self.course.id else self.course
+            CourseMember.objects.create(course_id=course, user_id=self.student, roles='ast' if i else 'std')
+        roles = membership.claim_roles(membership.token_claim(self.student))
+        self.assertEqual(roles, {self.course.id: 'std', 70000: 'ast', 70001: 'ast'})
+
+
+class CourseRecordTests(TestCase):
+    def test_save_and_delete_invalidate(self):
+        self.addCleanup(courses.clear)
+        teacher = User.objects.create(username='guru')
+        course = Course.objects.create(name='Basis Data', description='-', price=0, teacher=teacher)
+        self.assertEqual(courses.get(course.id).name, 'Basis Data')
+        course.name = 'Basis Data Lanjut'
+        course.save()
+        self.assertEqual(courses.get(course.id).name, 'Basis Data Lanjut')
+        course_id = course.id
+        course.delete()
+        self.assertIsNone(courses.get(course_id))
+
+
+class RevocationTests(TestCase):
+    def setUp(self):
+        self.revocations = revocation.RevocationList(revocation.DatabaseStore())
+        self.user = User.objects.create(username='ayu')
+        now = timezone.now()
+        self.claims = {'jti': 'a1', 'user_id': self.user.id, 'iat': now.timestamp() - 60,
+                       'exp': (now + timedelta(hours=1)).timestamp()}
+
+    def test_revoked_token(self):
+        self.revocations.revoke('a1', timezone.now() + timedelta(hours=1), self.user.id)
+        self.assertTrue(self.revocations.is_revoked(self.claims))
+        self.assertFalse(self.revocations.is_revoked({**self.claims, 'jti': 'b2'}))
+
+    def test_revoked_user_keeps_later_tokens(self):
+        self.revocations.revoke(revocation.user_key(self.user.id), timezone.now() + timedelta(hours=1), self.user.id)
+        self.assertTrue(self.revocations.is_revoked(self.claims))
+        later = {**self.claims, 'jti': 'c3', 'iat': timezone.now().timestamp() + 60}
+        self.assertFalse(self.revocations.is_revoked(later))
+
+    def test_other_process_revocation_seen_after_refresh(self):
+        self.assertFalse(self.revocations.is_revoked(self.claims))
+        revocation.DatabaseStore().revoke('a1', timezone.now() + timedelta(hours=1), self.user.id)
+        self.revocations.rebuild()
+        self.assertTrue(self.revocations.is_revoked(self.claims))
+
+
+class SearchTests(TestCase):
+    def setUp(self):
+        self.teacher = User.objects.create(username='guru')
+        self.student = User.objects.create(username='siswa')
+        self.joined = Course.objects.create(name='Basis Data', description='Normalisasi tabel', price=0,
+                                            teacher=self.teacher)
+        self.other = Course.objects.create(name='Jaringan', description='Normalisasi sinyal', price=0,
+                                           teacher=self.teacher)
+        CourseMember.objects.create(course_id=self.joined, user_id=self.student)
+        CourseContent.objects.create(name='Normalisasi', course_id=self.joined)
+        CourseContent.objects.create(name='Normalisasi', course_id=self.other)
+
+    def test_contents_stay_in_joined_courses(self):
+        hits = search.search(self.student.id, 'normalisasi')['items']
+        self.assertCountEqual([(hit['kind'], hit['course_id']) for hit in hits],
+                              [('content', self.joined.id), ('course', self.joined.id), ('course', self.other.id)])
+        self.assertEqual(search.search(self.student.id, 'sinyal')['items'][0]['course_id'], self.other.id)
+
+    def test_pages(self):
+        first = search.search(self.student.id, 'normalisasi', limit=2)
+        second = search.search(self.student.id, 'normalisasi', cursor=first['next'], limit=2)
+        self.assertEqual(len(first['items']) + len(second['items']), 3)
+        self.assertIsNone(second['next'])
+
+
+class CatalogTests(TestCase):
+    def setUp(self):
+        self.addCleanup(catalog.cache.clear)
+
+    def test_facets(self):
+        teacher = User.objects.create(username='guru')
+        category = Category.objects.create(name='Data', created_by=teacher)
+        for price, course_category in ((0, category), (150000, category), (150000, None)):
+            Course.objects.create(name='K', description='-', price=price, teacher=teacher, category=course_category)
+        facets = catalog.facets(category_id=category.id)
+        self.assertEqual({(facet['name'], facet['count']) for facet in facets['categories']},
+                         {('Data', 2), ('Tanpa Kategori', 1)})
+        self.assertEqual({facet['min']: facet['count'] for facet in facets['prices'] if facet['count']},
+                         {0: 1, 100000: 1})
+
+
+class SuggestTests(TestCase):
+    def test_index_follows_saves(self):
+        index = suggest.PrefixIndex()
+        teacher = User.objects.create(username='guru')
+        course = Course.objects.create(name='Pengantar Basis Data', description='-', price=0, teacher=teacher)
+        self.assertEqual([hit['id'] for hit in index.suggest('bas')], [course.id])
+        index.update(course.id * 2, 'Pengantar Jaringan')
+        self.assertEqual(index.suggest('bas'), [])
+        self.assertEqual([hit['name'] for hit in index.suggest('jar')], ['Pengantar Jaringan'])
@@ -48,6 +48,7 @@ MIDDLEWARE = [
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'lms_core.membership.MembershipMemoMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'ninja.compatibility.files.fix_request_files_middleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',